@@ -0,0 +1,156 @@
+"""
+Micro/macro benchmark suite.
+
+  python -m benchmarks run [--out results.json] [--filter score] [--min-time-s 1.0]
+  python -m benchmarks compare [BASELINE] [CURRENT] [--metric p50_us] [--threshold 0.25]
+
+`run` needs trained artifacts (ARTIFACTS_DIR) and fakeredis; Redis-backed pieces
+(drift, rate limit) run against an in-memory fakeredis. `compare` exits 1 when any
+case regresses by more than --threshold (0.25 = 25%) on --metric, and warns when the two
+reports were taken on different machines (python, platform, cpu_count).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def _meta() -> Dict[str, Any]:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        sha = ""
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_sha": sha,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    from benchmarks.cases import build_cases, configure_env, silence_logs
+    from benchmarks.harness import measure, measure_async
+
+    configure_env()
+    cases = build_cases()
+    silence_logs()
+    selected = [c for c in cases if not args.filter or any(f in c.name for f in args.filter)]
+
+    from src.api import routes
+
+    results: Dict[str, Any] = {}
+    for case in selected:
+        opts = {"min_time_s": args.min_time_s, **case.opts}
+        if case.setup is not None:
+            case.setup()
+        try:
+            stats = (measure_async if case.is_async else measure)(case.fn, **opts)
+        finally:
+            if case.teardown is not None:
+                case.teardown()
+        results[case.name] = stats
+        print(
+            f"{case.name:<30} p50={stats['p50_us']:>10.1f}us p95={stats['p95_us']:>10.1f}us "
+            f"p99={stats['p99_us']:>10.1f}us ops/s={stats['ops_per_s']:>10.0f} n={stats['n']}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            **_meta(),
+            "model_version": routes.MODEL.current().version if routes.MODEL else None,
+        },
+        "results": results,
+    }
+    routes.shutdown()
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"wrote {out}", file=sys.stderr)
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    from benchmarks.harness import compare, meta_mismatches
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    base_meta, cur_meta = baseline.get("meta", {}), current.get("meta", {})
+    base_sha, cur_sha = base_meta.get("git_sha") or "?", cur_meta.get("git_sha") or "?"
+    print(f"baseline {base_sha} ({base_meta.get('created_at', '?')}) vs current {cur_sha}")
+    for m in meta_mismatches(baseline, current):
+        print(
+            f"warning: {m['key']} differs: baseline {m['baseline']!r}, current {m['current']!r}",
+            file=sys.stderr,
+        )
+    rows = compare(
+        baseline,
+        current,
+        metric=args.metric,
+        threshold=args.threshold,
+        min_delta_us=args.min_delta_us,
+    )
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else "ok"
+        print(
+            f"{r['case']:<30} {args.metric} {r['baseline']:>12.1f} -> {r['current']:>12.1f} ({r['change']:+.1%}) {flag}"
+        )
+    missing = sorted(set(baseline.get("results", {})) - set(current.get("results", {})))
+    if missing:
+        print(f"not in current run: {', '.join(missing)}")
+    bad = [r["case"] for r in rows if r["regression"]]
+    if bad:
+        print(
+            f"{len(bad)} regression(s) over {args.threshold:.0%}: {', '.join(bad)}", file=sys.stderr
+        )
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="run the suite and write a JSON report")
+    run.add_argument("--out", default="benchmarks/results.json")
+    run.add_argument(
+        "--filter", action="append", default=[], help="substring of case names to run (repeatable)"
+    )
+    run.add_argument("--min-time-s", type=float, default=1.0, help="sampling time per case")
+    run.set_defaults(func=cmd_run)
+
+    cmp = sub.add_parser("compare", help="fail if CURRENT regressed against BASELINE")
+    cmp.add_argument("baseline", nargs="?", default=str(BASELINE))
+    cmp.add_argument("current", nargs="?", default="benchmarks/results.json")
+    cmp.add_argument(
+        "--metric", default="p50_us", choices=["p50_us", "p95_us", "p99_us", "mean_us", "ops_per_s"]
+    )
+    cmp.add_argument(
+        "--threshold", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)"
+    )
+    cmp.add_argument(
+        "--min-delta-us", type=float, default=1.0, help="ignore latency slowdowns smaller than this"
+    )
+    cmp.set_defaults(func=cmd_compare)
+
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Benchmark cases. Call configure_env() before anything imports src: SETTINGS and the
+API key index are read at import time.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_API_KEY = "bench_key"
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    fn: Callable[[], Any]
+    is_async: bool = False
+    opts: Dict[str, Any] = field(default_factory=dict)
+    setup: Optional[Callable[[], None]] = None
+    teardown: Optional[Callable[[], None]] = None
+
+
+def configure_env() -> None:
+    """
+    Benchmark key with an effectively unlimited rpm; OTel exporters off.
+    """
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    os.environ["DEMO_API_KEYS_JSON"] = json.dumps({BENCH_API_KEY: {"rpm": 10**9, "role": "admin"}})
+
+
+def silence_logs() -> None:
+    """
+    Keep JSON log formatting (it is part of the request cost) but send it to /dev/null.
+    """
+    devnull = open(os.devnull, "w")
+    for logger in [logging.getLogger()] + [
+        logging.getLogger(n) for n in list(logging.root.manager.loggerDict)
+    ]:
+        for h in getattr(logger, "handlers", []):
+            if isinstance(h, logging.StreamHandler):
+                h.setStream(devnull)
+
+
+def sample_payloads(n: int = 512) -> List[Dict[str, Any]]:
+    from src.training.data_gen import FEATURES, generate_synthetic_risk_data
+
+    rows = generate_synthetic_risk_data(n=n, seed=123)[FEATURES].to_dict(orient="records")
+    for r in rows:
+        for k in (
+            "age",
+            "account_age_days",
+            "num_txn_30d",
+            "num_chargebacks_180d",
+            "device_change_count_30d",
+        ):
+            r[k] = int(r[k])
+        r["is_international"] = bool(r["is_international"])
+    return rows
+
+
+def install_fake_redis() -> Any:
+    """
+    Every get_redis() caller shares one in-memory fakeredis client (with Lua).
+    """
+    import fakeredis
+
+    from src.common import redis_client
+
+    r = fakeredis.FakeRedis(decode_responses=True)
+    redis_client._client = r
+    return r
+
+
+def build_cases() -> List[Case]:
+    import httpx
+
+    from src.api import routes
+    from src.api.main import app
+    from src.common.auth import require_principal
+    from src.common.drift import drift_warnings, update_drift_stats
+    from src.common.metrics import stage
+    from src.common.rate_limit import check_rate_limit
+    from src.common.settings import SETTINGS
+    from src.common.utils import normalize_features_ordered
+    from src.serving.explainer import explain_global, explain_local
+    from src.serving.scorer import ood_warnings, predict_probability
+
+    install_fake_redis()
+    sm = routes.startup().current()
+    art = sm.art
+    fl = art.feature_list
+    payloads = sample_payloads()
+    rows = itertools.cycle(payloads)
+    row_dfs = itertools.cycle([normalize_features_ordered(p, fl) for p in payloads])
+    global_sample = art.global_sample_df()
+    principal = require_principal(BENCH_API_KEY)
+
+    for p in payloads[:64]:
+        update_drift_stats(BENCH_API_KEY, p, fl)
+
+    headers = {"X-API-Key": BENCH_API_KEY}
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    saved_cache: Dict[str, Any] = {}
+
+    def disable_explain_cache() -> None:
+        saved_cache["cache"], routes.EXPLAIN_CACHE = routes.EXPLAIN_CACHE, None
+
+    def restore_explain_cache() -> None:
+        routes.EXPLAIN_CACHE = saved_cache.pop("cache", routes.EXPLAIN_CACHE)
+
+    async def post(path: str, body: Dict[str, Any]) -> None:
+        r = await client.post(path, json=body, headers=headers)
+        if r.status_code != 200:
+            raise RuntimeError(f"{path} -> {r.status_code}: {r.text[:200]}")
+
+    async def get(path: str) -> None:
+        r = await client.get(path, headers=headers)
+        if r.status_code != 200:
+            raise RuntimeError(f"{path} -> {r.status_code}: {r.text[:200]}")
+
+    slow = {"min_iters": 5, "warmup": 1}
+    return [
+        # ---- micro ----
+        Case(
+            "predict_probability",
+            lambda: predict_probability(art.model, next(rows), fl, art.kernel),
+        ),
+        Case("predict_probability_sklearn", lambda: predict_probability(art.model, next(rows), fl)),
+        Case("normalize_features_ordered", lambda: normalize_features_ordered(next(rows), fl)),
+        Case(
+            "ood_warnings",
+            lambda: ood_warnings(
+                next(rows), art.stats_means, art.stats_stds, SETTINGS.drift_z_threshold
+            ),
+        ),
+        Case(
+            "explain_local",
+            lambda: explain_local(sm.explainer, art.model, next(row_dfs), fl, top_k=6),
+        ),
+        Case(
+            "explain_global",
+            lambda: explain_global(sm.explainer, art.model, global_sample, fl),
+            opts=slow,
+        ),
+        Case("update_drift_stats", lambda: update_drift_stats(BENCH_API_KEY, next(rows), fl)),
+        Case(
+            "drift_warnings",
+            lambda: drift_warnings(BENCH_API_KEY, art.stats_means, art.stats_stds, fl),
+        ),
+        Case("auth_require_principal", lambda: require_principal(BENCH_API_KEY)),
+        Case("rate_limit_check", lambda: check_rate_limit(principal)),
+        Case("stage_timer_overhead", lambda: stage("bench").__enter__().__exit__(None, None, None)),
+        # ---- macro: full request through the ASGI app (middleware, auth, validation) ----
+        Case("asgi_health", lambda: get("/v1/health"), is_async=True),
+        Case("asgi_score", lambda: post("/v1/score", next(rows)), is_async=True),
+        Case(
+            "asgi_score_batch_100",
+            lambda: post("/v1/score/batch", {"items": payloads[:100]}),
+            is_async=True,
+            opts=slow,
+        ),
+        Case("asgi_explain_cached", lambda: post("/v1/explain", payloads[0]), is_async=True),
+        Case(
+            "asgi_explain_uncached",
+            lambda: post("/v1/explain", next(rows)),
+            is_async=True,
+            setup=disable_explain_cache,
+            teardown=restore_explain_cache,
+        ),
+    ]
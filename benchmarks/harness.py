@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import numpy as np
+
+STAT_KEYS = ("p50_us", "p95_us", "p99_us", "mean_us", "ops_per_s")
+# report meta that must match for two runs' timings to be comparable
+MACHINE_KEYS = ("python", "platform", "cpu_count")
+
+
+def summarize(samples_ns: List[int], wall_s: float) -> Dict[str, Any]:
+    us = np.asarray(samples_ns, dtype=float) / 1e3
+    p50, p95, p99 = np.percentile(us, [50, 95, 99])
+    return {
+        "n": int(len(us)),
+        "p50_us": float(p50),
+        "p95_us": float(p95),
+        "p99_us": float(p99),
+        "mean_us": float(us.mean()),
+        "ops_per_s": float(len(us) / wall_s) if wall_s > 0 else 0.0,
+    }
+
+
+def measure(
+    fn: Callable[[], Any],
+    min_time_s: float = 1.0,
+    min_iters: int = 20,
+    max_iters: int = 200_000,
+    warmup: int = 5,
+) -> Dict[str, Any]:
+    """
+    Times fn() one call at a time until both min_time_s and min_iters are reached.
+    GC is disabled while sampling so a collection doesn't land in one case's tail.
+    """
+    for _ in range(warmup):
+        fn()
+    samples: List[int] = []
+    clock = time.perf_counter_ns
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        start = clock()
+        deadline = start + int(min_time_s * 1e9)
+        while len(samples) < max_iters and (len(samples) < min_iters or clock() < deadline):
+            t0 = clock()
+            fn()
+            samples.append(clock() - t0)
+        wall_s = (clock() - start) / 1e9
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return summarize(samples, wall_s)
+
+
+def measure_async(
+    fn: Callable[[], Awaitable[Any]],
+    min_time_s: float = 1.0,
+    min_iters: int = 20,
+    max_iters: int = 200_000,
+    warmup: int = 5,
+) -> Dict[str, Any]:
+    """
+    measure() for a coroutine function; every call is awaited on one event loop.
+    """
+
+    async def run() -> Dict[str, Any]:
+        for _ in range(warmup):
+            await fn()
+        samples: List[int] = []
+        clock = time.perf_counter_ns
+        start = clock()
+        deadline = start + int(min_time_s * 1e9)
+        while len(samples) < max_iters and (len(samples) < min_iters or clock() < deadline):
+            t0 = clock()
+            await fn()
+            samples.append(clock() - t0)
+        return summarize(samples, (clock() - start) / 1e9)
+
+    return asyncio.run(run())
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    metric: str = "p50_us",
+    threshold: float = 0.25,
+    min_delta_us: float = 1.0,
+) -> List[Dict[str, Any]]:
+    """
+    One row per case present in both reports. `change` is the relative change of
+    `metric` (positive = slower; for ops_per_s a drop counts as positive), and a row
+    regresses when change > threshold. For latency metrics the absolute slowdown must
+    also exceed min_delta_us, so sub-microsecond cases don't fail on timer noise.
+    """
+    rows = []
+    base, cur = baseline.get("results", {}), current.get("results", {})
+    for name in sorted(set(base) & set(cur)):
+        b, c = float(base[name][metric]), float(cur[name][metric])
+        if b <= 0 or c <= 0:
+            continue
+        change = (b / c - 1.0) if metric == "ops_per_s" else (c / b - 1.0)
+        regression = change > threshold and (metric == "ops_per_s" or c - b > min_delta_us)
+        rows.append(
+            {"case": name, "baseline": b, "current": c, "change": change, "regression": regression}
+        )
+    return rows
+
+
+def meta_mismatches(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Machine meta (MACHINE_KEYS) that differs between two reports; keys missing from
+    either report are skipped. A non-empty result means the timings were taken on
+    different machines and regressions may be noise.
+    """
+    base, cur = baseline.get("meta", {}), current.get("meta", {})
+    return [
+        {"key": k, "baseline": base[k], "current": cur[k]}
+        for k in MACHINE_KEYS
+        if k in base and k in cur and base[k] != cur[k]
+    ]
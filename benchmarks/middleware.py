@@ -0,0 +1,157 @@
+"""
+Per-request middleware overhead: the same /v1 router mounted under three stacks,
+driven in-process through httpx.ASGITransport.
+
+  bare     no middleware
+  legacy   the previous BaseHTTPMiddleware pair (request tracing + no-op rate limit)
+  asgi     src.api.middleware.RequestTracingMiddleware (pure ASGI)
+
+Variants are measured in interleaved rounds; the report gives each variant's median p50
+and its overhead over `bare`.
+
+  python -m benchmarks.middleware [--rounds 5] [--min-time-s 0.5] [--out middleware.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.cases import (
+    BENCH_API_KEY,
+    configure_env,
+    install_fake_redis,
+    sample_payloads,
+    silence_logs,
+)
+
+
+def _legacy_middlewares() -> List[type]:
+    """
+    The BaseHTTPMiddleware implementation this benchmark was written against, kept here
+    as the "before" reference.
+    """
+    from fastapi import Request
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from src.common.logging import get_logger
+
+    logger = get_logger("middleware")
+
+    class LegacyRequestTracingMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next: Callable):
+            request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
+            request.state.request_id = request_id
+            start = time.perf_counter()
+            response = await call_next(request)
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            response.headers["x-request-id"] = request_id
+            response.headers["x-latency-ms"] = str(latency_ms)
+            logger.info(
+                "http_request",
+                extra={
+                    "ctx": {
+                        "request_id": request_id,
+                        "method": request.method,
+                        "path": request.url.path,
+                        "status": response.status_code,
+                        "latency_ms": latency_ms,
+                    }
+                },
+            )
+            return response
+
+    class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next: Callable):
+            return await call_next(request)
+
+    return [LegacyRequestTracingMiddleware, LegacyRateLimitMiddleware]
+
+
+def build_apps() -> Dict[str, Any]:
+    from fastapi import FastAPI
+
+    from src.api.middleware import RequestTracingMiddleware
+    from src.api.routes import router
+    from src.common.settings import SETTINGS
+
+    variants = {"bare": [], "legacy": _legacy_middlewares(), "asgi": [RequestTracingMiddleware]}
+    apps = {}
+    for name, middlewares in variants.items():
+        app = FastAPI()
+        for mw in middlewares:
+            app.add_middleware(mw)
+        app.include_router(router, prefix=f"/{SETTINGS.api_version}")
+        apps[name] = app
+    return apps
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--min-time-s", type=float, default=0.5)
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    configure_env()
+    import httpx
+
+    from benchmarks.harness import measure_async
+    from src.api import routes
+
+    install_fake_redis()
+    routes.startup()
+    apps = build_apps()
+    silence_logs()
+
+    rows = itertools.cycle(sample_payloads())
+    headers = {"X-API-Key": BENCH_API_KEY}
+    clients = {
+        name: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        for name, app in apps.items()
+    }
+
+    def endpoint_fn(client: httpx.AsyncClient, endpoint: str) -> Callable:
+        if endpoint == "health":
+            return lambda: client.get("/v1/health")
+        return lambda: client.post("/v1/score", json=next(rows), headers=headers)
+
+    p50s: Dict[str, Dict[str, List[float]]] = {
+        ep: {name: [] for name in apps} for ep in ("health", "score")
+    }
+    for _ in range(args.rounds):
+        for endpoint in p50s:
+            for name, client in clients.items():
+                stats = measure_async(
+                    endpoint_fn(client, endpoint), min_time_s=args.min_time_s, warmup=20
+                )
+                p50s[endpoint][name].append(stats["p50_us"])
+
+    report: Dict[str, Any] = {"rounds": args.rounds, "endpoints": {}}
+    for endpoint, by_variant in p50s.items():
+        med = {name: statistics.median(v) for name, v in by_variant.items()}
+        report["endpoints"][endpoint] = {
+            "p50_us": med,
+            "overhead_us": {name: med[name] - med["bare"] for name in med if name != "bare"},
+        }
+        print(
+            f"/v1/{endpoint:<7} bare={med['bare']:.0f}us legacy=+{med['legacy'] - med['bare']:.0f}us asgi=+{med['asgi'] - med['bare']:.0f}us",
+            file=sys.stderr,
+        )
+    routes.shutdown()
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
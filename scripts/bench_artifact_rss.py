@@ -0,0 +1,126 @@
+"""
+Per-worker memory with memory-mapped array artifacts vs unpickled joblib artifacts.
+
+Starts N concurrent worker processes per mode (ARTIFACTS_MMAP=1 / 0). Each worker
+loads and warms the serving model the way the API does, scores a batch, reports its
+load time, RSS and PSS (proportional set size: shared pages are split across the
+processes mapping them), then waits until every worker of that mode has reported.
+Linux only (/proc).
+
+  python scripts/bench_artifact_rss.py [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_CHILD = """
+import json, sys, time
+import numpy as np
+
+t0 = time.perf_counter()
+from src.api import routes
+sm = routes.startup().current()
+load_s = time.perf_counter() - t0
+
+from src.serving.scorer import predict_matrix
+X = np.asarray(sm.art.background_df()[sm.art.feature_list].to_numpy(dtype=float))
+predict_matrix(sm.art.model, np.repeat(X, 10, axis=0), sm.art.feature_list, sm.art.kernel)
+
+def kb(path, key):
+    try:
+        for line in open(path):
+            if line.startswith(key + ":"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+print("RESULT " + json.dumps({
+    "load_s": load_s,
+    "rss_kb": kb("/proc/self/status", "VmRSS"),
+    "pss_kb": kb("/proc/self/smaps_rollup", "Pss"),
+    "sklearn_imported": "sklearn" in sys.modules,
+    "mmap_arrays": sm.art.arrays is not None,
+}), flush=True)
+sys.stdin.read()  # stay alive until the parent has sampled every worker
+"""
+
+
+def run_mode(mmap: bool, workers: int) -> dict:
+    env = {
+        **os.environ,
+        "ARTIFACTS_MMAP": "1" if mmap else "0",
+        "OTEL_SDK_DISABLED": "true",
+        "PYTHONPATH": str(ROOT),
+    }
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", _CHILD],
+            cwd=ROOT,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    samples = []
+    try:
+        for p in procs:
+            # worker stdout also carries JSON logs; the sample is the RESULT line
+            line = p.stdout.readline()
+            while line and not line.startswith("RESULT "):
+                line = p.stdout.readline()
+            if not line:
+                raise SystemExit(f"worker failed (mmap={mmap}, exit={p.wait()})")
+            samples.append(json.loads(line[len("RESULT ") :]))
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+
+    def med(key):
+        vals = [s[key] for s in samples if s[key] is not None]
+        return statistics.median(vals) if vals else None
+
+    return {
+        "mmap": mmap,
+        "workers": workers,
+        "load_s_median": med("load_s"),
+        "rss_mb_median": (med("rss_kb") or 0) / 1024.0,
+        "pss_mb_median": (med("pss_kb") or 0) / 1024.0,
+        "sklearn_imported": any(s["sklearn_imported"] for s in samples),
+        "mmap_arrays": all(s["mmap_arrays"] for s in samples),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    pickled = run_mode(False, args.workers)
+    mapped = run_mode(True, args.workers)
+    report = {
+        "pickled": pickled,
+        "mmap": mapped,
+        "rss_saved_mb_per_worker": pickled["rss_mb_median"] - mapped["rss_mb_median"],
+        "pss_saved_mb_per_worker": pickled["pss_mb_median"] - mapped["pss_mb_median"],
+    }
+    print(json.dumps(report, indent=2))
+    if not mapped["mmap_arrays"]:
+        print("note: no arrays/ export found; retrain to produce it", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
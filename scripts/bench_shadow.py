@@ -0,0 +1,113 @@
+"""
+Champion latency with and without shadow scoring, through the in-process app.
+
+Alternates shadow-off / shadow-on rounds of /v1/score (same payloads) and compares the
+median per-round p50/p99. Exits non-zero if the champion p99 regresses by more than
+--max-regression (relative).
+
+  python scripts/bench_shadow.py [--challenger-dir artifacts/<version>] [--n 1000] [--rounds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.api import routes  # noqa: E402
+from src.api.main import app  # noqa: E402
+from src.serving.model_loader import load_artifacts  # noqa: E402
+from src.serving.shadow import ShadowScorer  # noqa: E402
+
+API_KEY = os.environ.get("DEMO_API_KEY", "demo_key")
+
+
+def sample_payload(rng: random.Random) -> dict:
+    return {
+        "age": rng.randint(18, 70),
+        "income": max(0, rng.gauss(80000, 25000)),
+        "account_age_days": rng.randint(0, 2000),
+        "num_txn_30d": rng.randint(0, 80),
+        "avg_txn_amount_30d": max(0, rng.gauss(120, 60)),
+        "num_chargebacks_180d": rng.randint(0, 2),
+        "device_change_count_30d": rng.randint(0, 4),
+        "geo_distance_from_last_txn_km": max(0, rng.gauss(25, 40)),
+        "is_international": rng.random() < 0.08,
+        "merchant_risk_score": min(1.0, max(0.0, rng.random())),
+    }
+
+
+def run_round(client: TestClient, payloads: list) -> dict:
+    times = []
+    for p in payloads:
+        t0 = time.perf_counter()
+        r = client.post("/v1/score", headers={"X-API-Key": API_KEY}, json=p)
+        times.append((time.perf_counter() - t0) * 1000.0)
+        if r.status_code != 200:
+            raise SystemExit(f"/v1/score failed: {r.status_code} {r.text}")
+    p50, p99 = np.percentile(times, [50, 99])
+    return {"p50": float(p50), "p99": float(p99)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "--challenger-dir",
+        default=None,
+        help="artifacts dir of the challenger (default: the champion's own)",
+    )
+    ap.add_argument("--n", type=int, default=1000)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--max-regression", type=float, default=0.15)
+    args = ap.parse_args()
+
+    challenger = (
+        load_artifacts(Path(args.challenger_dir)) if args.challenger_dir else load_artifacts()
+    )
+    rng = random.Random(42)
+    payloads = [sample_payload(rng) for _ in range(args.n)]
+    client = TestClient(app)
+    run_round(client, payloads[:100])  # warm-up
+
+    off, on = [], []
+    shadow = ShadowScorer(challenger)
+    try:
+        for _ in range(args.rounds):
+            routes.SHADOW = None
+            off.append(run_round(client, payloads))
+            routes.SHADOW = shadow
+            on.append(run_round(client, payloads))
+        shadow.drain(timeout=30)
+    finally:
+        routes.SHADOW = None
+        shadow.close()
+
+    report = {
+        "n": args.n,
+        "rounds": args.rounds,
+        "off": {k: statistics.median(r[k] for r in off) for k in ("p50", "p99")},
+        "on": {k: statistics.median(r[k] for r in on) for k in ("p50", "p99")},
+        "shadow": shadow.stats(),
+    }
+    report["p99_regression"] = report["on"]["p99"] / report["off"]["p99"] - 1.0
+    print(json.dumps(report, indent=2))
+
+    if report["p99_regression"] > args.max_regression:
+        raise SystemExit(
+            f"champion p99 regressed {report['p99_regression']:.1%} (> {args.max_regression:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cold-start benchmark: import time of src.api.main, time to first /v1/health, and time
+until /v1/ready (artifacts loaded + warmed in the lifespan hook). Each sample runs in a
+fresh interpreter. Exits non-zero if a median exceeds its budget.
+
+  python scripts/bench_startup.py [--runs 5] [--import-budget-s 1.5] [--ready-budget-s 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+from src.api.main import app
+t_import = time.perf_counter() - t0
+
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    client.get("/v1/health")
+    t_health = time.perf_counter() - t0
+    while client.get("/v1/ready").status_code != 200:
+        if time.perf_counter() - t0 > 300:
+            raise SystemExit("never became ready")
+        time.sleep(0.01)
+    t_ready = time.perf_counter() - t0
+print("@@" + json.dumps({
+    "import_s": t_import,
+    "first_health_s": t_health,
+    "ready_s": t_ready,
+    "shap_imported": "shap" in sys.modules,
+}))
+"""
+
+
+def sample() -> dict:
+    env = {
+        **os.environ,
+        "OTEL_SDK_DISABLED": os.environ.get("OTEL_SDK_DISABLED", "true"),
+        "PYTHONPATH": str(ROOT),
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    line = next(line for line in out.stdout.splitlines() if line.startswith("@@"))
+    return json.loads(line[2:])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--import-budget-s", type=float, default=1.5)
+    ap.add_argument("--ready-budget-s", type=float, default=10.0)
+    args = ap.parse_args()
+
+    runs = [sample() for _ in range(args.runs)]
+    report = {
+        k: statistics.median(r[k] for r in runs) for k in ("import_s", "first_health_s", "ready_s")
+    }
+    report["shap_imported_at_startup"] = any(r["shap_imported"] for r in runs)
+    report["runs"] = runs
+    report["budgets"] = {"import_s": args.import_budget_s, "ready_s": args.ready_budget_s}
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if report["import_s"] > args.import_budget_s:
+        failures.append(f"import {report['import_s']:.2f}s > {args.import_budget_s}s")
+    if report["ready_s"] > args.ready_budget_s:
+        failures.append(f"ready {report['ready_s']:.2f}s > {args.ready_budget_s}s")
+    if failures:
+        raise SystemExit("startup budget exceeded: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
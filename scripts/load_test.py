@@ -1,57 +1,303 @@
+"""
+Open-loop load generator.
+
+Requests are released on a fixed arrival schedule (--rate per second, constant or
+Poisson) regardless of how fast earlier ones complete, with at most --concurrency in
+flight. Latency is measured from each request's *scheduled* start, so time spent queued
+behind a slow server counts (no coordinated omission); `service_ms` is measured from the
+actual send for comparison. --rate 0 runs closed-loop: --concurrency workers back to back.
+
+  python scripts/load_test.py --rate 200 --concurrency 64 --duration-s 30 \\
+      --mix score=70,explain=20,global-explain=5,drift=5 \\
+      --api-keys key_a,key_b --out loadtest.json
+
+Env defaults: LOADTEST_BASE_URL, DEMO_API_KEY (or LOADTEST_API_KEYS, comma-separated),
+LOADTEST_N (fixed request count instead of a duration).
+"""
+
 from __future__ import annotations
 
-import time
-import statistics
-import httpx
+import argparse
+import asyncio
+import json
+import math
 import os
+import platform
 import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
 
 BASE = os.environ.get("LOADTEST_BASE_URL", "http://127.0.0.1:8000")
-API_KEY = os.environ.get("DEMO_API_KEY", "demo_key")
+API_KEYS = os.environ.get("LOADTEST_API_KEYS", os.environ.get("DEMO_API_KEY", "demo_key"))
+
+# name -> (method, path, has body)
+ENDPOINTS: Dict[str, Tuple[str, str, bool]] = {
+    "score": ("POST", "/v1/score", True),
+    "explain": ("POST", "/v1/explain", True),
+    "global-explain": ("GET", "/v1/global-explain", False),
+    "drift": ("GET", "/v1/monitor/drift", False),
+}
+PERCENTILES = (50.0, 75.0, 90.0, 95.0, 99.0, 99.9, 99.99, 100.0)
+
+
+def sample_payload(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "age": rng.randint(18, 70),
+        "income": max(0, rng.gauss(80000, 25000)),
+        "account_age_days": rng.randint(0, 2000),
+        "num_txn_30d": rng.randint(0, 80),
+        "avg_txn_amount_30d": max(0, rng.gauss(120, 60)),
+        "num_chargebacks_180d": rng.randint(0, 2),
+        "device_change_count_30d": rng.randint(0, 4),
+        "geo_distance_from_last_txn_km": max(0, rng.gauss(25, 40)),
+        "is_international": rng.random() < 0.08,
+        "merchant_risk_score": min(1.0, max(0.0, rng.random())),
+    }
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-bucketed histogram: fixed relative precision (default 1%) over any
+    range, constant memory, mergeable. Values are recorded in microseconds.
+    """
+
+    def __init__(self, precision: float = 0.01) -> None:
+        self._log_base = math.log1p(precision)
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.max_us = 0.0
+
+    def record(self, us: float) -> None:
+        us = max(us, 1.0)
+        self.counts[int(math.log(us) / self._log_base)] += 1
+        self.total += 1
+        self.max_us = max(self.max_us, us)
+
+    def percentile_ms(self, p: float) -> float:
+        if self.total == 0:
+            return 0.0
+        if p >= 100.0:
+            return self.max_us / 1000.0
+        rank = max(1, math.ceil(p / 100.0 * self.total))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                # bucket upper edge, never above the true max
+                return min(math.exp((idx + 1) * self._log_base), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def summary(self) -> Dict[str, float]:
+        return {f"p{p:g}": round(self.percentile_ms(p), 3) for p in PERCENTILES}
+
+
+class EndpointStats:
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.status: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def to_dict(self, elapsed_s: float) -> Dict[str, Any]:
+        n = self.latency.total
+        ok = sum(c for s, c in self.status.items() if s.isdigit() and 200 <= int(s) < 300)
+        limited = self.status.get("429", 0)
+        failed = n - ok
+        return {
+            "requests": n,
+            "throughput_rps": round(n / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+            "ok": ok,
+            "error_rate": round(failed / n, 5) if n else 0.0,
+            "rate_limited_rate": round(limited / n, 5) if n else 0.0,
+            "status": dict(sorted(self.status.items())),
+            "transport_errors": dict(sorted(self.errors.items())),
+            "latency_ms": self.latency.summary(),
+            "service_ms": self.service.summary(),
+        }
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(
+                f"unknown endpoint {name!r} in --mix (choose from {', '.join(ENDPOINTS)})"
+            )
+        mix.append((name, float(weight or 1)))
+    if not mix or sum(w for _, w in mix) <= 0:
+        raise SystemExit("--mix needs at least one positive weight")
+    return mix
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    names, weights = [n for n, _ in mix], [w for _, w in mix]
+    keys = [k.strip() for k in args.api_keys.split(",") if k.strip()]
+    if not keys:
+        raise SystemExit("--api-keys needs at least one key")
+    per_endpoint: Dict[str, EndpointStats] = {n: EndpointStats() for n in names}
+    overall = EndpointStats()
+    # keys are reported as "<index>:<last 4 chars>", never in full
+    key_labels = [f"{j}:{k[-4:]}" for j, k in enumerate(keys)]
+    per_key: Dict[str, Counter] = {label: Counter() for label in key_labels}
+
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout_s, limits=limits)
+    sem = asyncio.Semaphore(args.concurrency)
+    clock = time.perf_counter
+
+    async def one(i: int, intended: float) -> None:
+        name = rng.choices(names, weights)[0]
+        key_idx = i % len(keys)
+        key = keys[key_idx]
+        method, path, has_body = ENDPOINTS[name]
+        body = sample_payload(rng) if has_body else None
+        async with sem:
+            sent = clock()
+            try:
+                r = await client.request(method, path, json=body, headers={"X-API-Key": key})
+                status = str(r.status_code)
+                err = None
+            except httpx.HTTPError as e:
+                status, err = "error", type(e).__name__
+        done = clock()
+        for st in (per_endpoint[name], overall):
+            st.latency.record((done - intended) * 1e6)
+            st.service.record((done - sent) * 1e6)
+            st.status[status] += 1
+            if err:
+                st.errors[err] += 1
+        per_key[key_labels[key_idx]][status] += 1
+
+    # warm-up: one of each endpoint, not recorded
+    for name in names:
+        method, path, has_body = ENDPOINTS[name]
+        try:
+            await client.request(
+                method,
+                path,
+                json=sample_payload(rng) if has_body else None,
+                headers={"X-API-Key": keys[0]},
+            )
+        except httpx.HTTPError:
+            pass
+
+    tasks: List[asyncio.Task] = []
+    start = clock()
+    deadline = start + args.duration_s
+    i = 0
+    max_lag_ms = 0.0
+    if args.rate > 0:
+        # open loop: release on schedule; a late schedule is not "caught up" by skipping
+        next_at = start
+        while (args.requests and i < args.requests) or (not args.requests and next_at < deadline):
+            delay = next_at - clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # how far behind schedule this release is (generator or event loop saturated)
+            max_lag_ms = max(max_lag_ms, (clock() - next_at) * 1e3)
+            tasks.append(asyncio.create_task(one(i, next_at)))
+            i += 1
+            gap = rng.expovariate(args.rate) if args.arrival == "poisson" else 1.0 / args.rate
+            next_at += gap
+    else:
+        counter = iter(range(args.requests or 10**12))
+
+        async def worker() -> None:
+            for j in counter:
+                if not args.requests and clock() >= deadline:
+                    return
+                await one(j, clock())
+
+        tasks = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+    await asyncio.gather(*tasks)
+    elapsed = clock() - start
+    await client.aclose()
 
-def sample_payload():
     return {
-        "age": random.randint(18, 70),
-        "income": max(0, random.gauss(80000, 25000)),
-        "account_age_days": random.randint(0, 2000),
-        "num_txn_30d": random.randint(0, 80),
-        "avg_txn_amount_30d": max(0, random.gauss(120, 60)),
-        "num_chargebacks_180d": random.randint(0, 2),
-        "device_change_count_30d": random.randint(0, 4),
-        "geo_distance_from_last_txn_km": max(0, random.gauss(25, 40)),
-        "is_international": random.random() < 0.08,
-        "merchant_risk_score": min(1.0, max(0.0, random.random())),
+        "config": {
+            "base_url": args.base_url,
+            "mode": "open" if args.rate > 0 else "closed",
+            "target_rate_rps": args.rate,
+            "arrival": args.arrival,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration_s,
+            "requests": args.requests,
+            "mix": dict(mix),
+            "api_keys": len(keys),
+            "seed": args.seed,
+        },
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+        },
+        "elapsed_s": round(elapsed, 3),
+        "schedule_lag_ms": round(max_lag_ms, 3),
+        "overall": overall.to_dict(elapsed),
+        "endpoints": {n: per_endpoint[n].to_dict(elapsed) for n in names},
+        "per_key_status": {k: dict(sorted(c.items())) for k, c in per_key.items()},
     }
 
-def main():
-    n = int(os.environ.get("LOADTEST_N", "200"))
-    url = f"{BASE}/v1/score"
-    times = []
-    ok = 0
-
-    with httpx.Client(timeout=10.0) as client:
-        # warmup
-        for _ in range(5):
-            client.post(url, headers={"X-API-Key": API_KEY}, json=sample_payload())
-
-        start = time.perf_counter()
-        for _ in range(n):
-            t0 = time.perf_counter()
-            r = client.post(url, headers={"X-API-Key": API_KEY}, json=sample_payload())
-            dt = (time.perf_counter() - t0) * 1000
-            times.append(dt)
-            if r.status_code == 200:
-                ok += 1
-
-        total = time.perf_counter() - start
-
-    times_sorted = sorted(times)
-    p50 = times_sorted[int(0.50 * (len(times_sorted)-1))]
-    p95 = times_sorted[int(0.95 * (len(times_sorted)-1))]
-    rps = n / total
-
-    print(f"requests={n} ok={ok} total_s={total:.2f} rps={rps:.2f}")
-    print(f"latency_ms p50={p50:.2f} p95={p95:.2f} mean={statistics.mean(times):.2f}")
+
+def print_summary(report: Dict[str, Any]) -> None:
+    cfg = report["config"]
+    print(
+        f"mode={cfg['mode']} target_rps={cfg['target_rate_rps']} concurrency={cfg['concurrency']} elapsed_s={report['elapsed_s']}"
+    )
+    header = f"{'endpoint':<16}{'reqs':>8}{'rps':>9}{'err%':>8}{'429%':>8}" + "".join(
+        f"{'p' + format(p, 'g'):>10}" for p in PERCENTILES
+    )
+    print(header + "   (ms, from scheduled start)")
+    for name, st in [*report["endpoints"].items(), ("ALL", report["overall"])]:
+        row = f"{name:<16}{st['requests']:>8}{st['throughput_rps']:>9.1f}{st['error_rate'] * 100:>8.2f}{st['rate_limited_rate'] * 100:>8.2f}"
+        print(row + "".join(f"{v:>10.2f}" for v in st["latency_ms"].values()))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(
+        description="Open-loop HTTP load generator for the decision engine."
+    )
+    ap.add_argument("--base-url", default=BASE)
+    ap.add_argument(
+        "--rate", type=float, default=50.0, help="target arrivals/sec (0 = closed loop)"
+    )
+    ap.add_argument("--arrival", choices=["constant", "poisson"], default="constant")
+    ap.add_argument("--concurrency", type=int, default=32, help="max requests in flight")
+    ap.add_argument("--duration-s", type=float, default=30.0)
+    ap.add_argument(
+        "--requests",
+        type=int,
+        default=int(os.environ.get("LOADTEST_N", "0")),
+        help="fixed request count (overrides duration)",
+    )
+    ap.add_argument("--mix", default="score=70,explain=20,global-explain=5,drift=5")
+    ap.add_argument(
+        "--api-keys", default=API_KEYS, help="comma-separated; requests rotate across keys"
+    )
+    ap.add_argument("--timeout-s", type=float, default=10.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="", help="write the JSON report here")
+    args = ap.parse_args(argv)
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency must be >= 1")
+
+    report = asyncio.run(run(args))
+    print_summary(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"wrote {args.out}", file=sys.stderr)
+
 
 if __name__ == "__main__":
     main()
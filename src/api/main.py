@@ -1,22 +1,38 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from src.common.settings import SETTINGS
+from src.common.auth import install_key_reload_triggers
 from src.common.otel import setup_otel
-from src.api.middleware import RequestTracingMiddleware, RateLimitMiddleware
+from src.api.middleware import RequestTracingMiddleware
+from src.api import routes
 from src.api.routes import router
 
-app = FastAPI(title=SETTINGS.project_name, version=SETTINGS.api_version)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # API key index hot reload (SIGHUP / DEMO_API_KEYS_FILE changes)
+    keys_watch = install_key_reload_triggers()
+    # load + warm artifacts off the event loop; /v1/ready flips to 200 when done
+    routes.start_background_startup()
+    yield
+    routes.shutdown()
+    if keys_watch is not None:
+        keys_watch.set()
+
+
+app = FastAPI(title=SETTINGS.project_name, version=SETTINGS.api_version, lifespan=lifespan)
 
 # Observability
 setup_otel(app, service_name=SETTINGS.project_name)
 
-# Middleware
+# Middleware (pure ASGI; auth and rate limiting are enforced per route via dependencies)
 app.add_middleware(RequestTracingMiddleware)
-app.add_middleware(RateLimitMiddleware)
 
 # API routes (auth enforced inside /v1 routes via dependency)
 app.include_router(router, prefix=f"/{SETTINGS.api_version}")
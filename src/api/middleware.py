@@ -2,46 +2,74 @@ from __future__ import annotations
 
 import time
 import uuid
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.common.logging import get_logger
+from src.common.metrics import stage_histogram
+from src.common.settings import SETTINGS
 
 logger = get_logger("middleware")
 
 
-class RequestTracingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable):
-        request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
-        request.state.request_id = request_id
+class RequestTracingMiddleware:
+    """
+    Pure ASGI middleware: request id propagation, x-request-id / x-latency-ms response
+    headers and one JSON access log line per request.
+
+    Unlike BaseHTTPMiddleware it adds no task or body-stream wrapping: headers are
+    injected by wrapping `send` at http.response.start. The request id is stored in
+    scope["state"], so handlers keep reading request.state.request_id. x-latency-ms is
+    time to response start; the access log (and the "request" stage histogram) covers
+    the full response.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = ""
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
 
         start = time.perf_counter()
-        response: Response = await call_next(request)
-        latency_ms = int((time.perf_counter() - start) * 1000)
-
-        response.headers["x-request-id"] = request_id
-        response.headers["x-latency-ms"] = str(latency_ms)
-
-        # consistent JSON log
-        logger.info(
-            "http_request",
-            extra={
-                "ctx": {
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status": response.status_code,
-                    "latency_ms": latency_ms,
-                }
-            },
-        )
-
-        return response
-
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable):
-        # Auth/rate limiting is enforced in routes for /v1/*
-        return await call_next(request)
+        status = 500
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                latency_ms = int((time.perf_counter() - start) * 1000)
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                headers.append((b"x-latency-ms", str(latency_ms).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            elapsed = time.perf_counter() - start
+            if SETTINGS.stage_metrics:
+                stage_histogram("request").observe(elapsed)
+            logger.info(
+                "http_request",
+                extra={
+                    "ctx": {
+                        "request_id": request_id,
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "latency_ms": int(elapsed * 1000),
+                    }
+                },
+            )
@@ -1,46 +1,237 @@
 from __future__ import annotations
 
-import joblib
-from fastapi import APIRouter, Depends, Request, HTTPException
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, Request, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from pydantic import BaseModel
 
 from src.common.schema import (
-    RiskRequest, RiskResponse, ExplainResponse,
-    ExplainPayload, ExplainFeature,
-    ModelInfo, GlobalExplainResponse, GlobalExplainItem, DriftResponse
+    RiskRequest,
+    RiskResponse,
+    ExplainResponse,
+    BatchRiskRequest,
+    BatchRiskResponse,
+    ExplainPayload,
+    ExplainFeature,
+    ExplainJobResponse,
+    ModelInfo,
+    GlobalExplainResponse,
+    GlobalExplainItem,
+    DriftResponse,
 )
 from src.common.settings import SETTINGS
 from src.common.logging import get_logger, LogTimer, with_ctx
+from src.common.metrics import render_prometheus, stage
 from src.common.auth import require_principal, require_admin, require_write, Principal
 from src.common.rate_limit import check_rate_limit
-from src.common.decisioning import expected_loss_usd, decision_from_prob, merge_reason_codes, calibration_snapshot
-from src.common.drift import update_drift_stats, drift_warnings, drift_summary
+from src.common.decisioning import (
+    expected_loss_usd,
+    decision_from_prob,
+    merge_reason_codes,
+    calibration_snapshot,
+    decisions_from_probs,
+    expected_losses_usd,
+    reason_codes_from_masks,
+    rule_reason_masks,
+)
+from src.common.drift import (
+    update_drift_stats,
+    drift_warnings,
+    drift_summary,
+    get_verdict_cache,
+    clear_verdict_cache,
+)
 from src.common.model_registry import promote, load_registry
-from src.common.utils import normalize_features_ordered
-
-from src.serving.model_loader import load_artifacts
-from src.serving.scorer import predict_probability, ood_warnings
-from src.serving.explainer import build_explainer, explain_local, explain_global
+from src.common.utils import features_matrix, normalize_features_ordered
+
+from src.serving.model_holder import ModelHolder, ServingModel
+from src.serving.model_loader import LoadedArtifacts
+from src.serving.shadow import ShadowScorer, build_shadow_scorer
+from src.serving.scorer import predict_probability, predict_matrix, ood_warnings
+from src.serving.explain_cache import ExplanationCache
+from src.serving.explain_jobs import ExplainJobManager, ExplainQueueFull
+from src.common.redis_client import get_redis
+from src.serving.explainer import explain_local
+from src.serving.global_explain import (
+    GlobalExplainStore,
+    cache_key,
+    compute_global_explanation,
+    global_cache_dir,
+    read_global_artifact,
+)
 
 router = APIRouter()
 logger = get_logger("api")
 
-ART = load_artifacts()
+# Model-dependent state is built by startup(): from the app lifespan hook (in the
+# background, so /health answers immediately), or lazily by the first request that
+# needs it. Handlers take _model().current() once and use it to the end.
+MODEL: Optional[ModelHolder] = None
+EXPLAIN_CACHE: Optional[ExplanationCache] = None
+SHADOW: Optional[ShadowScorer] = None
+
+EXPLAIN_JOBS = ExplainJobManager(
+    SETTINGS.artifacts_dir,
+    max_workers=SETTINGS.explain_job_workers,
+    result_ttl_s=SETTINGS.explain_job_ttl_s,
+    max_pending=SETTINGS.explain_job_max_pending,
+)
+GLOBAL_EXPLAIN = GlobalExplainStore()
+
+_startup_lock = threading.Lock()
+READINESS: Dict[str, Any] = {
+    "state": "cold",
+    "started_at": None,
+    "ready_at": None,
+    "startup_ms": None,
+    "error": None,
+}
+
+
+def startup() -> ModelHolder:
+    """
+    Loads + warms the model and everything keyed to it, once. Concurrent callers block
+    until it is done.
+    """
+    global MODEL, EXPLAIN_CACHE, SHADOW
+    with _startup_lock:
+        if MODEL is not None:
+            return MODEL
+        READINESS.update(state="warming", started_at=time.time(), error=None)
+        t = LogTimer()
+        try:
+            holder = ModelHolder(SETTINGS.artifacts_dir, grace_s=SETTINGS.model_reload_grace_s)
+        except Exception as e:
+            READINESS.update(state="failed", error=str(e))
+            logger.info("startup_failed", extra={"ctx": {"err": str(e)}})
+            raise
+
+        EXPLAIN_CACHE = (
+            ExplanationCache(
+                SETTINGS.explain_cache_size,
+                holder.current().art.feature_list,
+                default_precision=SETTINGS.explain_cache_precision,
+                precision=json.loads(SETTINGS.explain_cache_precision_json)
+                if SETTINGS.explain_cache_precision_json
+                else None,
+                redis_getter=get_redis if SETTINGS.explain_cache_redis else None,
+                redis_ttl_s=SETTINGS.explain_cache_redis_ttl_s,
+            )
+            if SETTINGS.explain_cache_size > 0
+            else None
+        )
+
+        # explain pool workers hold their own copy of the model: pin them to the served
+        # version dir, and restart them on the new one after a swap
+        EXPLAIN_JOBS.recycle(holder.current().art.artifacts_dir)
+        holder.add_swap_listener(lambda old, new: EXPLAIN_JOBS.recycle(new.art.artifacts_dir))
+        # drift verdicts were computed against the old model's training stats
+        holder.add_swap_listener(lambda old, new: clear_verdict_cache())
+        if EXPLAIN_CACHE is not None:
+            holder.add_swap_listener(lambda old, new: EXPLAIN_CACHE.drop_version(old.version))
+        holder.start_watcher(SETTINGS.model_reload_interval_s)
+
+        # champion/challenger: the challenger scores /score traffic in the background
+        SHADOW = build_shadow_scorer(
+            SETTINGS.shadow_version,
+            max_queue=SETTINGS.shadow_max_queue,
+            max_batch=SETTINGS.shadow_max_batch,
+        )
+
+        MODEL = holder
+        READINESS.update(state="ready", ready_at=time.time(), startup_ms=t.ms())
+        logger.info(
+            "startup_complete",
+            extra={
+                "ctx": {
+                    "model_version": holder.current().version,
+                    "startup_ms": READINESS["startup_ms"],
+                }
+            },
+        )
+        return holder
+
+
+def start_background_startup() -> threading.Thread:
+    def run() -> None:
+        try:
+            startup()
+        except Exception:
+            pass  # recorded in READINESS; requests retry startup()
+
+    th = threading.Thread(target=run, name="startup-warmup", daemon=True)
+    th.start()
+    return th
 
-_bg_df = joblib.load(ART.artifacts_dir / SETTINGS.shap_background_filename)
-EXPLAINER = build_explainer(ART.model, _bg_df, ART.feature_list)
+
+def shutdown() -> None:
+    if MODEL is not None:
+        MODEL.stop_watcher()
+    if SHADOW is not None:
+        SHADOW.close()
+    EXPLAIN_JOBS.shutdown()
+
+
+def _model() -> ModelHolder:
+    return MODEL if MODEL is not None else startup()
 
 
 @router.get("/health")
 def health(request: Request) -> dict:
     rid = getattr(request.state, "request_id", "unknown")
-    return {"status": "ok", "model_version": ART.metrics.get("training_date", "unknown"), "request_id": rid}
+    return {
+        "status": "ok",
+        "model_version": _model().current().version if MODEL is not None else None,
+        "request_id": rid,
+    }
+
+
+@router.get("/ready")
+def ready(request: Request) -> JSONResponse:
+    """
+    Readiness probe: 200 once the model is loaded and warmed, 503 before (or on failure).
+    """
+    body = {
+        "ready": MODEL is not None,
+        **READINESS,
+        "model_version": _model().current().version if MODEL is not None else None,
+    }
+    return JSONResponse(status_code=200 if MODEL is not None else 503, content=body)
+
+
+@router.get("/metrics/prometheus", include_in_schema=False)
+def metrics_prometheus() -> PlainTextResponse:
+    """
+    Machine-readable stage histograms (Prometheus text format); unauthenticated like
+    /health so scrapers need no API key. The HTML dashboard stays at /metrics.
+    """
+    gauges = {"model_ready": 1.0 if MODEL is not None else 0.0}
+    return PlainTextResponse(
+        render_prometheus(gauges), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
-def _auth(principal: Principal = Depends(require_principal)) -> Principal:
+def _auth(x_api_key: Optional[str] = Header(default=None)) -> Principal:
+    with stage("auth"):
+        principal = require_principal(x_api_key)
     check_rate_limit(principal)
     return principal
 
 
+def _json_response(model: BaseModel) -> Response:
+    """
+    Serializes a response model directly (pydantic-core), skipping FastAPI's re-validation
+    against response_model; the route's response_model still documents the shape.
+    """
+    with stage("serialize"):
+        body = model.model_dump_json()
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/auth/me")
 def auth_me(request: Request, principal: Principal = Depends(_auth)) -> dict:
     return {
@@ -51,24 +242,43 @@ def auth_me(request: Request, principal: Principal = Depends(_auth)) -> dict:
 
 
 @router.post("/score", response_model=RiskResponse)
-def score(req: RiskRequest, request: Request, principal: Principal = Depends(_auth)) -> RiskResponse:
+def score(req: RiskRequest, request: Request, principal: Principal = Depends(_auth)) -> Response:
     require_write(principal)
 
     request_id = getattr(request.state, "request_id", "unknown")
+    sm = _model().current()
+    art = sm.art
     t = LogTimer()
-    log = with_ctx(logger, {"request_id": request_id, "endpoint": "score", "model_version": ART.metrics.get("training_date")})
+    log = with_ctx(
+        logger,
+        {
+            "request_id": request_id,
+            "endpoint": "score",
+            "model_version": art.metrics.get("training_date"),
+        },
+    )
 
     payload = req.model_dump()
 
-    prob = predict_probability(ART.model, payload, ART.feature_list)
-    label = "high_risk" if prob >= float(ART.metrics.get("thresholds", {}).get("review", SETTINGS.review_threshold)) else "low_risk"
+    t_model = time.perf_counter()
+    if sm.batcher is not None:
+        with stage("predict"):
+            prob = sm.batcher.submit(features_matrix([payload], art.feature_list)[0])
+    else:
+        prob = predict_probability(art.model, payload, art.feature_list, art.kernel)
+    model_ms = (time.perf_counter() - t_model) * 1000.0
+    label = (
+        "high_risk"
+        if prob >= float(art.metrics.get("thresholds", {}).get("review", SETTINGS.review_threshold))
+        else "low_risk"
+    )
     decision = decision_from_prob(prob)
     exp_loss = expected_loss_usd(prob, payload)
 
     warnings = []
-    warnings += ood_warnings(payload, ART.stats_means, ART.stats_stds, SETTINGS.drift_z_threshold)
-    update_drift_stats(principal.api_key, payload, ART.feature_list)
-    warnings += drift_warnings(principal.api_key, ART.stats_means, ART.stats_stds, ART.feature_list)
+    warnings += ood_warnings(payload, art.stats_means, art.stats_stds, SETTINGS.drift_z_threshold)
+    update_drift_stats(principal.api_key, payload, art.feature_list)
+    warnings += drift_warnings(principal.api_key, art.stats_means, art.stats_stds, art.feature_list)
 
     reasons = merge_reason_codes(None, payload)
 
@@ -77,39 +287,132 @@ def score(req: RiskRequest, request: Request, principal: Principal = Depends(_au
         risk_label=label,  # type: ignore
         decision=decision,  # type: ignore
         expected_loss_usd=float(exp_loss),
-        model_version=str(ART.metrics.get("training_date", "unknown")),
+        model_version=str(art.metrics.get("training_date", "unknown")),
         warnings=warnings,
         reason_codes=reasons,
-        calibration_snapshot=calibration_snapshot(ART.metrics),
+        calibration_snapshot=calibration_snapshot(art.metrics),
     )
 
-    log.info("scored", extra={"ctx": {"request_id": request_id, "latency_ms": t.ms(), "risk_probability_event": float(prob), "decision": decision}})
-    return resp
+    if SHADOW is not None:
+        SHADOW.submit(
+            features_matrix([payload], art.feature_list)[0], prob, art.model_version, model_ms
+        )
 
+    out = _json_response(resp)
+    log.info(
+        "scored",
+        extra={
+            "ctx": {
+                "request_id": request_id,
+                "latency_ms": t.ms(),
+                "risk_probability_event": float(prob),
+                "decision": decision,
+            }
+        },
+    )
+    return out
 
-@router.post("/explain", response_model=ExplainResponse)
-def explain(req: RiskRequest, request: Request, principal: Principal = Depends(_auth)) -> ExplainResponse:
+
+@router.post("/score/batch", response_model=BatchRiskResponse)
+@router.post("/batch-score", response_model=BatchRiskResponse, include_in_schema=False)
+def score_batch(
+    req: BatchRiskRequest, request: Request, principal: Principal = Depends(_auth)
+) -> Response:
     require_write(principal)
 
     request_id = getattr(request.state, "request_id", "unknown")
+    sm = _model().current()
+    art = sm.art
     t = LogTimer()
-    log = with_ctx(logger, {"request_id": request_id, "endpoint": "explain", "model_version": ART.metrics.get("training_date")})
+    log = with_ctx(
+        logger,
+        {
+            "request_id": request_id,
+            "endpoint": "score_batch",
+            "model_version": art.metrics.get("training_date"),
+        },
+    )
 
-    payload = req.model_dump()
+    payloads = [item.model_dump() for item in req.items]
+
+    # one vectorized model call and vectorized decisioning for the whole batch
+    X = features_matrix(payloads, art.feature_list)
+    with stage("predict_batch"):
+        probs = predict_matrix(art.model, X, art.feature_list, art.kernel)
+    review_t = float(art.metrics.get("thresholds", {}).get("review", SETTINGS.review_threshold))
+    decisions = decisions_from_probs(probs)
+    losses = expected_losses_usd(probs, X[:, art.feature_list.index("avg_txn_amount_30d")])
+    reason_codes = reason_codes_from_masks(rule_reason_masks(X, art.feature_list))
+    model_version = str(art.metrics.get("training_date", "unknown"))
+    snapshot = calibration_snapshot(art.metrics)
+
+    for payload in payloads:
+        update_drift_stats(principal.api_key, payload, art.feature_list)
+    # drift verdicts are per api key, so read them once for the batch
+    batch_drift = drift_warnings(
+        principal.api_key, art.stats_means, art.stats_stds, art.feature_list
+    )
 
-    prob = predict_probability(ART.model, payload, ART.feature_list)
-    label = "high_risk" if prob >= float(ART.metrics.get("thresholds", {}).get("review", SETTINGS.review_threshold)) else "low_risk"
-    decision = decision_from_prob(prob)
-    exp_loss = expected_loss_usd(prob, payload)
+    results = []
+    for i, payload in enumerate(payloads):
+        prob = float(probs[i])
+        warnings = (
+            ood_warnings(payload, art.stats_means, art.stats_stds, SETTINGS.drift_z_threshold)
+            + batch_drift
+        )
+        results.append(
+            RiskResponse(
+                risk_probability_event=prob,
+                risk_label="high_risk" if prob >= review_t else "low_risk",
+                decision=decisions[i],  # type: ignore
+                expected_loss_usd=float(losses[i]),
+                model_version=model_version,
+                warnings=warnings,
+                reason_codes=list(reason_codes[i]),
+                calibration_snapshot=snapshot,
+            )
+        )
+
+    out = _json_response(
+        BatchRiskResponse(count=len(results), model_version=model_version, results=results)
+    )
+    log.info(
+        "batch_scored",
+        extra={"ctx": {"request_id": request_id, "latency_ms": t.ms(), "count": len(results)}},
+    )
+    return out
+
+
+def _explain_context(art: LoadedArtifacts, payload: dict, principal: Principal) -> dict:
+    """
+    Scoring part of an explain response (cheap; always computed in the API process).
+    """
+    prob = predict_probability(art.model, payload, art.feature_list, art.kernel)
+    label = (
+        "high_risk"
+        if prob >= float(art.metrics.get("thresholds", {}).get("review", SETTINGS.review_threshold))
+        else "low_risk"
+    )
 
     warnings = []
-    warnings += ood_warnings(payload, ART.stats_means, ART.stats_stds, SETTINGS.drift_z_threshold)
-    update_drift_stats(principal.api_key, payload, ART.feature_list)
-    warnings += drift_warnings(principal.api_key, ART.stats_means, ART.stats_stds, ART.feature_list)
+    warnings += ood_warnings(payload, art.stats_means, art.stats_stds, SETTINGS.drift_z_threshold)
+    update_drift_stats(principal.api_key, payload, art.feature_list)
+    warnings += drift_warnings(principal.api_key, art.stats_means, art.stats_stds, art.feature_list)
+
+    return {
+        "api_key": principal.api_key,
+        "payload": payload,
+        "prob": float(prob),
+        "label": label,
+        "decision": decision_from_prob(prob),
+        "exp_loss": float(expected_loss_usd(prob, payload)),
+        "warnings": warnings,
+        "model_version": str(art.metrics.get("training_date", "unknown")),
+        "calibration_snapshot": calibration_snapshot(art.metrics),
+    }
 
-    x_row_df = normalize_features_ordered(payload, ART.feature_list)
-    local = explain_local(EXPLAINER, ART.model, x_row_df, ART.feature_list, top_k=6)
 
+def _explain_response(ctx: dict, local) -> ExplainResponse:
     top_features = [
         ExplainFeature(
             feature=item["feature"],
@@ -120,17 +423,17 @@ def explain(req: RiskRequest, request: Request, principal: Principal = Depends(_
         for item in local.top_features
     ]
 
-    reasons = merge_reason_codes([tf.model_dump() for tf in top_features], payload)
+    reasons = merge_reason_codes([tf.model_dump() for tf in top_features], ctx["payload"])
 
-    resp = ExplainResponse(
-        risk_probability_event=float(prob),
-        risk_label=label,  # type: ignore
-        decision=decision,  # type: ignore
-        expected_loss_usd=float(exp_loss),
-        model_version=str(ART.metrics.get("training_date", "unknown")),
-        warnings=warnings,
+    return ExplainResponse(
+        risk_probability_event=ctx["prob"],
+        risk_label=ctx["label"],  # type: ignore
+        decision=ctx["decision"],  # type: ignore
+        expected_loss_usd=ctx["exp_loss"],
+        model_version=ctx["model_version"],
+        warnings=ctx["warnings"],
         reason_codes=reasons,
-        calibration_snapshot=calibration_snapshot(ART.metrics),
+        calibration_snapshot=ctx["calibration_snapshot"],
         explanation=ExplainPayload(
             baseline_probability=float(local.baseline_probability),
             predicted_probability=float(local.predicted_probability),
@@ -138,110 +441,307 @@ def explain(req: RiskRequest, request: Request, principal: Principal = Depends(_
         ),
     )
 
-    log.info("explained", extra={"ctx": {"request_id": request_id, "latency_ms": t.ms(), "risk_probability_event": float(prob), "decision": decision}})
+
+def _job_status_url(job_id: str) -> str:
+    return f"/{SETTINGS.api_version}/explain/jobs/{job_id}"
+
+
+def _submit_explain_job(payload: dict, ctx: dict) -> str:
+    try:
+        return EXPLAIN_JOBS.submit(payload, ctx, model_version=ctx["model_version"])
+    except ExplainQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"error": "explain_queue_full", "message": str(e), "retry_after_seconds": 1},
+            headers={"Retry-After": "1"},
+        ) from e
+
+
+@router.post(
+    "/explain", response_model=ExplainResponse, responses={202: {"model": ExplainJobResponse}}
+)
+def explain(req: RiskRequest, request: Request, principal: Principal = Depends(_auth)) -> Response:
+    require_write(principal)
+
+    request_id = getattr(request.state, "request_id", "unknown")
+    sm = _model().current()
+    art = sm.art
+    t = LogTimer()
+    log = with_ctx(
+        logger,
+        {
+            "request_id": request_id,
+            "endpoint": "explain",
+            "model_version": art.metrics.get("training_date"),
+        },
+    )
+
+    payload = req.model_dump()
+    ctx = _explain_context(art, payload, principal)
+
+    x_row = features_matrix([payload], art.feature_list)[0]
+    with stage("explain_cache"):
+        local = (
+            EXPLAIN_CACHE.get(ctx["model_version"], x_row) if EXPLAIN_CACHE is not None else None
+        )
+    if local is None:
+        if SETTINGS.explain_sync_timeout_s > 0:
+            # explain off-process; past the timeout hand the caller a job to poll
+            job_id = _submit_explain_job(payload, ctx)
+            try:
+                local = EXPLAIN_JOBS.wait(job_id, SETTINGS.explain_sync_timeout_s)
+            except RuntimeError as e:
+                log.info(
+                    "explain_failed",
+                    extra={
+                        "ctx": {
+                            "request_id": request_id,
+                            "latency_ms": t.ms(),
+                            "job_id": job_id,
+                            "err": str(e),
+                        }
+                    },
+                )
+                raise HTTPException(
+                    status_code=500, detail={"error": "explain_failed", "message": str(e)}
+                ) from e
+            if local is None:
+                url = _job_status_url(job_id)
+                log.info(
+                    "explain_deferred",
+                    extra={
+                        "ctx": {"request_id": request_id, "latency_ms": t.ms(), "job_id": job_id}
+                    },
+                )
+                return JSONResponse(
+                    status_code=202,
+                    content=ExplainJobResponse(
+                        job_id=job_id, status="running", status_url=url
+                    ).model_dump(),
+                    headers={"Location": url},
+                )
+        else:
+            x_row_df = normalize_features_ordered(payload, art.feature_list)
+            local = explain_local(sm.explainer, art.model, x_row_df, art.feature_list, top_k=6)
+        if EXPLAIN_CACHE is not None:
+            EXPLAIN_CACHE.put(ctx["model_version"], x_row, local)
+
+    resp = _json_response(_explain_response(ctx, local))
+
+    log.info(
+        "explained",
+        extra={
+            "ctx": {
+                "request_id": request_id,
+                "latency_ms": t.ms(),
+                "risk_probability_event": ctx["prob"],
+                "decision": ctx["decision"],
+            }
+        },
+    )
     return resp
 
 
+@router.post("/explain/jobs", response_model=ExplainJobResponse, status_code=202)
+def submit_explain_job(
+    req: RiskRequest, request: Request, principal: Principal = Depends(_auth)
+) -> JSONResponse:
+    require_write(principal)
+
+    payload = req.model_dump()
+    job_id = _submit_explain_job(
+        payload, _explain_context(_model().current().art, payload, principal)
+    )
+    url = _job_status_url(job_id)
+    return JSONResponse(
+        status_code=202,
+        content=ExplainJobResponse(job_id=job_id, status="queued", status_url=url).model_dump(),
+        headers={"Location": url},
+    )
+
+
+@router.get("/explain/jobs/{job_id}", response_model=ExplainJobResponse)
+def get_explain_job(
+    job_id: str, request: Request, principal: Principal = Depends(_auth)
+) -> ExplainJobResponse:
+    job = EXPLAIN_JOBS.get(job_id)
+    if job is None or job["context"].get("api_key") != principal.api_key:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "not_found", "message": f"Unknown or expired job: {job_id}"},
+        )
+
+    result = _explain_response(job["context"], job["result"]) if job["status"] == "done" else None
+    return ExplainJobResponse(
+        job_id=job_id,
+        status=job["status"],
+        status_url=_job_status_url(job_id),
+        result=result,
+        error=job["error"],
+    )
+
+
 @router.get("/global-explain", response_model=GlobalExplainResponse)
-def global_explain(request: Request, principal: Principal = Depends(_auth), save_plot: bool = True) -> GlobalExplainResponse:
+def global_explain(
+    request: Request, principal: Principal = Depends(_auth), save_plot: bool = True
+) -> GlobalExplainResponse:
     """
-    Production-style:
-    - cache global explain result to artifacts/latest/global_explain_cached.json
-    - use safe Kernel SHAP with small nsamples/max_rows
-    - fallback to permutation importance if SHAP fails
+    Serves the global explanation for the loaded model:
+    - entries are keyed by model version + model content hash (never served across models)
+    - normally precomputed by training (global_explain.json + plot in the artifacts dir)
+    - otherwise recomputed in the background into GLOBAL_EXPLAIN_CACHE_DIR; answers
+      503 + Retry-After if that takes longer than GLOBAL_EXPLAIN_WAIT_S
     """
-    cache_path = ART.artifacts_dir / "global_explain_cached.json"
-    if cache_path.exists():
+    sm = _model().current()
+    art = sm.art
+    version = art.model_version
+    key = cache_key(version, art.model_sha256)
+    entry = GLOBAL_EXPLAIN.get(key)
+    if entry is None:
+        entry = read_global_artifact(
+            art.artifacts_dir, version, art.model_sha256
+        ) or read_global_artifact(
+            global_cache_dir(SETTINGS.global_explain_cache_dir, version, art.model_sha256),
+            version,
+            art.model_sha256,
+        )
+        if entry is not None:
+            GLOBAL_EXPLAIN.put(key, entry)
+    if entry is None:
+        fut = GLOBAL_EXPLAIN.ensure(key, lambda: _compute_global_entry(sm))
         try:
-            import json
-            cached = json.loads(cache_path.read_text(encoding="utf-8"))
-            items = cached.get("items", [])
-            resp_items = [
-                GlobalExplainItem(
-                    feature=i["feature"],
-                    mean_abs_shap=float(i["mean_abs_shap"]),
-                    importance_percent=float(i["importance_percent"]),
-                )
-                for i in items
-            ]
-            return GlobalExplainResponse(
-                model_version=str(ART.metrics.get("training_date", "unknown")),
-                items=resp_items,
-                plot_path=cached.get("plot_path"),
+            entry = GLOBAL_EXPLAIN.wait(fut, SETTINGS.global_explain_wait_s)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail={"error": "global_explain_failed", "message": str(e)}
+            ) from e
+        if entry is None:
+            raise HTTPException(
+                status_code=503,
+                detail={
+                    "error": "global_explain_pending",
+                    "message": "Global explanation is being computed",
+                    "retry_after_seconds": 5,
+                },
+                headers={"Retry-After": "5"},
             )
-        except Exception:
-            # ignore cache parse errors
-            pass
 
-    sample_df = joblib.load(ART.artifacts_dir / SETTINGS.global_shap_sample_filename)
+    plot_path = entry.get("plot_path") if save_plot else None
 
-    # robust explainer call (never throws due to fallback)
-    items, method = explain_global(EXPLAINER, ART.model, sample_df, ART.feature_list, max_rows=80)
-
-    plot_path = None
-    if save_plot:
-        try:
-            import matplotlib.pyplot as plt
-            top = items[:10]
-            labels = [d["feature"] for d in top]
-            values = [d["mean_abs_shap"] for d in top]
-            plt.figure(figsize=(8, 4))
-            plt.barh(list(reversed(labels)), list(reversed(values)))
-            plt.title(f"Global Feature Importance ({method})")
-            plt.xlabel("importance")
-            plt.tight_layout()
-            out = ART.artifacts_dir / "global_shap_importance.png"
-            plt.savefig(out)
-            plt.close()
-            plot_path = str(out)
-        except Exception:
-            plot_path = None
+    return GlobalExplainResponse(
+        model_version=version,
+        items=[
+            GlobalExplainItem(
+                feature=d["feature"],
+                mean_abs_shap=float(d["mean_abs_shap"]),
+                importance_percent=float(d["importance_percent"]),
+            )
+            for d in entry.get("items", [])
+        ],
+        plot_path=plot_path,
+    )
 
-    resp_items = [
-        GlobalExplainItem(
-            feature=d["feature"],
-            mean_abs_shap=float(d["mean_abs_shap"]),
-            importance_percent=float(d["importance_percent"]),
-        )
-        for d in items
-    ]
 
-    # cache for next time
+def _compute_global_entry(sm: ServingModel) -> dict:
+    art = sm.art
+    sample_df = art.global_sample_df()
+    out_dir = global_cache_dir(
+        SETTINGS.global_explain_cache_dir, art.model_version, art.model_sha256
+    )
     try:
-        import json
-        cache_path.write_text(
-            json.dumps({"items": items, "plot_path": plot_path, "method": method}, indent=2),
-            encoding="utf-8",
+        out_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.info(
+            "global_explain_cache_dir_failed", extra={"ctx": {"dir": str(out_dir), "err": str(e)}}
         )
-    except Exception:
-        pass
-
-    return GlobalExplainResponse(
-        model_version=str(ART.metrics.get("training_date", "unknown")),
-        items=resp_items,
-        plot_path=plot_path,
+        out_dir = None
+    return compute_global_explanation(
+        sm.explainer,
+        art.model,
+        sample_df,
+        art.feature_list,
+        art.model_version,
+        art.model_sha256,
+        out_dir=out_dir,
+        jobs=EXPLAIN_JOBS,
+        shards=SETTINGS.global_explain_shards,
+        seed=SETTINGS.global_explain_seed,
     )
 
 
 @router.get("/model-info", response_model=ModelInfo)
 def model_info(request: Request, principal: Principal = Depends(_auth)) -> ModelInfo:
-    limitations = (ART.metrics.get("limitations", "") + "\n\n" + ART.model_card.strip())[:8000]
+    art = _model().current().art
+    limitations = (art.metrics.get("limitations", "") + "\n\n" + art.model_card.strip())[:8000]
     return ModelInfo(
-        training_date=str(ART.metrics.get("training_date", "unknown")),
-        model_type=str(ART.metrics.get("model_type", "unknown")),
-        model_version=str(ART.metrics.get("training_date", "unknown")),
-        metrics=ART.metrics,
-        feature_list=ART.feature_list,
-        thresholds=ART.metrics.get("thresholds", {}),
+        training_date=str(art.metrics.get("training_date", "unknown")),
+        model_type=str(art.metrics.get("model_type", "unknown")),
+        model_version=str(art.metrics.get("training_date", "unknown")),
+        metrics=art.metrics,
+        feature_list=art.feature_list,
+        thresholds=art.metrics.get("thresholds", {}),
         limitations=limitations,
-        fairness_report=ART.fairness_report or None,
+        fairness_report=art.fairness_report or None,
     )
 
 
 @router.get("/monitor/drift", response_model=DriftResponse)
 def monitor_drift(request: Request, principal: Principal = Depends(_auth)) -> DriftResponse:
-    s = drift_summary(principal.api_key, ART.stats_means, ART.stats_stds, ART.feature_list)
-    return DriftResponse(api_key=principal.api_key, threshold=float(s.get("threshold", SETTINGS.drift_z_threshold)), features=s.get("features", []))
+    art = _model().current().art
+    s = drift_summary(principal.api_key, art.stats_means, art.stats_stds, art.feature_list)
+    return DriftResponse(
+        api_key=principal.api_key,
+        threshold=float(s.get("threshold", SETTINGS.drift_z_threshold)),
+        features=s.get("features", []),
+    )
+
+
+@router.get("/monitor/drift/cache")
+def monitor_drift_cache(request: Request, principal: Principal = Depends(_auth)) -> dict:
+    cache = get_verdict_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/monitor/explain-cache")
+def monitor_explain_cache(request: Request, principal: Principal = Depends(_auth)) -> dict:
+    _model()
+    if EXPLAIN_CACHE is None:
+        return {"enabled": False}
+    return {"enabled": True, **EXPLAIN_CACHE.stats()}
+
+
+@router.get("/monitor/global-explain")
+def monitor_global_explain(request: Request, principal: Principal = Depends(_auth)) -> dict:
+    art = _model().current().art
+    return {"key": cache_key(art.model_version, art.model_sha256), **GLOBAL_EXPLAIN.stats()}
+
+
+@router.get("/monitor/model")
+def monitor_model(request: Request, principal: Principal = Depends(_auth)) -> dict:
+    return _model().stats()
+
+
+@router.get("/monitor/shadow")
+def monitor_shadow(request: Request, principal: Principal = Depends(_auth)) -> dict:
+    _model()
+    if SHADOW is None:
+        return {"enabled": False}
+    return {"enabled": True, "champion_version": _model().current().version, **SHADOW.stats()}
+
+
+@router.get("/monitor/explain-jobs")
+def monitor_explain_jobs(request: Request, principal: Principal = Depends(_auth)) -> dict:
+    return {"sync_timeout_s": SETTINGS.explain_sync_timeout_s, **EXPLAIN_JOBS.stats()}
+
+
+@router.get("/monitor/batching")
+def monitor_batching(request: Request, principal: Principal = Depends(_auth)) -> dict:
+    batcher = _model().current().batcher
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
 
 
 @router.get("/admin/registry")
@@ -251,7 +751,12 @@ def admin_registry(request: Request, principal: Principal = Depends(_auth)) -> d
 
 
 @router.post("/admin/promote")
-def admin_promote(version: str, promoted_by: str = "demo", request: Request = None, principal: Principal = Depends(_auth)) -> dict:
+def admin_promote(
+    version: str,
+    promoted_by: str = "demo",
+    request: Request = None,
+    principal: Principal = Depends(_auth),
+) -> dict:
     require_admin(principal)
     require_write(principal)
 
@@ -259,4 +764,19 @@ def admin_promote(version: str, promoted_by: str = "demo", request: Request = No
         promote(version=version, promoted_by=promoted_by)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail={"error": "not_found", "message": str(e)})
-    return {"status": "ok", "latest": version, "promoted_by": promoted_by}
+
+    # load + warm the promoted version in the background; traffic keeps flowing on the old one
+    _model().reload_async("promote")
+    return {
+        "status": "ok",
+        "latest": version,
+        "promoted_by": promoted_by,
+        "reload": "scheduled",
+        "serving_version": _model().current().version,
+    }
+
+
+@router.post("/admin/reload")
+def admin_reload(request: Request, principal: Principal = Depends(_auth)) -> dict:
+    require_admin(principal)
+    return _model().reload_async("admin").result(timeout=300)
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import json
+import os
+import signal
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Tuple, Union
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 from fastapi import Header, HTTPException
 
+from src.common.logging import get_logger
 from src.common.settings import SETTINGS
 
+logger = get_logger("auth")
+
 
 @dataclass(frozen=True)
 class Principal:
@@ -28,10 +37,6 @@ class Principal:
         }
 
 
-def _now_utc() -> datetime:
-    return datetime.now(timezone.utc)
-
-
 def _parse_expires(expires_at: Optional[str]) -> Optional[datetime]:
     if not expires_at:
         return None
@@ -44,16 +49,46 @@ def _parse_expires(expires_at: Optional[str]) -> Optional[datetime]:
     return datetime.fromisoformat(s).astimezone(timezone.utc)
 
 
-def _load_key_map() -> Dict[str, Dict[str, Any]]:
+def _parse_key_json(raw_json: str, out: Dict[str, Dict[str, Any]]) -> None:
+    try:
+        raw = json.loads(raw_json)
+        if isinstance(raw, dict):
+            for k, v in raw.items():
+                if isinstance(v, int):
+                    # Backwards compatible: {"key": 60}
+                    out[str(k)] = {
+                        "rpm": int(v),
+                        "role": "analyst",
+                        "read_only": False,
+                        "expires_at": None,
+                    }
+                elif isinstance(v, dict):
+                    out[str(k)] = {
+                        "rpm": int(v.get("rpm", SETTINGS.default_rpm)),
+                        "role": str(v.get("role", "analyst")),
+                        "read_only": bool(v.get("read_only", False)),
+                        "expires_at": v.get("expires_at", None),
+                    }
+    except Exception:
+        # If malformed, ignore it (but keep single-key if present)
+        pass
+
+
+def _load_key_map(
+    demo_api_key: str = SETTINGS.demo_api_key,
+    demo_api_keys_json: str = SETTINGS.demo_api_keys_json,
+    keys_file: Optional[Path] = None,
+) -> Dict[str, Dict[str, Any]]:
     """
     Returns a dict:
       api_key -> {rpm, role, read_only, expires_at}
+    Later sources win: DEMO_API_KEY, then DEMO_API_KEYS_JSON, then DEMO_API_KEYS_FILE.
     """
     out: Dict[str, Dict[str, Any]] = {}
 
     # Single-key mode (admin, no expiry)
-    if SETTINGS.demo_api_key:
-        out[SETTINGS.demo_api_key] = {
+    if demo_api_key:
+        out[demo_api_key] = {
             "rpm": SETTINGS.default_rpm,
             "role": "admin",
             "read_only": False,
@@ -61,71 +96,152 @@ def _load_key_map() -> Dict[str, Dict[str, Any]]:
         }
 
     # Multi-key mode
-    if SETTINGS.demo_api_keys_json:
+    if demo_api_keys_json:
+        _parse_key_json(demo_api_keys_json, out)
+
+    if keys_file is not None and keys_file.exists():
+        _parse_key_json(keys_file.read_text(encoding="utf-8"), out)
+
+    return out
+
+
+# api_key -> (prebuilt Principal, expiry as epoch seconds or None)
+KeyIndex = Mapping[str, Tuple[Principal, Optional[float]]]
+
+
+def build_key_index(key_map: Dict[str, Dict[str, Any]]) -> KeyIndex:
+    """
+    Parses everything once: roles normalized, expiry converted to epoch seconds,
+    Principal objects prebuilt. Keys with unparseable expiry are dropped (fail closed).
+    """
+    index: Dict[str, Tuple[Principal, Optional[float]]] = {}
+    for api_key, meta in key_map.items():
+        role = str(meta.get("role", "analyst")).lower()
+        if role not in {"admin", "analyst", "viewer"}:
+            role = "analyst"
         try:
-            raw = json.loads(SETTINGS.demo_api_keys_json)
-            if isinstance(raw, dict):
-                for k, v in raw.items():
-                    if isinstance(v, int):
-                        # Backwards compatible: {"key": 60}
-                        out[str(k)] = {"rpm": int(v), "role": "analyst", "read_only": False, "expires_at": None}
-                    elif isinstance(v, dict):
-                        out[str(k)] = {
-                            "rpm": int(v.get("rpm", SETTINGS.default_rpm)),
-                            "role": str(v.get("role", "analyst")),
-                            "read_only": bool(v.get("read_only", False)),
-                            "expires_at": v.get("expires_at", None),
-                        }
-        except Exception:
-            # If malformed, ignore it (but keep single-key if present)
+            exp_dt = _parse_expires(meta.get("expires_at"))
+        except ValueError:
+            logger.info("api_key_bad_expiry", extra={"ctx": {"api_key_suffix": api_key[-4:]}})
+            continue
+        principal = Principal(
+            api_key=api_key,
+            role=role,
+            rpm=int(meta.get("rpm", SETTINGS.default_rpm)),
+            read_only=bool(meta.get("read_only", False)),
+            expires_at=meta.get("expires_at"),
+        )
+        index[api_key] = (principal, exp_dt.timestamp() if exp_dt else None)
+    return MappingProxyType(index)
+
+
+def _keys_file() -> Optional[Path]:
+    return Path(SETTINGS.demo_api_keys_file) if SETTINGS.demo_api_keys_file else None
+
+
+_KEY_INDEX: KeyIndex = build_key_index(_load_key_map(keys_file=_keys_file()))
+_reload_lock = threading.Lock()
+
+
+def reload_key_index() -> int:
+    """
+    Rebuilds the index from DEMO_API_KEY/DEMO_API_KEYS_JSON and DEMO_API_KEYS_FILE and swaps
+    it in with a single reference assignment; in-flight lookups keep the old index.
+    """
+    global _KEY_INDEX
+    with _reload_lock:
+        index = build_key_index(_load_key_map(keys_file=_keys_file()))
+        _KEY_INDEX = index
+    logger.info("api_keys_reloaded", extra={"ctx": {"keys": len(index)}})
+    return len(index)
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _watch_keys_file(path: Path, interval_s: float, stop: threading.Event) -> None:
+    # seeded with the state the current index was built from: creating, changing or
+    # deleting the file after startup all trigger a reload
+    last = _mtime_ns(path)
+    while not stop.wait(interval_s):
+        mtime = _mtime_ns(path)
+        if mtime != last:
+            reload_key_index()
+            last = mtime
+
+
+def install_key_reload_triggers() -> Optional[threading.Event]:
+    """
+    SIGHUP -> reload (main thread only), plus an mtime poller on DEMO_API_KEYS_FILE.
+    Returns the poller's stop event (None when no poller runs). Called from the app's
+    lifespan hook, not at import.
+    """
+    if hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread():
+        try:
+            signal.signal(signal.SIGHUP, lambda signum, frame: reload_key_index())
+        except ValueError:
             pass
 
-    return out
+    path = _keys_file()
+    if path is None or SETTINGS.api_keys_reload_interval_s <= 0:
+        return None
+
+    stop = threading.Event()
+    threading.Thread(
+        target=_watch_keys_file,
+        args=(path, SETTINGS.api_keys_reload_interval_s, stop),
+        name="api-keys-watch",
+        daemon=True,
+    ).start()
+    return stop
 
 
 def require_principal(x_api_key: Optional[str] = Header(default=None)) -> Principal:
-    key_map = _load_key_map()
+    index = _KEY_INDEX
 
-    if not key_map:
+    if not index:
         raise HTTPException(
             status_code=500,
-            detail={"error": "server_misconfigured", "message": "No DEMO_API_KEY or DEMO_API_KEYS_JSON set"},
+            detail={
+                "error": "server_misconfigured",
+                "message": "No DEMO_API_KEY or DEMO_API_KEYS_JSON set",
+            },
         )
 
     if not x_api_key:
-        raise HTTPException(status_code=401, detail={"error": "unauthorized", "message": "Missing X-API-Key"})
-
-    if x_api_key not in key_map:
-        raise HTTPException(status_code=403, detail={"error": "forbidden", "message": "Invalid API key"})
-
-    meta = key_map[x_api_key]
-    expires_at = meta.get("expires_at")
-    exp_dt = _parse_expires(expires_at)
-
-    if exp_dt and _now_utc() >= exp_dt:
-        raise HTTPException(status_code=403, detail={"error": "forbidden", "message": "API key expired"})
+        raise HTTPException(
+            status_code=401, detail={"error": "unauthorized", "message": "Missing X-API-Key"}
+        )
 
-    role = str(meta.get("role", "analyst")).lower()
-    if role not in {"admin", "analyst", "viewer"}:
-        role = "analyst"
+    entry = index.get(x_api_key)
+    if entry is None:
+        raise HTTPException(
+            status_code=403, detail={"error": "forbidden", "message": "Invalid API key"}
+        )
 
-    rpm = int(meta.get("rpm", SETTINGS.default_rpm))
-    read_only = bool(meta.get("read_only", False))
+    principal, expires_epoch = entry
+    if expires_epoch is not None and time.time() >= expires_epoch:
+        raise HTTPException(
+            status_code=403, detail={"error": "forbidden", "message": "API key expired"}
+        )
 
-    return Principal(
-        api_key=x_api_key,
-        role=role,
-        rpm=rpm,
-        read_only=read_only,
-        expires_at=meta.get("expires_at"),
-    )
+    return principal
 
 
 def require_admin(principal: Principal) -> None:
     if principal.role != "admin":
-        raise HTTPException(status_code=403, detail={"error": "forbidden", "message": "Admin role required"})
+        raise HTTPException(
+            status_code=403, detail={"error": "forbidden", "message": "Admin role required"}
+        )
 
 
 def require_write(principal: Principal) -> None:
     if principal.read_only:
-        raise HTTPException(status_code=403, detail={"error": "forbidden", "message": "Read-only key: write actions blocked"})
+        raise HTTPException(
+            status_code=403,
+            detail={"error": "forbidden", "message": "Read-only key: write actions blocked"},
+        )
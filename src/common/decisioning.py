@@ -1,8 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
 from src.common.settings import SETTINGS
 
+DECISIONS = ("approve", "step_up", "review", "decline")
+RULE_CODES = (
+    "rule:new_account",
+    "rule:prior_chargeback",
+    "rule:high_merchant_risk",
+    "rule:intl_far_distance",
+    "rule:frequent_device_changes",
+)
+
 
 def expected_loss_usd(prob: float, payload: Dict[str, Any]) -> float:
     amt = float(payload.get("avg_txn_amount_30d", 0.0))
@@ -28,14 +40,71 @@ def rule_reason_codes(payload: Dict[str, Any]) -> List[str]:
         codes.append("rule:prior_chargeback")
     if float(payload.get("merchant_risk_score", 0)) > 0.75:
         codes.append("rule:high_merchant_risk")
-    if bool(payload.get("is_international", False)) and float(payload.get("geo_distance_from_last_txn_km", 0)) > 1000:
+    if (
+        bool(payload.get("is_international", False))
+        and float(payload.get("geo_distance_from_last_txn_km", 0)) > 1000
+    ):
         codes.append("rule:intl_far_distance")
     if int(payload.get("device_change_count_30d", 0)) >= 3:
         codes.append("rule:frequent_device_changes")
     return codes[:6]
 
 
-def merge_reason_codes(shap_top_features: List[Dict[str, Any]] | None, payload: Dict[str, Any]) -> List[str]:
+# ---- array versions: probs (n,), X (n, d) columnar features in feature_list order ----
+def decision_indices(probs: np.ndarray) -> np.ndarray:
+    """
+    Index into DECISIONS per row; one searchsorted over the thresholds (prob == threshold
+    falls in the higher band, as in decision_from_prob).
+    """
+    cuts = np.array(
+        [SETTINGS.stepup_threshold, SETTINGS.review_threshold, SETTINGS.decline_threshold]
+    )
+    return np.searchsorted(cuts, np.asarray(probs, dtype=float), side="right")
+
+
+def decisions_from_probs(probs: np.ndarray) -> np.ndarray:
+    return np.array(DECISIONS, dtype=object)[decision_indices(probs)]
+
+
+def expected_losses_usd(probs: np.ndarray, avg_txn_amount_30d: np.ndarray) -> np.ndarray:
+    return np.asarray(probs, dtype=float) * (
+        SETTINGS.loss_per_event_usd
+        + SETTINGS.loss_amt_multiplier * np.asarray(avg_txn_amount_30d, dtype=float)
+    )
+
+
+def rule_reason_masks(X: np.ndarray, feature_list: Sequence[str]) -> np.ndarray:
+    """
+    (n, len(RULE_CODES)) boolean matrix; column k is RULE_CODES[k].
+    """
+    col = {f: X[:, j] for j, f in enumerate(feature_list)}
+    masks = np.empty((X.shape[0], len(RULE_CODES)), dtype=bool)
+    masks[:, 0] = col["account_age_days"] < 30
+    masks[:, 1] = np.trunc(col["num_chargebacks_180d"]) > 0
+    masks[:, 2] = col["merchant_risk_score"] > 0.75
+    masks[:, 3] = (col["is_international"] != 0) & (col["geo_distance_from_last_txn_km"] > 1000)
+    masks[:, 4] = np.trunc(col["device_change_count_30d"]) >= 3
+    return masks
+
+
+def reason_codes_from_masks(masks: np.ndarray, sep: Optional[str] = None) -> np.ndarray:
+    """
+    Materialise rule masks into one object per row: a tuple of codes, or a sep-joined
+    string. Each row's bit pattern indexes a table of all 2**len(RULE_CODES) code
+    combinations, so no per-row string work is done.
+    """
+    k = masks.shape[1]
+    bits = masks.astype(np.int64) @ (1 << np.arange(k, dtype=np.int64))
+    lookup = np.empty(1 << k, dtype=object)
+    for p in range(1 << k):
+        codes = tuple(c for j, c in enumerate(RULE_CODES[:k]) if p >> j & 1)
+        lookup[p] = sep.join(codes) if sep is not None else codes
+    return lookup[bits]
+
+
+def merge_reason_codes(
+    shap_top_features: List[Dict[str, Any]] | None, payload: Dict[str, Any]
+) -> List[str]:
     codes: List[str] = []
     if shap_top_features:
         # top feature names become reason codes
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import atexit
 import math
+import threading
+import time
+from src.common.logging import get_logger
+from src.common.metrics import timed
 from src.common.redis_client import get_redis
 from src.common.settings import SETTINGS
 
+logger = get_logger("drift")
+
+Aggregate = Tuple[int, float, float]  # (n, mean, m2)
+
 
 def _welford_update(n: int, mean: float, m2: float, x: float):
     n2 = n + 1
@@ -15,46 +24,262 @@ def _welford_update(n: int, mean: float, m2: float, x: float):
     return n2, mean2, m2_2
 
 
+def _merge_aggregates(a: Aggregate, b: Aggregate) -> Aggregate:
+    """
+    Parallel-variance combination (Chan et al.) of two (n, mean, m2) aggregates.
+    """
+    na, ma, m2a = a
+    nb, mb, m2b = b
+    n = na + nb
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mb - ma
+    return n, ma + delta * nb / n, m2a + m2b + delta * delta * na * nb / n
+
+
+DRIFT_TTL_SECONDS = 60 * 60 * 24 * 14  # 14 days
+
+# Atomic merge of per-feature (n, mean, m2) aggregates into one hash per api key:
+#   KEYS[1] = drift:{api_key}
+#   ARGV    = ttl, then repeated (feature, n_b, mean_b, m2_b)
+# Uses the parallel-variance combination (Chan et al.); a single observation x is the
+# aggregate (1, x, 0), for which this reduces exactly to the Welford update.
+_MERGE_LUA = """
+local key = KEYS[1]
+local out = {}
+for i = 2, #ARGV, 4 do
+  local f = ARGV[i]
+  local nb = tonumber(ARGV[i + 1])
+  local mb = tonumber(ARGV[i + 2])
+  local m2b = tonumber(ARGV[i + 3])
+  local cur = redis.call('HMGET', key, f .. ':n', f .. ':mean', f .. ':m2')
+  local na = tonumber(cur[1]) or 0
+  local ma = tonumber(cur[2]) or 0
+  local m2a = tonumber(cur[3]) or 0
+  local n = na + nb
+  if n > 0 then
+    local delta = mb - ma
+    local mean = ma + delta * nb / n
+    local m2 = m2a + m2b + delta * delta * na * nb / n
+    table.insert(out, f .. ':n')
+    table.insert(out, string.format('%d', n))
+    table.insert(out, f .. ':mean')
+    table.insert(out, string.format('%.17g', mean))
+    table.insert(out, f .. ':m2')
+    table.insert(out, string.format('%.17g', m2))
+  end
+end
+if #out > 0 then
+  redis.call('HSET', key, unpack(out))
+  redis.call('EXPIRE', key, tonumber(ARGV[1]))
+end
+return #out / 6
+"""
+
+_merge_scripts: Dict[int, Any] = {}
+
+
+def _drift_key(api_key: str) -> str:
+    return f"drift:{api_key}"
+
+
+def _merge_script(r):
+    # register once per client; redis-py retries EVALSHA -> EVAL on NOSCRIPT
+    script = _merge_scripts.get(id(r))
+    if script is None:
+        script = r.register_script(_MERGE_LUA)
+        _merge_scripts[id(r)] = script
+    return script
+
+
+def _as_float(x: Any) -> float:
+    if isinstance(x, bool):
+        return 1.0 if x else 0.0
+    return float(x)
+
+
+@timed("drift_redis_write")
+def _merge_into_redis(r, api_key: str, aggregates: Dict[str, Aggregate]) -> None:
+    args: List[Any] = [DRIFT_TTL_SECONDS]
+    for f, (n, mean, m2) in aggregates.items():
+        if n > 0:
+            args += [f, n, repr(float(mean)), repr(float(m2))]
+    if len(args) == 1:
+        return
+    # one round trip, atomic across concurrent workers
+    _merge_script(r)(keys=[_drift_key(api_key)], args=args)
+
+
+class DriftAccumulator:
+    """
+    Per-worker (api_key, feature) Welford state, kept off the request path.
+
+    A daemon thread periodically swaps out the pending aggregates and merges them into
+    Redis with the atomic Chan merge script, so partial aggregates from any number of
+    workers combine exactly. Aggregates that fail to flush are merged back and retried.
+    Memory is O(api keys x features), independent of traffic.
+    """
+
+    def __init__(self, flush_interval_s: float) -> None:
+        self.flush_interval_s = float(flush_interval_s)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # held while one key's merge lands in Redis and leaves _flushing (never taken by add())
+        self._apply_lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Aggregate]] = {}
+        self._flushing: Dict[str, Dict[str, Aggregate]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, api_key: str, payload: Dict[str, Any], feature_list: List[str]) -> None:
+        with self._lock:
+            acc = self._pending.setdefault(api_key, {})
+            for f in feature_list:
+                x = payload.get(f)
+                if x is None:
+                    continue
+                acc[f] = _welford_update(*acc.get(f, (0, 0.0, 0.0)), _as_float(x))
+
+    def local_view(self, api_key: str) -> Dict[str, Aggregate]:
+        """
+        Unflushed aggregates for api_key (pending + currently being flushed).
+        """
+        with self._lock:
+            out = dict(self._flushing.get(api_key, {}))
+            for f, agg in self._pending.get(api_key, {}).items():
+                out[f] = _merge_aggregates(out.get(f, (0, 0.0, 0.0)), agg)
+        return out
+
+    def read_merged(
+        self, api_key: str, read_stored: Callable[[], Any]
+    ) -> Tuple[Any, Dict[str, Aggregate]]:
+        """
+        read_stored() (the Redis aggregates) and local_view(api_key), with no flush landing
+        in between, so every sample is counted exactly once.
+        """
+        with self._apply_lock:
+            return read_stored(), self.local_view(api_key)
+
+    def flush(self) -> int:
+        """
+        Merges all pending aggregates into Redis. Returns the number of api keys flushed.
+        """
+        r = get_redis()
+        if r is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._pending = self._pending, {}
+            batch = self._flushing
+            flushed = 0
+            failed: Dict[str, Dict[str, Aggregate]] = {}
+            for api_key, aggregates in list(batch.items()):
+                try:
+                    with self._apply_lock:
+                        _merge_into_redis(r, api_key, aggregates)
+                        with self._lock:
+                            batch.pop(api_key, None)
+                    flushed += 1
+                except Exception as e:
+                    failed[api_key] = aggregates
+                    logger.info("drift_flush_failed", extra={"ctx": {"err": str(e)}})
+            with self._lock:
+                for api_key, aggregates in failed.items():
+                    acc = self._pending.setdefault(api_key, {})
+                    for f, agg in aggregates.items():
+                        acc[f] = _merge_aggregates(agg, acc.get(f, (0, 0.0, 0.0)))
+                self._flushing = {}
+        return flushed
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="drift-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_s):
+            self.flush()
+
+
+_accumulator: Optional[DriftAccumulator] = None
+_init_lock = threading.Lock()
+
+
+def get_accumulator() -> Optional[DriftAccumulator]:
+    """
+    Process-wide accumulator, or None when DRIFT_FLUSH_INTERVAL_S <= 0 (write-through mode).
+    """
+    global _accumulator
+    if SETTINGS.drift_flush_interval_s <= 0:
+        return None
+    if _accumulator is None:
+        with _init_lock:
+            if _accumulator is None:
+                acc = DriftAccumulator(SETTINGS.drift_flush_interval_s)
+                acc.start()
+                _accumulator = acc
+    return _accumulator
+
+
+def flush_drift_stats() -> int:
+    acc = _accumulator
+    return acc.flush() if acc is not None else 0
+
+
+@timed("drift_update")
 def update_drift_stats(api_key: str, payload: Dict[str, Any], feature_list: List[str]) -> None:
+    acc = get_accumulator()
+    if acc is not None:
+        acc.add(api_key, payload, feature_list)
+        return
+
     r = get_redis()
     if r is None:
         return
+    aggregates = {
+        f: (1, _as_float(payload[f]), 0.0) for f in feature_list if payload.get(f) is not None
+    }
+    _merge_into_redis(r, api_key, aggregates)
 
-    prefix = f"drift:{api_key}"
-    for f in feature_list:
-        x = payload.get(f)
-        if x is None:
-            continue
-        if isinstance(x, bool):
-            x = 1.0 if x else 0.0
-        x = float(x)
-
-        # stored as hash: n, mean, m2
-        hkey = f"{prefix}:{f}"
-        data = r.hgetall(hkey) or {}
-        n = int(data.get("n", "0"))
-        mean = float(data.get("mean", "0"))
-        m2 = float(data.get("m2", "0"))
-
-        n2, mean2, m22 = _welford_update(n, mean, m2, x)
-        r.hset(hkey, mapping={"n": str(n2), "mean": str(mean2), "m2": str(m22)})
-        r.expire(hkey, 60 * 60 * 24 * 14)  # 14 days
-
-
-def drift_summary(api_key: str, train_means: Dict[str, float], train_stds: Dict[str, float], feature_list: List[str]) -> Dict[str, Any]:
+
+@timed("drift_redis_read")
+def _read_aggregates(r, api_key: str) -> Dict[str, Dict[str, float]]:
+    data = r.hgetall(_drift_key(api_key)) or {}
+    out: Dict[str, Dict[str, float]] = {}
+    for field, value in data.items():
+        f, _, stat = field.rpartition(":")
+        out.setdefault(f, {})[stat] = float(value)
+    return out
+
+
+def drift_summary(
+    api_key: str,
+    train_means: Dict[str, float],
+    train_stds: Dict[str, float],
+    feature_list: List[str],
+) -> Dict[str, Any]:
     r = get_redis()
     out = {"api_key": api_key, "features": [], "threshold": SETTINGS.drift_z_threshold}
     if r is None:
         out["status"] = "redis_unavailable"
         return out
 
-    prefix = f"drift:{api_key}"
+    acc = _accumulator
+    if acc is not None:
+        aggregates, local = acc.read_merged(api_key, lambda: _read_aggregates(r, api_key))
+    else:
+        aggregates, local = _read_aggregates(r, api_key), {}
     for f in feature_list:
-        hkey = f"{prefix}:{f}"
-        data = r.hgetall(hkey) or {}
-        n = int(data.get("n", "0"))
-        mean = float(data.get("mean", "0"))
-        m2 = float(data.get("m2", "0"))
+        data = aggregates.get(f, {})
+        stored = (int(data.get("n", 0)), float(data.get("mean", 0.0)), float(data.get("m2", 0.0)))
+        # merged view: what Redis has from all workers + this worker's unflushed part
+        n, mean, m2 = _merge_aggregates(stored, local.get(f, (0, 0.0, 0.0)))
         var = (m2 / (n - 1)) if n > 1 else 0.0
         std = math.sqrt(var) if var > 0 else 0.0
 
@@ -62,23 +287,182 @@ def drift_summary(api_key: str, train_means: Dict[str, float], train_stds: Dict[
         tsd = float(train_stds.get(f, 1.0)) if float(train_stds.get(f, 1.0)) > 1e-12 else 1.0
         z = (mean - tmu) / tsd
 
-        out["features"].append({
-            "feature": f,
-            "n": n,
-            "mean": mean,
-            "std": std,
-            "train_mean": tmu,
-            "train_std": float(train_stds.get(f, 0.0)),
-            "z_delta": z,
-            "drifted": abs(z) >= SETTINGS.drift_z_threshold and n >= 50,
-        })
+        out["features"].append(
+            {
+                "feature": f,
+                "n": n,
+                "mean": mean,
+                "std": std,
+                "train_mean": tmu,
+                "train_std": float(train_stds.get(f, 0.0)),
+                "z_delta": z,
+                "drifted": abs(z) >= SETTINGS.drift_z_threshold and n >= 50,
+            }
+        )
     return out
 
 
-def drift_warnings(api_key: str, train_means: Dict[str, float], train_stds: Dict[str, float], feature_list: List[str]) -> List[str]:
+def _compute_drift_warnings(
+    api_key: str,
+    train_means: Dict[str, float],
+    train_stds: Dict[str, float],
+    feature_list: List[str],
+) -> List[str]:
     s = drift_summary(api_key, train_means, train_stds, feature_list)
     warnings: List[str] = []
     for it in s.get("features", []):
         if it.get("drifted"):
-            warnings.append(f"drift_warning:{it['feature']}:z_delta={it['z_delta']:.2f} (threshold={SETTINGS.drift_z_threshold})")
+            warnings.append(
+                f"drift_warning:{it['feature']}:z_delta={it['z_delta']:.2f} (threshold={SETTINGS.drift_z_threshold})"
+            )
     return warnings
+
+
+class DriftVerdictCache:
+    """
+    Per-api-key drift warning lists, read from local memory on the request path.
+
+    A daemon thread recomputes entries older than ttl_s. A request only recomputes
+    synchronously on a cold key or when an entry is older than max_staleness_s (e.g. the
+    refresher is stuck behind a slow Redis). Keys idle for idle_evict_s are dropped.
+    """
+
+    def __init__(self, ttl_s: float, max_staleness_s: float, idle_evict_s: float = 600.0) -> None:
+        self.ttl_s = float(ttl_s)
+        self.max_staleness_s = max(float(max_staleness_s), self.ttl_s)
+        self.idle_evict_s = float(idle_evict_s)
+        self._lock = threading.Lock()
+        # api_key -> (computed_at, warnings, (train_means, train_stds, feature_list), last_access)
+        self._entries: Dict[str, Tuple[float, List[str], Tuple[Any, Any, Any], float]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(
+        self,
+        api_key: str,
+        train_means: Dict[str, float],
+        train_stds: Dict[str, float],
+        feature_list: List[str],
+    ) -> List[str]:
+        now = time.monotonic()
+        stats = (train_means, train_stds, feature_list)
+        with self._lock:
+            entry = self._entries.get(api_key)
+            # an entry computed against other training stats (a swapped model) is a miss
+            if entry is not None and now - entry[0] <= self.max_staleness_s and entry[2] == stats:
+                self._hits += 1
+                self._entries[api_key] = (entry[0], entry[1], entry[2], now)
+                return list(entry[1])
+            self._misses += 1
+
+        warnings = _compute_drift_warnings(api_key, train_means, train_stds, feature_list)
+        with self._lock:
+            self._entries[api_key] = (time.monotonic(), warnings, stats, now)
+        return list(warnings)
+
+    def refresh_due(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            for k in [k for k, e in self._entries.items() if now - e[3] > self.idle_evict_s]:
+                del self._entries[k]
+            due = [(k, e[2], e[3]) for k, e in self._entries.items() if now - e[0] >= self.ttl_s]
+
+        for api_key, (means, stds, features), last_access in due:
+            try:
+                warnings = _compute_drift_warnings(api_key, means, stds, features)
+            except Exception as e:
+                with self._lock:
+                    self._refresh_errors += 1
+                logger.info("drift_refresh_failed", extra={"ctx": {"err": str(e)}})
+                continue
+            with self._lock:
+                cur = self._entries.get(api_key)
+                if cur is not None and cur[2] != (means, stds, features):
+                    continue  # a request re-keyed the entry to new stats while we computed
+                self._entries[api_key] = (
+                    time.monotonic(),
+                    warnings,
+                    (means, stds, features),
+                    cur[3] if cur else last_access,
+                )
+                self._refreshes += 1
+        return len(due)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="drift-verdicts", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(max(self.ttl_s / 2.0, 0.05)):
+            self.refresh_due()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            total = self._hits + self._misses
+            ages = [now - e[0] for e in self._entries.values()]
+            return {
+                "ttl_s": self.ttl_s,
+                "max_staleness_s": self.max_staleness_s,
+                "keys": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / total) if total else 0.0,
+                "refreshes": self._refreshes,
+                "refresh_errors": self._refresh_errors,
+                "max_entry_age_s": max(ages) if ages else 0.0,
+            }
+
+
+_verdicts: Optional[DriftVerdictCache] = None
+
+
+def get_verdict_cache() -> Optional[DriftVerdictCache]:
+    """
+    Process-wide verdict cache, or None when DRIFT_CACHE_TTL_S <= 0 (read-through mode).
+    """
+    global _verdicts
+    if SETTINGS.drift_cache_ttl_s <= 0:
+        return None
+    if _verdicts is None:
+        with _init_lock:
+            if _verdicts is None:
+                cache = DriftVerdictCache(
+                    SETTINGS.drift_cache_ttl_s, SETTINGS.drift_cache_max_staleness_s
+                )
+                cache.start()
+                _verdicts = cache
+    return _verdicts
+
+
+def clear_verdict_cache() -> None:
+    """
+    Drops every cached verdict (e.g. after a model swap changed the training stats).
+    """
+    if _verdicts is not None:
+        _verdicts.clear()
+
+
+def drift_warnings(
+    api_key: str,
+    train_means: Dict[str, float],
+    train_stds: Dict[str, float],
+    feature_list: List[str],
+) -> List[str]:
+    cache = get_verdict_cache()
+    if cache is not None:
+        return cache.get(api_key, train_means, train_stds, feature_list)
+    return _compute_drift_warnings(api_key, train_means, train_stds, feature_list)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from src.common.settings import SETTINGS
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# seconds; Prometheus `le` upper bounds (+Inf is implicit)
+STAGE_BUCKETS: Tuple[float, ...] = (
+    5e-6,
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    2.5e-3,
+    5e-3,
+    1e-2,
+    2.5e-2,
+    5e-2,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+METRIC_PREFIX = "decision_engine"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus model. observe() is one bisect and
+    three increments under an uncontended lock.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...] = STAGE_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        i = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+_STAGES: Dict[str, Histogram] = {}
+_stages_lock = threading.Lock()
+
+
+def stage_histogram(name: str) -> Histogram:
+    h = _STAGES.get(name)
+    if h is None:
+        with _stages_lock:
+            h = _STAGES.setdefault(name, Histogram())
+    return h
+
+
+class _StageTimer:
+    __slots__ = ("_hist", "_t0")
+
+    def __init__(self, hist: Histogram) -> None:
+        self._hist = hist
+
+    def __enter__(self) -> "_StageTimer":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        self._hist.observe(time.perf_counter() - self._t0)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def stage(name: str) -> Any:
+    """
+    `with stage("predict"): ...` records the block's wall time (exceptions included)
+    in the stage's histogram. A no-op when STAGE_METRICS=0.
+    """
+    if not SETTINGS.stage_metrics:
+        return _NOOP
+    return _StageTimer(stage_histogram(name))
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Decorator form of stage().
+    """
+
+    def deco(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+def reset_stages() -> None:
+    with _stages_lock:
+        _STAGES.clear()
+
+
+def stage_summary() -> Dict[str, Dict[str, float]]:
+    out: Dict[str, Dict[str, float]] = {}
+    for name, h in sorted(_STAGES.items()):
+        _, total, count = h.snapshot()
+        out[name] = {
+            "count": count,
+            "sum_s": total,
+            "mean_us": (total / count * 1e6) if count else 0.0,
+        }
+    return out
+
+
+def _fmt(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+def render_prometheus(extra_gauges: Optional[Dict[str, float]] = None) -> str:
+    """
+    Prometheus text exposition format (version 0.0.4).
+    """
+    name = f"{METRIC_PREFIX}_stage_seconds"
+    lines = [
+        f"# HELP {name} Wall time of hot-path stages (auth, rate limit, validation, model, SHAP, drift I/O, serialization).",
+        f"# TYPE {name} histogram",
+    ]
+    for stage_name, h in sorted(_STAGES.items()):
+        counts, total, count = h.snapshot()
+        cumulative = 0
+        for bound, c in zip(list(h.bounds) + [float("inf")], counts, strict=True):
+            cumulative += c
+            lines.append(f'{name}_bucket{{stage="{stage_name}",le="{_fmt(bound)}"}} {cumulative}')
+        lines.append(f'{name}_sum{{stage="{stage_name}"}} {_fmt(total)}')
+        lines.append(f'{name}_count{{stage="{stage_name}"}} {count}')
+    for gauge, value in sorted((extra_gauges or {}).items()):
+        lines.append(f"# TYPE {METRIC_PREFIX}_{gauge} gauge")
+        lines.append(f"{METRIC_PREFIX}_{gauge} {_fmt(value)}")
+    return "\n".join(lines) + "\n"
@@ -1,15 +1,79 @@
 from __future__ import annotations
 
+import contextlib
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime, timezone
 import shutil
 
-from src.common.utils import read_json, write_json
+from src.common.logging import get_logger
+from src.common.utils import read_json, write_json_atomic
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore
+
+logger = get_logger("model_registry")
+
+
+def artifacts_root() -> Path:
+    return Path("artifacts")
 
 
 def registry_path() -> Path:
-    return Path("artifacts") / "registry.json"
+    return artifacts_root() / "registry.json"
+
+
+@contextlib.contextmanager
+def registry_lock(root: Optional[Path] = None) -> Iterator[None]:
+    """
+    Exclusive advisory lock serializing registry read-modify-write and promotions across
+    processes (artifacts/registry.lock). Readers never need it: every write is atomic.
+    """
+    root = root or artifacts_root()
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / "registry.lock", "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def point_latest(version_dir: Path, latest: Path) -> None:
+    """
+    Atomically repoints `latest` (a relative symlink) at an immutable version dir.
+
+    The new link is created under a temp name and renamed over the old one, so readers
+    always see either the old or the new version, never a missing or partial `latest`.
+    A legacy copied `latest` directory is moved aside once (to latest.legacy-<stamp>).
+    """
+    latest.parent.mkdir(parents=True, exist_ok=True)
+    target = os.path.relpath(version_dir, latest.parent)
+
+    if latest.is_dir() and not latest.is_symlink():
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        legacy = latest.with_name(f"{latest.name}.legacy-{stamp}")
+        latest.rename(legacy)
+        logger.info("latest_dir_migrated", extra={"ctx": {"legacy_dir": str(legacy)}})
+
+    tmp = latest.with_name(f".{latest.name}.tmp-{os.getpid()}")
+    try:
+        if tmp.is_symlink() or tmp.exists():
+            tmp.unlink()
+        os.symlink(target, tmp, target_is_directory=True)
+    except OSError as e:
+        # platforms without symlinks: fall back to a (non-atomic) copy
+        logger.info("latest_symlink_unavailable", extra={"ctx": {"err": str(e)}})
+        if latest.exists():
+            shutil.rmtree(latest)
+        shutil.copytree(version_dir, latest)
+        return
+    os.replace(tmp, latest)
 
 
 def load_registry() -> Dict[str, Any]:
@@ -20,42 +84,51 @@ def load_registry() -> Dict[str, Any]:
 
 
 def add_model(version_dir: str, metrics: Dict[str, Any]) -> None:
-    reg = load_registry()
-    models: List[Dict[str, Any]] = reg.get("models", [])
-    entry = {
-        "version": Path(version_dir).name,
-        "path": version_dir,
-        "training_date": metrics.get("training_date"),
-        "model_type": metrics.get("model_type"),
-        "metrics_summary": {
-            "auc_test": metrics.get("test", {}).get("auc"),
-            "brier_test": metrics.get("test", {}).get("brier"),
-        },
-        "promoted_by": None,
-        "promoted_at": None,
-    }
-    models.append(entry)
-    reg["models"] = models
-    if reg.get("latest") is None:
-        reg["latest"] = entry["version"]
-    write_json(registry_path(), reg)
+    with registry_lock():
+        reg = load_registry()
+        models: List[Dict[str, Any]] = reg.get("models", [])
+        entry = {
+            "version": Path(version_dir).name,
+            "path": version_dir,
+            "training_date": metrics.get("training_date"),
+            "model_type": metrics.get("model_type"),
+            "metrics_summary": {
+                "auc_test": metrics.get("test", {}).get("auc"),
+                "brier_test": metrics.get("test", {}).get("brier"),
+            },
+            "promoted_by": None,
+            "promoted_at": None,
+        }
+        models.append(entry)
+        reg["models"] = models
+        if reg.get("latest") is None:
+            reg["latest"] = entry["version"]
+        write_json_atomic(registry_path(), reg)
 
 
 def promote(version: str, promoted_by: str) -> None:
-    base = Path("artifacts")
+    """
+    O(1) promotion: repoints artifacts/latest at artifacts/<version> (see point_latest)
+    and records it in the registry, both under the registry lock.
+    """
+    base = artifacts_root()
     src = base / version
-    if not src.exists():
+    if (
+        not version
+        or version in (".", "..", "latest")
+        or os.sep in version
+        or "/" in version
+        or not src.is_dir()
+    ):
         raise FileNotFoundError(f"Unknown version dir: artifacts/{version}")
 
-    latest = base / "latest"
-    if latest.exists():
-        shutil.rmtree(latest)
-    shutil.copytree(src, latest)
-
-    reg = load_registry()
-    reg["latest"] = version
-    for m in reg.get("models", []):
-        if m.get("version") == version:
-            m["promoted_by"] = promoted_by
-            m["promoted_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-    write_json(registry_path(), reg)
+    with registry_lock():
+        point_latest(src, base / "latest")
+
+        reg = load_registry()
+        reg["latest"] = version
+        for m in reg.get("models", []):
+            if m.get("version") == version:
+                m["promoted_by"] = promoted_by
+                m["promoted_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        write_json_atomic(registry_path(), reg)
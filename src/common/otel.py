@@ -1,13 +1,6 @@
 from __future__ import annotations
 
 import os
-from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 
 
 def setup_otel(app, service_name: str) -> None:
@@ -16,7 +9,18 @@ def setup_otel(app, service_name: str) -> None:
     - Always creates a tracer provider
     - Exports to console by default
     - If OTEL_EXPORTER_OTLP_ENDPOINT is set, also exports OTLP
+    - OTEL_SDK_DISABLED=true skips it entirely (and never imports the SDK)
     """
+    if os.environ.get("OTEL_SDK_DISABLED", "").strip().lower() == "true":
+        return
+
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
     resource = Resource.create({"service.name": service_name})
 
     provider = TracerProvider(resource=resource)
@@ -1,32 +1,148 @@
 from __future__ import annotations
 
+import math
+import threading
 import time
+from typing import Any, Dict, Optional, Tuple
 from fastapi import HTTPException
 
 from src.common.redis_client import get_redis
 from src.common.auth import Principal
+from src.common.metrics import timed
+from src.common.settings import SETTINGS
 
+# GCRA (generic cell rate algorithm), one atomic round trip:
+#   KEYS[1] = rl:{api_key}   (stores the theoretical arrival time, TAT, in ms)
+#   ARGV[1] = emission interval T in ms (60000 / rpm)
+#   ARGV[2] = burst capacity C in tokens
+#   ARGV[3] = cost in tokens (1, or a lease slice)
+# A request of cost n is admitted iff max(TAT, now) + n*T - now <= C*T, so any interval
+# of length t admits at most C + t/T tokens. Returns {allowed, retry_after_ms}.
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local interval = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2]) * interval
+local cost = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local new_tat = tat + cost * interval
+local over = new_tat - now - capacity
+if over > 0 then
+  return {0, math.ceil(over)}
+end
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now) + 1000)
+return {1, 0}
+"""
 
-def check_rate_limit(principal: Principal) -> None:
+
+class RateLimiter:
     """
-    Redis-backed fixed-window rate limiter:
-      key: rl:{api_key}:{window_epoch_minute}
-      INCR + EXPIRE
+    Redis GCRA limiter with an optional per-worker lease mode.
+
+    Lease mode (lease_fraction > 0): instead of one Redis call per request, a worker
+    reserves a slice of the key's quota (lease_fraction * rpm tokens) in one GCRA call
+    and admits requests from that local bucket until it is empty or lease_ttl_s passes;
+    unused tokens are forfeited, never returned. Every admitted request was granted by
+    Redis, so the global bound holds across any number of workers.
+
+    Denials are remembered locally until their retry time, so a throttled key stops
+    costing Redis I/O.
     """
-    r = get_redis()
-    if r is None:
-        # If Redis isn't available, fail open (demo-friendly).
-        return
 
+    def __init__(
+        self, burst_fraction: float = 0.2, lease_fraction: float = 0.0, lease_ttl_s: float = 1.0
+    ) -> None:
+        self.burst_fraction = max(0.0, float(burst_fraction))
+        self.lease_fraction = max(0.0, float(lease_fraction))
+        self.lease_ttl_s = float(lease_ttl_s)
+        self._lock = threading.Lock()
+        self._leases: Dict[str, Tuple[int, float]] = {}  # api_key -> (tokens, expires_at)
+        self._blocked_until: Dict[str, float] = {}
+        self._scripts: Dict[int, Any] = {}
+        self.redis_calls = 0
+
+    def _script(self, r):
+        script = self._scripts.get(id(r))
+        if script is None:
+            script = r.register_script(_GCRA_LUA)
+            self._scripts[id(r)] = script
+        return script
+
+    @timed("rate_limit_redis")
+    def _gcra(self, r, api_key: str, rpm: int, cost: int) -> Tuple[bool, float]:
+        interval_ms = 60000.0 / rpm
+        capacity = max(1.0, self.burst_fraction * rpm)
+        with self._lock:
+            self.redis_calls += 1
+        allowed, retry_ms = self._script(r)(
+            keys=[f"rl:{api_key}"], args=[repr(interval_ms), repr(capacity), cost]
+        )
+        return bool(int(allowed)), float(retry_ms) / 1000.0
+
+    def acquire(self, api_key: str, rpm: int, r=None) -> Tuple[bool, float]:
+        """
+        Returns (allowed, retry_after_seconds).
+        """
+        r = r if r is not None else get_redis()
+        if r is None:
+            # If Redis isn't available, fail open (demo-friendly).
+            return True, 0.0
+
+        rpm = max(1, int(rpm))
+        now = time.monotonic()
+        with self._lock:
+            blocked = self._blocked_until.get(api_key)
+            if blocked is not None:
+                if now < blocked:
+                    return False, blocked - now
+                del self._blocked_until[api_key]
+            tokens, expires_at = self._leases.get(api_key, (0, 0.0))
+            if tokens > 0 and now < expires_at:
+                self._leases[api_key] = (tokens - 1, expires_at)
+                return True, 0.0
+
+        lease = int(self.lease_fraction * rpm)
+        if lease > 1:
+            allowed, _ = self._gcra(r, api_key, rpm, lease)
+            if allowed:
+                with self._lock:
+                    tokens, expires_at = self._leases.get(api_key, (0, 0.0))
+                    tokens = tokens if now < expires_at else 0
+                    self._leases[api_key] = (tokens + lease - 1, now + self.lease_ttl_s)
+                return True, 0.0
+
+        allowed, retry_after = self._gcra(r, api_key, rpm, 1)
+        if not allowed:
+            with self._lock:
+                self._blocked_until[api_key] = now + retry_after
+        return allowed, retry_after
+
+
+_LIMITER = RateLimiter(
+    burst_fraction=SETTINGS.rate_limit_burst_fraction,
+    lease_fraction=SETTINGS.rate_limit_lease_fraction,
+    lease_ttl_s=SETTINGS.rate_limit_lease_ttl_s,
+)
+
+
+@timed("rate_limit")
+def check_rate_limit(principal: Principal, limiter: Optional[RateLimiter] = None) -> None:
+    """
+    Redis-backed GCRA rate limiter (see RateLimiter):
+      key: rl:{api_key}
+      one atomic script call per request, or per lease slice in lease mode
+    """
     rpm = max(1, int(principal.rpm))
-    window = int(time.time() // 60)
-    key = f"rl:{principal.api_key}:{window}"
-    n = r.incr(key)
-    if n == 1:
-        r.expire(key, 120)
-    if n > rpm:
+    allowed, retry_after = (limiter or _LIMITER).acquire(principal.api_key, rpm)
+    if not allowed:
+        retry = max(1, math.ceil(retry_after))
         raise HTTPException(
             status_code=429,
-            detail={"error": "rate_limited", "message": f"Exceeded {rpm} rpm", "retry_after_seconds": 10},
-            headers={"Retry-After": "10"},
+            detail={
+                "error": "rate_limited",
+                "message": f"Exceeded {rpm} rpm",
+                "retry_after_seconds": retry,
+            },
+            headers={"Retry-After": str(retry)},
         )
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, ModelWrapValidatorHandler, model_validator
 from typing import List, Literal, Optional, Dict, Any
 
+from src.common.metrics import stage
+from src.common.settings import SETTINGS
+
 
 class RiskRequest(BaseModel):
     model_config = ConfigDict(extra="forbid", frozen=True)
@@ -18,6 +21,14 @@ class RiskRequest(BaseModel):
     is_international: bool
     merchant_risk_score: float = Field(..., ge=0, le=1)
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def _timed_validation(
+        cls, data: Any, handler: ModelWrapValidatorHandler["RiskRequest"]
+    ) -> "RiskRequest":
+        with stage("validate"):
+            return handler(data)
+
 
 RiskLabel = Literal["high_risk", "low_risk"]
 Decision = Literal["approve", "step_up", "review", "decline"]
@@ -42,6 +53,20 @@ class RiskResponse(BaseModel):
     calibration_snapshot: Dict[str, Any]
 
 
+class BatchRiskRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    items: List[RiskRequest] = Field(..., min_length=1, max_length=SETTINGS.max_batch_size)
+
+
+class BatchRiskResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    count: int
+    model_version: str
+    results: List[RiskResponse]
+
+
 class ExplainFeature(BaseModel):
     model_config = ConfigDict(extra="forbid")
     feature: str
@@ -61,6 +86,15 @@ class ExplainResponse(RiskResponse):
     explanation: ExplainPayload
 
 
+class ExplainJobResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    status_url: str
+    result: Optional[ExplainResponse] = None
+    error: Optional[str] = None
+
+
 class ModelInfo(BaseModel):
     model_config = ConfigDict(extra="forbid")
     training_date: str
@@ -19,32 +19,125 @@ class Settings:
     shap_background_filename: str = "shap_background.joblib"
     global_shap_sample_filename: str = "global_shap_sample.joblib"
     fairness_report_filename: str = "fairness_report.json"
+    global_explain_filename: str = "global_explain.json"
+    global_explain_plot_filename: str = "global_shap_importance.png"
+    arrays_dirname: str = "arrays"
+    # memory-map the pickle-free arrays/ export when present (0: always unpickle joblib artifacts)
+    artifacts_mmap: bool = os.environ.get("ARTIFACTS_MMAP", "1").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
     registry_filename: str = "registry.json"
 
     # Auth
     demo_api_key: str = os.environ.get("DEMO_API_KEY", "").strip()
-    demo_api_keys_json: str = os.environ.get("DEMO_API_KEYS_JSON", "").strip()  # optional: {"keyA":60,"keyB":10}
+    demo_api_keys_json: str = os.environ.get(
+        "DEMO_API_KEYS_JSON", ""
+    ).strip()  # optional: {"keyA":60,"keyB":10}
+    demo_api_keys_file: str = os.environ.get(
+        "DEMO_API_KEYS_FILE", ""
+    ).strip()  # same JSON format, hot-reloaded
+    api_keys_reload_interval_s: float = float(os.environ.get("API_KEYS_RELOAD_INTERVAL_S", "5.0"))
 
     # Redis
     redis_url: str = os.environ.get("REDIS_URL", "").strip()
 
     # Distributed rate limits (fallbacks)
     default_rpm: int = int(os.environ.get("DEFAULT_RPM", "60"))
+    # GCRA burst capacity as a fraction of rpm: any 60s window admits <= (1 + fraction) * rpm
+    rate_limit_burst_fraction: float = float(os.environ.get("RATE_LIMIT_BURST_FRACTION", "0.2"))
+    # Optional per-worker leases (fraction of rpm reserved per Redis call); 0 disables
+    rate_limit_lease_fraction: float = float(os.environ.get("RATE_LIMIT_LEASE_FRACTION", "0"))
+    rate_limit_lease_ttl_s: float = float(os.environ.get("RATE_LIMIT_LEASE_TTL_S", "1.0"))
+
+    # Batch scoring
+    max_batch_size: int = int(os.environ.get("MAX_BATCH_SIZE", "1000"))
+
+    # Micro-batching of concurrent single-row /score calls (off by default)
+    microbatch_enabled: bool = os.environ.get("MICROBATCH_ENABLED", "0").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    microbatch_max_size: int = int(os.environ.get("MICROBATCH_MAX_SIZE", "64"))
+    microbatch_max_wait_ms: float = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "2.0"))
+
+    # Local explanation cache (0 disables)
+    explain_cache_size: int = int(os.environ.get("EXPLAIN_CACHE_SIZE", "4096"))
+    explain_cache_precision: float = float(os.environ.get("EXPLAIN_CACHE_PRECISION", "1e-6"))
+    explain_cache_precision_json: str = os.environ.get(
+        "EXPLAIN_CACHE_PRECISION_JSON", ""
+    ).strip()  # {"income": 1000}
+    explain_cache_redis: bool = os.environ.get("EXPLAIN_CACHE_REDIS", "0").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    explain_cache_redis_ttl_s: int = int(os.environ.get("EXPLAIN_CACHE_REDIS_TTL_S", "3600"))
+
+    # Explanation jobs (process pool); sync /explain falls back to a job after the timeout (0: run in-process)
+    explain_job_workers: int = int(
+        os.environ.get("EXPLAIN_JOB_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    explain_job_ttl_s: float = float(os.environ.get("EXPLAIN_JOB_TTL_S", "600"))
+    explain_sync_timeout_s: float = float(os.environ.get("EXPLAIN_SYNC_TIMEOUT_S", "0"))
+    # queued + running jobs per API worker before new ones are refused with 503 (0: unbounded)
+    explain_job_max_pending: int = int(os.environ.get("EXPLAIN_JOB_MAX_PENDING", "256"))
+
+    # Global explain: Kernel SHAP rows sharded over the explain job pool (0 shards: in-process, capped rows)
+    global_explain_shards: int = int(os.environ.get("GLOBAL_EXPLAIN_SHARDS", "8"))
+    global_explain_seed: int = int(os.environ.get("GLOBAL_EXPLAIN_SEED", "42"))
+    # how long /global-explain waits on an on-demand recompute before answering 503 + Retry-After
+    global_explain_wait_s: float = float(os.environ.get("GLOBAL_EXPLAIN_WAIT_S", "2.0"))
+    # on-demand recomputes are written here (one <version>-<sha> dir per model), never into the version dirs
+    global_explain_cache_dir: Path = Path(
+        os.environ.get("GLOBAL_EXPLAIN_CACHE_DIR", "").strip()
+        or Path(os.environ.get("ARTIFACTS_DIR", "artifacts/latest")).parent / "cache"
+    )
+
+    # Model hot reload: artifacts dir poll interval (0 disables the watcher) and how long a
+    # retired version's micro-batcher stays open for in-flight requests
+    model_reload_interval_s: float = float(os.environ.get("MODEL_RELOAD_INTERVAL_S", "5.0"))
+    model_reload_grace_s: float = float(os.environ.get("MODEL_RELOAD_GRACE_S", "30.0"))
+
+    # Shadow scoring: registry version scored alongside the champion on every /score (empty: off)
+    shadow_version: str = os.environ.get("SHADOW_VERSION", "")
+    shadow_max_queue: int = int(os.environ.get("SHADOW_MAX_QUEUE", "10000"))
+    shadow_max_batch: int = int(os.environ.get("SHADOW_MAX_BATCH", "256"))
+
+    # Per-stage timing histograms, exported at /v1/metrics/prometheus (0 disables)
+    stage_metrics: bool = os.environ.get("STAGE_METRICS", "1").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
 
     # Drift
     drift_z_threshold: float = float(os.environ.get("DRIFT_Z_THRESHOLD", "3.5"))
+    drift_flush_interval_s: float = float(
+        os.environ.get("DRIFT_FLUSH_INTERVAL_S", "1.0")
+    )  # <= 0: write-through
+    drift_cache_ttl_s: float = float(
+        os.environ.get("DRIFT_CACHE_TTL_S", "5.0")
+    )  # <= 0: read on every request
+    drift_cache_max_staleness_s: float = float(
+        os.environ.get("DRIFT_CACHE_MAX_STALENESS_S", "30.0")
+    )
 
     # Decisioning / Loss model
     event_definition: str = os.environ.get("RISK_EVENT_DEFINITION", "chargeback_within_180d")
     loss_per_event_usd: float = float(os.environ.get("LOSS_PER_EVENT_USD", "180.0"))
-    loss_amt_multiplier: float = float(os.environ.get("LOSS_AMT_MULTIPLIER", "0.15"))  # avg_txn_amount weight
+    loss_amt_multiplier: float = float(
+        os.environ.get("LOSS_AMT_MULTIPLIER", "0.15")
+    )  # avg_txn_amount weight
     stepup_threshold: float = float(os.environ.get("STEPUP_THRESHOLD", "0.35"))
     review_threshold: float = float(os.environ.get("REVIEW_THRESHOLD", "0.55"))
     decline_threshold: float = float(os.environ.get("DECLINE_THRESHOLD", "0.80"))
 
     # Cost curve (used for threshold optimization metadata)
-    fp_cost_usd: float = float(os.environ.get("FP_COST_USD", "2.50"))     # manual review / friction
-    fn_cost_usd: float = float(os.environ.get("FN_COST_USD", "180.0"))    # expected loss
+    fp_cost_usd: float = float(os.environ.get("FP_COST_USD", "2.50"))  # manual review / friction
+    fn_cost_usd: float = float(os.environ.get("FN_COST_USD", "180.0"))  # expected loss
     max_review_rate: float = float(os.environ.get("MAX_REVIEW_RATE", "0.05"))  # capacity constraint
 
 
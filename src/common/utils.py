@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import contextlib
+import hashlib
 import json
+import os
+import tempfile
 from pathlib import Path
 from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
 
 
@@ -16,7 +21,37 @@ def write_json(path: Path, obj: Dict[str, Any]) -> None:
     path.write_text(json.dumps(obj, indent=2, sort_keys=True), encoding="utf-8")
 
 
-def z_score_warnings(x: Dict[str, float], means: Dict[str, float], stds: Dict[str, float], z_threshold: float) -> List[str]:
+def write_json_atomic(path: Path, obj: Dict[str, Any]) -> None:
+    """
+    write_json via a temp file in the same dir + fsync + rename: readers see the old or
+    the new content, never a partial file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(obj, indent=2, sort_keys=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def z_score_warnings(
+    x: Dict[str, float], means: Dict[str, float], stds: Dict[str, float], z_threshold: float
+) -> List[str]:
     warnings: List[str] = []
     for k, v in x.items():
         if k not in means or k not in stds:
@@ -33,3 +68,17 @@ def z_score_warnings(x: Dict[str, float], means: Dict[str, float], stds: Dict[st
 def normalize_features_ordered(payload: Dict[str, Any], feature_list: List[str]) -> pd.DataFrame:
     row = {f: payload[f] for f in feature_list}
     return pd.DataFrame([row], columns=feature_list)
+
+
+def normalize_features_batch(
+    payloads: List[Dict[str, Any]], feature_list: List[str]
+) -> pd.DataFrame:
+    rows = [{f: p[f] for f in feature_list} for p in payloads]
+    return pd.DataFrame(rows, columns=feature_list)
+
+
+def features_matrix(payloads: List[Dict[str, Any]], feature_list: List[str]) -> np.ndarray:
+    """
+    Array-only counterpart of normalize_features_batch (bools become 0.0/1.0).
+    """
+    return np.array([[float(p[f]) for f in feature_list] for p in payloads], dtype=float)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.common.logging import get_logger
+
+logger = get_logger("batcher")
+
+# upper bounds of the batch-size histogram buckets (last bucket is open-ended)
+_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row scoring calls into one stacked predict call.
+
+    A dispatcher thread takes the first queued row, then keeps collecting until either
+    max_batch_size rows are queued or max_wait_ms has passed. It dispatches early when
+    every in-flight caller is already in the batch, so a lone request never waits for
+    the window (adaptive: batching only kicks in under concurrency).
+
+    After close() (a retired model version), submit() predicts the row directly, so a
+    request that raced the swap still completes; rows left queued at close are failed.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        name: str = "score",
+    ) -> None:
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._closed = False
+        self._batches = 0
+        self._rows = 0
+        self._errors = 0
+        self._hist = [0] * (len(_BUCKETS) + 1)
+
+        self._thread = threading.Thread(target=self._run, name=f"microbatch-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, x_row: np.ndarray, timeout: Optional[float] = None) -> float:
+        row = np.asarray(x_row, dtype=float).reshape(-1)
+        fut: Future = Future()
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._inflight += 1
+                # enqueued under the lock, so every accepted row is ahead of close()'s sentinel
+                self._queue.put((row, fut))
+        if closed:
+            return float(
+                np.asarray(self.predict_fn(row.reshape(1, -1)), dtype=float).reshape(-1)[0]
+            )
+        try:
+            return float(fut.result(timeout=timeout))
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout=timeout_s)
+
+        # dispatcher stuck (or gone): nothing will serve what is still queued
+        stranded = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError(f"batcher {self.name} closed"))
+                stranded += 1
+        if self._thread.is_alive():
+            self._queue.put(None)  # let the dispatcher exit once it unblocks
+        if stranded:
+            logger.info(
+                "microbatch_closed_with_pending",
+                extra={"ctx": {"batcher": self.name, "failed": stranded}},
+            )
+
+    def _collect(
+        self, first: Tuple[np.ndarray, Future]
+    ) -> Tuple[List[Tuple[np.ndarray, Future]], bool]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            with self._lock:
+                if len(batch) >= self._inflight:
+                    break
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[Tuple[np.ndarray, Future]]) -> None:
+        try:
+            X = np.vstack([row for row, _ in batch])
+            probs = np.asarray(self.predict_fn(X), dtype=float).reshape(-1)
+            for (_, fut), p in zip(batch, probs, strict=True):
+                fut.set_result(float(p))
+        except Exception as e:
+            with self._lock:
+                self._errors += 1
+            logger.info(
+                "microbatch_failed",
+                extra={"ctx": {"batcher": self.name, "size": len(batch), "err": str(e)}},
+            )
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        size = len(batch)
+        idx = next((i for i, ub in enumerate(_BUCKETS) if size <= ub), len(_BUCKETS))
+        with self._lock:
+            self._batches += 1
+            self._rows += size
+            self._hist[idx] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            batches, rows, errors, hist = self._batches, self._rows, self._errors, list(self._hist)
+        labels = [f"le_{ub}" for ub in _BUCKETS] + [f"gt_{_BUCKETS[-1]}"]
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "batches": batches,
+            "rows": rows,
+            "errors": errors,
+            "mean_batch_size": (rows / batches) if batches else 0.0,
+            "batch_size_histogram": dict(zip(labels, hist, strict=True)),
+        }
@@ -0,0 +1,323 @@
+"""
+Offline bulk scoring: streams a CSV (or Parquet, with pyarrow) file in fixed-size
+chunks, validates each chunk against the RiskRequest bounds, scores it with one
+vectorized model call in a process pool and writes results incrementally.
+
+  python -m src.serving.bulk_score INPUT OUTPUT [--chunk-size 100000] [--workers N]
+
+Output rows keep input order: row (0-based input row), any --passthrough columns,
+model_version, risk_probability_event, risk_label, decision, expected_loss_usd,
+reason_codes (";"-joined), error (empty when valid). Invalid rows are reported, not
+scored. Memory stays bounded: at most 2 chunks per worker are in flight.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.common.decisioning import (
+    decisions_from_probs,
+    expected_losses_usd,
+    reason_codes_from_masks,
+    rule_reason_masks,
+)
+from src.common.logging import get_logger
+from src.common.schema import RiskRequest
+from src.common.settings import SETTINGS
+
+logger = get_logger("bulk_score")
+
+_BOOL_TRUE = {"1", "true", "t", "yes", "y"}
+_BOOL_FALSE = {"0", "false", "f", "no", "n"}
+
+
+def field_bounds() -> Dict[str, Tuple[type, Optional[float], Optional[float]]]:
+    """
+    {feature: (type, ge, le)} from RiskRequest's pydantic constraints.
+    """
+    out: Dict[str, Tuple[type, Optional[float], Optional[float]]] = {}
+    for name, field in RiskRequest.model_fields.items():
+        ge = next((m.ge for m in field.metadata if hasattr(m, "ge")), None)
+        le = next((m.le for m in field.metadata if hasattr(m, "le")), None)
+        out[name] = (field.annotation, ge, le)
+    return out
+
+
+def validate_chunk(
+    df: pd.DataFrame,
+    feature_list: List[str],
+    bounds: Dict[str, Tuple[type, Optional[float], Optional[float]]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Column-wise validation. Returns (X (n, d) float matrix in feature_list order,
+    errors (n,) object array: "" for valid rows, else ";"-joined "<feature>:<problem>").
+    """
+    n = len(df)
+    X = np.zeros((n, len(feature_list)), dtype=float)
+    errors = np.full(n, "", dtype=object)
+
+    def flag(mask: np.ndarray, msg: str) -> None:
+        if mask.any():
+            errors[mask] = errors[mask] + np.where(errors[mask] == "", "", ";") + msg
+
+    for j, f in enumerate(feature_list):
+        kind, ge, le = bounds[f]
+        col = df[f]
+        if kind is bool:
+            # numeric 0/1 (incl. float-typed columns and "1.0"), else the usual spellings
+            v = pd.to_numeric(col, errors="coerce")
+            is_num = v.isin([0, 1]).to_numpy()
+            s = col.astype(str).str.strip().str.lower()
+            is_true = np.where(is_num, v.to_numpy() == 1, s.isin(_BOOL_TRUE).to_numpy())
+            bad = ~(is_num | is_true | s.isin(_BOOL_FALSE).to_numpy())
+            flag(bad, f"{f}:not_bool")
+            X[:, j] = is_true
+            continue
+
+        v = pd.to_numeric(col, errors="coerce").to_numpy(dtype=float)
+        missing = ~np.isfinite(v)
+        flag(missing, f"{f}:missing_or_not_numeric")
+        ok = ~missing
+        if kind is int:
+            flag(ok & (v != np.round(v)), f"{f}:not_int")
+        if ge is not None:
+            flag(ok & (v < ge), f"{f}:lt_{ge:g}")
+        if le is not None:
+            flag(ok & (v > le), f"{f}:gt_{le:g}")
+        X[:, j] = np.where(ok, v, 0.0)
+    return X, errors
+
+
+# ---- worker process side ----
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(artifacts_dir: str) -> None:
+    from src.serving.model_loader import load_artifacts
+
+    art = load_artifacts(Path(artifacts_dir))
+    _WORKER["art"] = art
+    _WORKER["bounds"] = field_bounds()
+
+
+def _score_chunk(df: pd.DataFrame, start_row: int, passthrough: List[str]) -> pd.DataFrame:
+    from src.serving.scorer import predict_matrix
+
+    art = _WORKER["art"]
+    X, errors = validate_chunk(df, art.feature_list, _WORKER["bounds"])
+    valid = errors == ""
+
+    probs = np.full(len(df), np.nan)
+    if valid.any():
+        probs[valid] = predict_matrix(art.model, X[valid], art.feature_list, art.kernel)
+
+    review_t = float(art.metrics.get("thresholds", {}).get("review", SETTINGS.review_threshold))
+    amount = X[:, art.feature_list.index("avg_txn_amount_30d")]
+    out = pd.DataFrame({"row": np.arange(start_row, start_row + len(df))})
+    for c in passthrough:
+        out[c] = df[c].to_numpy()
+    out["model_version"] = art.model_version
+    out["risk_probability_event"] = probs
+    out["risk_label"] = np.where(valid, np.where(probs >= review_t, "high_risk", "low_risk"), "")
+    out["decision"] = np.where(valid, decisions_from_probs(probs), "")
+    out["expected_loss_usd"] = np.where(valid, expected_losses_usd(probs, amount), np.nan)
+    out["reason_codes"] = np.where(
+        valid, reason_codes_from_masks(rule_reason_masks(X, art.feature_list), sep=";"), ""
+    )
+    out["error"] = errors
+    return out
+
+
+def _score_chunk_task(
+    df: pd.DataFrame, start_row: int, passthrough: List[str], as_csv: bool
+) -> Tuple[int, Any]:
+    """
+    Pool entry point: (invalid rows, result). CSV output is rendered here, in the
+    worker, since float formatting costs more than scoring.
+    """
+    out = _score_chunk(df, start_row, passthrough)
+    invalid = int((out["error"] != "").sum())
+    if as_csv:
+        return invalid, out.to_csv(index=False, header=start_row == 0)
+    return invalid, out
+
+
+# ---- IO ----
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in (".parquet", ".pq")
+
+
+def iter_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if _is_parquet(path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise SystemExit("Parquet input needs pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class _Writer:
+    """
+    Appends result chunks: pre-rendered CSV text, or DataFrames to one Parquet file
+    via pyarrow's ParquetWriter.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._pq_writer = None
+        self._fh = None
+        if self.parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)") from e
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.parquet:
+            self._fh = open(path, "w", encoding="utf-8", newline="")
+
+    def write(self, result: Any) -> None:
+        if self._fh is not None:
+            self._fh.write(result)
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        if self._pq_writer is None:
+            self._pq_writer = pq.ParquetWriter(self.path, table.schema)
+        self._pq_writer.write_table(table)
+
+    def close(self) -> None:
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+        if self._fh is not None:
+            self._fh.close()
+
+
+def run(
+    input_path: Path,
+    output_path: Path,
+    artifacts_dir: Path,
+    chunk_size: int = 100_000,
+    workers: int = 0,
+    passthrough: Optional[List[str]] = None,
+    progress_every_s: float = 5.0,
+) -> Dict[str, Any]:
+    passthrough = list(passthrough or [])
+    workers = workers or (os.cpu_count() or 1)
+    max_in_flight = 2 * workers
+    bounds = field_bounds()
+
+    writer = _Writer(output_path)
+    pending: Deque[Tuple[Future, int]] = deque()
+    rows = invalid = 0
+    t0 = last_report = time.perf_counter()
+
+    def drain_one() -> None:
+        nonlocal rows, invalid, last_report
+        fut, n = pending.popleft()
+        bad, result = fut.result()
+        writer.write(result)
+        rows += n
+        invalid += bad
+        now = time.perf_counter()
+        if now - last_report >= progress_every_s:
+            last_report = now
+            print(
+                f"[bulk_score] rows={rows} invalid={invalid} rows_per_s={rows / (now - t0):,.0f}",
+                file=sys.stderr,
+                flush=True,
+            )
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(str(artifacts_dir),),
+    ) as pool:
+        start = 0
+        try:
+            for chunk in iter_chunks(input_path, chunk_size):
+                missing = [c for c in list(bounds) + passthrough if c not in chunk.columns]
+                if missing:
+                    raise SystemExit(f"input is missing columns: {missing}")
+                while len(pending) >= max_in_flight:
+                    drain_one()
+                pending.append(
+                    (
+                        pool.submit(
+                            _score_chunk_task, chunk, start, passthrough, not writer.parquet
+                        ),
+                        len(chunk),
+                    )
+                )
+                start += len(chunk)
+            while pending:
+                drain_one()
+        finally:
+            writer.close()
+
+    elapsed = time.perf_counter() - t0
+    summary = {
+        "rows": rows,
+        "invalid": invalid,
+        "seconds": elapsed,
+        "rows_per_s": rows / elapsed if elapsed > 0 else 0.0,
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "output": str(output_path),
+    }
+    logger.info("bulk_score_complete", extra={"ctx": summary})
+    print(
+        f"[bulk_score] done rows={rows} invalid={invalid} seconds={elapsed:.1f} rows_per_s={summary['rows_per_s']:,.0f}",
+        file=sys.stderr,
+        flush=True,
+    )
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(
+        prog="python -m src.serving.bulk_score", description="Offline bulk scoring (CSV / Parquet)."
+    )
+    ap.add_argument("input", type=Path)
+    ap.add_argument("output", type=Path)
+    ap.add_argument("--artifacts-dir", type=Path, default=SETTINGS.artifacts_dir)
+    ap.add_argument("--chunk-size", type=int, default=100_000)
+    ap.add_argument("--workers", type=int, default=0, help="process pool size (default: CPU count)")
+    ap.add_argument(
+        "--passthrough",
+        default="",
+        help="comma-separated input columns copied to the output (e.g. an id)",
+    )
+    ap.add_argument("--progress-every-s", type=float, default=5.0)
+    args = ap.parse_args(argv)
+
+    run(
+        args.input,
+        args.output,
+        args.artifacts_dir,
+        chunk_size=max(1, args.chunk_size),
+        workers=max(0, args.workers),
+        passthrough=[c for c in args.passthrough.split(",") if c],
+        progress_every_s=args.progress_every_s,
+    )
+
+
+if __name__ == "__main__":
+    main()
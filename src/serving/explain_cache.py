@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.common.logging import get_logger
+from src.serving.explainer import LocalExplanation
+
+logger = get_logger("explain_cache")
+
+
+class ExplanationCache:
+    """
+    Bounded LRU of LocalExplanation keyed by (model version, quantized feature vector).
+
+    Each feature is rounded to a multiple of its precision (per-feature overrides, else
+    default_precision), so near-identical profiles share one entry; the cached explanation
+    is the one computed for the first row seen in that bucket. Versions share the LRU
+    (keys carry the version), so requests still finishing on a retired model during a
+    swap's grace period neither miss nor flush anything; the swap listener calls
+    drop_version() for the retired one. Redis entries are namespaced by version and
+    simply age out.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        feature_list: List[str],
+        default_precision: float = 1e-6,
+        precision: Optional[Dict[str, float]] = None,
+        redis_getter: Optional[Callable[[], Any]] = None,
+        redis_ttl_s: int = 3600,
+    ) -> None:
+        self.max_size = max(1, int(max_size))
+        self.feature_list = list(feature_list)
+        per_feature = precision or {}
+        self._precision = np.array(
+            [
+                float(per_feature.get(f, default_precision)) or default_precision
+                for f in self.feature_list
+            ],
+            dtype=float,
+        )
+        self._redis_getter = redis_getter
+        self.redis_ttl_s = int(redis_ttl_s)
+
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, LocalExplanation]" = OrderedDict()
+        self._hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def key(self, model_version: str, x_row: np.ndarray) -> str:
+        q = np.round(np.asarray(x_row, dtype=float).reshape(-1) / self._precision).astype(np.int64)
+        digest = hashlib.blake2b(q.tobytes(), digest_size=16).hexdigest()
+        return f"explain:{model_version}:{digest}"
+
+    def drop_version(self, model_version: str) -> int:
+        """
+        Removes the local entries of one model version; returns how many.
+        """
+        prefix = f"explain:{model_version}:"
+        with self._lock:
+            stale = [k for k in self._lru if k.startswith(prefix)]
+            for k in stale:
+                del self._lru[k]
+            self._invalidations += 1
+        logger.info(
+            "explain_cache_invalidated",
+            extra={"ctx": {"model_version": model_version, "entries": len(stale)}},
+        )
+        return len(stale)
+
+    def get(self, model_version: str, x_row: np.ndarray) -> Optional[LocalExplanation]:
+        k = self.key(model_version, x_row)
+        with self._lock:
+            hit = self._lru.get(k)
+            if hit is not None:
+                self._lru.move_to_end(k)
+                self._hits += 1
+                return hit
+
+        shared = self._redis_get(k)
+        with self._lock:
+            if shared is None:
+                self._misses += 1
+                return None
+            self._redis_hits += 1
+            self._put_local(k, shared)
+        return shared
+
+    def put(self, model_version: str, x_row: np.ndarray, explanation: LocalExplanation) -> None:
+        k = self.key(model_version, x_row)
+        with self._lock:
+            self._put_local(k, explanation)
+        self._redis_set(k, explanation)
+
+    def _put_local(self, k: str, explanation: LocalExplanation) -> None:
+        self._lru[k] = explanation
+        self._lru.move_to_end(k)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+            self._evictions += 1
+
+    def _redis(self):
+        return self._redis_getter() if self._redis_getter is not None else None
+
+    def _redis_get(self, k: str) -> Optional[LocalExplanation]:
+        r = self._redis()
+        if r is None:
+            return None
+        try:
+            raw = r.get(k)
+            return LocalExplanation(**json.loads(raw)) if raw else None
+        except Exception as e:
+            logger.info("explain_cache_redis_get_failed", extra={"ctx": {"err": str(e)}})
+            return None
+
+    def _redis_set(self, k: str, explanation: LocalExplanation) -> None:
+        r = self._redis()
+        if r is None:
+            return
+        try:
+            r.set(k, json.dumps(asdict(explanation)), ex=self.redis_ttl_s)
+        except Exception as e:
+            logger.info("explain_cache_redis_set_failed", extra={"ctx": {"err": str(e)}})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._redis_hits + self._misses
+            return {
+                "size": len(self._lru),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "redis_hits": self._redis_hits,
+                "misses": self._misses,
+                "hit_rate": ((self._hits + self._redis_hits) / lookups) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "redis_backed": self._redis_getter is not None,
+            }
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.common.logging import get_logger
+from src.serving.explainer import LocalExplanation, global_items_from_mean_abs
+
+logger = get_logger("explain_jobs")
+
+# ---- worker process side: artifacts + explainer loaded once per process ----
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(artifacts_dir: str) -> None:
+    from src.serving.explainer import build_explainer
+    from src.serving.model_loader import load_artifacts
+
+    art = load_artifacts(Path(artifacts_dir))
+    _WORKER["art"] = art
+    _WORKER["explainer"] = build_explainer(
+        art.model,
+        art.background_df(),
+        art.feature_list,
+        art.metrics.get("model_type"),
+        kernel=art.kernel,
+    )
+
+
+def _explain_in_worker(payload: Dict[str, Any], top_k: int) -> Dict[str, Any]:
+    from src.common.utils import normalize_features_ordered
+    from src.serving.explainer import explain_local
+
+    art = _WORKER["art"]
+    x_row_df = normalize_features_ordered(payload, art.feature_list)
+    explanation = explain_local(
+        _WORKER["explainer"], art.model, x_row_df, art.feature_list, top_k=top_k
+    )
+    return {"model_version": art.model_version, "explanation": asdict(explanation)}
+
+
+def _global_shard_in_worker(rows: np.ndarray, seed: int) -> Tuple[np.ndarray, int, str]:
+    """
+    Sum of |SHAP| over one shard of rows (plus the model version it used). Kernel SHAP
+    sampling is seeded per shard, so the merged result only depends on (seed, shard
+    layout), not on which process ran what.
+    """
+    from src.serving.explainer import LinearShapExplainer, TreeShapExplainer, kernel_shap_values
+
+    explainer = _WORKER["explainer"]
+    if isinstance(explainer, (LinearShapExplainer, TreeShapExplainer)):
+        phi = explainer.attributions(rows)[0]
+    else:
+        np.random.seed(seed)
+        phi = kernel_shap_values(explainer, rows)
+    return np.abs(phi).sum(axis=0), len(rows), _WORKER["art"].model_version
+
+
+# ---- API process side ----
+class ExplainQueueFull(RuntimeError):
+    pass
+
+
+class ExplainJobManager:
+    """
+    Runs explain_local in a ProcessPoolExecutor so CPU-bound SHAP never holds the API
+    worker's GIL. Each pool process loads the artifacts and explainer once (initializer).
+
+    The pool is pinned to one resolved version dir (recycle() re-points it), and a job
+    submitted with model_version fails rather than return another version's explanation.
+
+    Jobs carry an opaque `context` (the already-computed scoring part of the response).
+    Finished jobs are kept for result_ttl_s, then purged. The pool is created lazily.
+    At most max_pending jobs may be queued or running (0: unbounded); submit raises
+    ExplainQueueFull past that.
+    """
+
+    def __init__(
+        self,
+        artifacts_dir: Path,
+        max_workers: int = 2,
+        result_ttl_s: float = 600.0,
+        max_pending: int = 0,
+    ) -> None:
+        self.artifacts_dir = Path(os.path.realpath(artifacts_dir))
+        self.max_workers = max(1, int(max_workers))
+        self.result_ttl_s = float(result_ttl_s)
+        self.max_pending = max(0, int(max_pending))
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # job_id -> {"future", "context", "model_version", "submitted_at", "finished_at", "result", "error"}
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._pools_replaced = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(str(self.artifacts_dir),),
+                )
+            return self._pool
+
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        top_k: int = 6,
+        model_version: Optional[str] = None,
+    ) -> str:
+        self._purge()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            if self.max_pending and self._pending >= self.max_pending:
+                self._rejected += 1
+                raise ExplainQueueFull(
+                    f"{self._pending} explain jobs pending (max {self.max_pending})"
+                )
+            self._pending += 1  # reserve the slot
+        try:
+            fut = self._submit_to_pool(_explain_in_worker, dict(payload), top_k)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        with self._lock:
+            self._jobs[job_id] = {
+                "future": fut,
+                "context": context or {},
+                "model_version": model_version,
+                "submitted_at": time.time(),
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._submitted += 1
+        fut.add_done_callback(lambda f, jid=job_id: self._on_done(jid, f))
+        return job_id
+
+    def _submit_to_pool(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        pool.submit, replacing a broken pool (a worker died, e.g. OOM-killed) once.
+        """
+        pool = self._get_pool()
+        try:
+            return pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+        return self._get_pool().submit(fn, *args)
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self._pools_replaced += 1
+        logger.info(
+            "explain_pool_broken", extra={"ctx": {"artifacts_dir": str(self.artifacts_dir)}}
+        )
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, job_id: str, fut: Future) -> None:
+        if not fut.cancelled() and isinstance(fut.exception(), BrokenProcessPool):
+            with self._lock:
+                pool = self._pool
+            if pool is not None and getattr(pool, "_broken", False):
+                self._discard_pool(pool)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["finished_at"] is not None:
+                return
+            job["finished_at"] = time.time()
+            self._pending -= 1
+            try:
+                out = fut.result()
+                if (
+                    job["model_version"] is not None
+                    and out["model_version"] != job["model_version"]
+                ):
+                    raise RuntimeError(
+                        f"model_version_mismatch: worker has {out['model_version']}, job wants {job['model_version']}"
+                    )
+                job["result"] = LocalExplanation(**out["explanation"])
+                self._completed += 1
+            except Exception as e:
+                job["error"] = str(e)
+                self._failed += 1
+                logger.info("explain_job_failed", extra={"ctx": {"job_id": job_id, "err": str(e)}})
+
+    def wait(self, job_id: str, timeout: float) -> Optional[LocalExplanation]:
+        """
+        Blocks up to timeout seconds; returns the explanation or None if still running.
+        Raises if the job failed.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        try:
+            job["future"].result(timeout=timeout)
+        except TimeoutError:
+            return None
+        except Exception:
+            pass
+        # the done callback may not have run yet; recording is idempotent
+        self._on_done(job_id, job["future"])
+        with self._lock:
+            if job["error"]:
+                raise RuntimeError(job["error"])
+            return job["result"]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._purge()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            fut: Future = job["future"]
+            if job["finished_at"] is not None:
+                status = "failed" if job["error"] else "done"
+            else:
+                status = "running" if fut.running() else "queued"
+            return {
+                "job_id": job_id,
+                "status": status,
+                "context": job["context"],
+                "model_version": job["model_version"],
+                "result": job["result"],
+                "error": job["error"],
+                "submitted_at": job["submitted_at"],
+                "finished_at": job["finished_at"],
+            }
+
+    def explain_global(
+        self,
+        sample: np.ndarray,
+        feature_list: List[str],
+        shards: int = 8,
+        seed: int = 42,
+        method: str = "shap_kernel",
+        model_version: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Shards the rows across the pool, then merges per-shard sum|SHAP| into mean |SHAP|.
+        The shard layout is fixed by `shards`, independent of the worker count. Raises if
+        a shard ran on a model other than model_version (when given).
+        """
+        sample = np.asarray(sample, dtype=float)
+        chunks = [
+            c for c in np.array_split(sample, max(1, min(int(shards), len(sample)))) if len(c)
+        ]
+        futures = [
+            self._submit_to_pool(_global_shard_in_worker, chunk, seed + i)
+            for i, chunk in enumerate(chunks)
+        ]
+
+        total = np.zeros(len(feature_list), dtype=float)
+        count = 0
+        for fut in futures:
+            abs_sum, n, version = fut.result()
+            if model_version is not None and version != model_version:
+                raise RuntimeError(
+                    f"model_version_mismatch: shard ran on {version}, expected {model_version}"
+                )
+            total += abs_sum
+            count += n
+        return global_items_from_mean_abs(feature_list, total / max(count, 1), method)
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.result_ttl_s
+        with self._lock:
+            for jid in [
+                j
+                for j, v in self._jobs.items()
+                if v["finished_at"] is not None and v["finished_at"] < cutoff
+            ]:
+                del self._jobs[jid]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = [v for v in self._jobs.values() if v["finished_at"] is None]
+            return {
+                "workers": self.max_workers,
+                "pool_started": self._pool is not None,
+                "queue_depth": len(pending),
+                "max_pending": self.max_pending,
+                "running": sum(1 for v in pending if v["future"].running()),
+                "stored_results": len(self._jobs) - len(pending),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "pools_replaced": self._pools_replaced,
+                "result_ttl_s": self.result_ttl_s,
+            }
+
+    def recycle(self, artifacts_dir: Optional[Path] = None) -> None:
+        """
+        Retires the current pool (queued and running jobs still finish on it); the next
+        submit starts a fresh pool, which loads the artifacts again, from artifacts_dir
+        when given. Used after a model swap.
+        """
+        with self._lock:
+            if artifacts_dir is not None:
+                self.artifacts_dir = Path(os.path.realpath(artifacts_dir))
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
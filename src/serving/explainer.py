@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
-import shap
+
+if TYPE_CHECKING:  # shap is heavy (~seconds); imported only where a Kernel/Tree explainer is built
+    import shap
+
+from src.common.metrics import timed
+from src.serving.model_loader import LinearKernel, extract_linear_kernel
 
 
 @dataclass(frozen=True)
@@ -19,11 +24,158 @@ def _direction(v: float) -> str:
     return "increases_risk" if v >= 0 else "decreases_risk"
 
 
-def build_explainer(model: Any, background_df: pd.DataFrame, feature_list: List[str]) -> shap.KernelExplainer:
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return np.exp(-np.logaddexp(0.0, -z))
+
+
+def _calibrated_attributions(
+    margin_phi: np.ndarray,
+    margin_x: np.ndarray,
+    margin_base: np.ndarray,
+    cal_a: np.ndarray,
+    cal_b: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Maps exact per-fold margin attributions through each fold's sigmoid calibrator.
+
+    margin_phi: (n, k, d) attributions in each fold's decision_function space
+    margin_x:   (n, k) fold margins for the rows, margin_base: (k,) fold margins at the baseline
+
+    Calibrated logit is z_k = -(a_k * margin_k + b_k), so logit attributions are exact
+    (-a_k * margin_phi). Each fold's probability delta p_k(x) - p_k(base) is then split
+    proportionally to them, and folds are averaged like CalibratedClassifierCV does.
+    Returns (phi (n, d), predicted (n,), baseline) with phi.sum(1) == predicted - baseline.
+    """
+    z_x = -(margin_x * cal_a + cal_b)
+    z_0 = -(margin_base * cal_a + cal_b)
+    p_x = _sigmoid(z_x)
+    p_0 = _sigmoid(z_0)
+
+    dz = z_x - z_0
+    tiny = np.abs(dz) < 1e-9
+    # secant slope of the sigmoid; tangent slope when the row sits on the baseline
+    slope = np.where(tiny, p_0 * (1.0 - p_0), (p_x - p_0) / np.where(tiny, 1.0, dz))
+
+    logit_phi = -margin_phi * cal_a[None, :, None]
+    phi = np.mean(logit_phi * slope[:, :, None], axis=1)
+    return phi, p_x.mean(axis=1), float(p_0.mean())
+
+
+@dataclass(frozen=True)
+class LinearShapExplainer:
+    """
+    Exact, closed-form attributions for the calibrated logistic regression (LinearKernel)
+    against the background mean. Deterministic and as cheap as scoring.
+    """
+
+    kernel: LinearKernel
+    background_mean: np.ndarray  # (d,)
+
+    @property
+    def expected_value(self) -> float:
+        return float(self.kernel.predict_proba(self.background_mean)[0])
+
+    def attributions(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        k = self.kernel
+        margin_phi = (X - self.background_mean)[:, None, :] * k.weights[None, :, :]
+        return _calibrated_attributions(
+            margin_phi, k.margins(X), k.margins(self.background_mean)[0], k.cal_a, k.cal_b
+        )
+
+
+@dataclass(frozen=True)
+class TreeShapExplainer:
+    """
+    Exact tree-path (TreeSHAP) attributions for each calibration fold's tree ensemble,
+    computed in decision_function (log-odds) space, then passed through the fold's
+    sigmoid calibrator and averaged. Batched over rows.
+    """
+
+    fold_explainers: Tuple[Any, ...]  # shap.TreeExplainer per fold
+    cal_a: np.ndarray  # (k,)
+    cal_b: np.ndarray  # (k,)
+
+    @property
+    def expected_value(self) -> float:
+        return float(np.mean(_sigmoid(-(self._margin_base() * self.cal_a + self.cal_b))))
+
+    def _margin_base(self) -> np.ndarray:
+        return np.array(
+            [float(np.asarray(te.expected_value).reshape(-1)[0]) for te in self.fold_explainers]
+        )
+
+    def attributions(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        per_fold = []
+        for te in self.fold_explainers:
+            sv = np.asarray(te.shap_values(X, check_additivity=False), dtype=float)
+            if sv.ndim == 3:  # (n, d, outputs) on some shap versions
+                sv = sv[..., -1]
+            per_fold.append(sv)
+        margin_phi = np.stack(per_fold, axis=1)  # (n, k, d)
+        margin_base = self._margin_base()
+        margin_x = margin_base[None, :] + margin_phi.sum(axis=2)
+        return _calibrated_attributions(margin_phi, margin_x, margin_base, self.cal_a, self.cal_b)
+
+
+def _build_tree_explainer(model: Any) -> Optional[TreeShapExplainer]:
+    folds = getattr(model, "calibrated_classifiers_", None)
+    if not folds:
+        return None
+    explainers, cal_a, cal_b = [], [], []
+    try:
+        import shap
+
+        for fold in folds:
+            if getattr(fold, "method", None) != "sigmoid" or len(fold.calibrators) != 1:
+                return None
+            explainers.append(
+                shap.TreeExplainer(fold.estimator, feature_perturbation="tree_path_dependent")
+            )
+            cal_a.append(float(fold.calibrators[0].a_))
+            cal_b.append(float(fold.calibrators[0].b_))
+    except Exception:
+        # unsupported estimator for TreeSHAP -> caller falls back to Kernel SHAP
+        return None
+    return TreeShapExplainer(
+        tuple(explainers), np.asarray(cal_a, dtype=float), np.asarray(cal_b, dtype=float)
+    )
+
+
+Explainer = Union["shap.KernelExplainer", LinearShapExplainer, TreeShapExplainer]
+
+
+def build_explainer(
+    model: Any,
+    background_df: pd.DataFrame,
+    feature_list: List[str],
+    model_type: Optional[str] = None,
+    kernel: Optional[LinearKernel] = None,
+) -> Explainer:
     """
-    KernelExplainer w/ predict_fn that always returns 1D (n,) and uses DataFrame columns
-    to keep sklearn pipelines happy.
+    Picks the attribution engine by model type:
+    - logistic_regression -> exact LinearShapExplainer (falls through if the model can't be flattened)
+    - gradient_boosting -> exact TreeShapExplainer (falls through if TreeSHAP can't parse the model)
+    - anything else -> KernelExplainer w/ predict_fn that always returns 1D (n,) and uses
+      DataFrame columns to keep sklearn pipelines happy.
+    A precomputed (e.g. memory-mapped) LinearKernel can be passed to skip flattening the model.
     """
+    if model_type == "logistic_regression":
+        kernel = kernel if kernel is not None else extract_linear_kernel(model)
+        if kernel is not None:
+            bg_mean = background_df[feature_list].to_numpy(dtype=float).mean(axis=0)
+            return LinearShapExplainer(kernel, bg_mean)
+
+    if model_type == "gradient_boosting":
+        tree = _build_tree_explainer(model)
+        if tree is not None:
+            return tree
+
     def predict_fn(X: np.ndarray) -> np.ndarray:
         X = np.asarray(X, dtype=float)
         if X.ndim == 1:
@@ -36,24 +188,17 @@ def build_explainer(model: Any, background_df: pd.DataFrame, feature_list: List[
     if bg.ndim == 1:
         bg = bg.reshape(1, -1)
 
-    return shap.KernelExplainer(predict_fn, bg)
-
+    import shap
 
-def explain_local(
-    explainer: shap.KernelExplainer,
-    model: Any,
-    x_row_df: pd.DataFrame,
-    feature_list: List[str],
-    top_k: int = 6,
-) -> LocalExplanation:
-    pred = float(model.predict_proba(x_row_df)[:, 1][0])
+    return shap.KernelExplainer(predict_fn, bg)
 
-    x = x_row_df[feature_list].to_numpy(dtype=float)
-    if x.ndim == 1:
-        x = x.reshape(1, -1)
 
-    # keep nsamples modest; stabilize KernelExplainer
-    shap_vals = explainer.shap_values(x, nsamples=200, l1_reg="num_features(10)")
+def kernel_shap_values(explainer: shap.KernelExplainer, X: np.ndarray) -> np.ndarray:
+    """
+    Kernel SHAP values as (n, d). Modest nsamples keeps it stable and avoids
+    KernelExplainer internal overflow bugs.
+    """
+    shap_vals = explainer.shap_values(X, nsamples=200, l1_reg="num_features(10)")
     shap_vals = np.asarray(shap_vals)
 
     # normalize shapes
@@ -61,15 +206,13 @@ def explain_local(
         shap_vals = shap_vals[0]
     if shap_vals.ndim == 1:
         shap_vals = shap_vals.reshape(1, -1)
+    return shap_vals
 
-    shap_row = shap_vals[0].reshape(-1)
-
-    baseline = float(np.asarray(explainer.expected_value).reshape(-1)[0])
-    baseline = float(np.clip(baseline, 0.0, 1.0))
 
+def _local_items(feature_list: List[str], shap_row: np.ndarray) -> List[Dict]:
     abs_sum = float(np.sum(np.abs(shap_row)) + 1e-12)
     items: List[Dict] = []
-    for f, v in zip(feature_list, shap_row):
+    for f, v in zip(feature_list, shap_row, strict=True):
         v_f = float(v)
         items.append(
             {
@@ -81,6 +224,60 @@ def explain_local(
         )
 
     items.sort(key=lambda d: abs(d["shap_value"]), reverse=True)
+    return items
+
+
+def _global_items(feature_list: List[str], shap_vals: np.ndarray, method: str) -> List[Dict]:
+    return global_items_from_mean_abs(feature_list, np.mean(np.abs(shap_vals), axis=0), method)
+
+
+def global_items_from_mean_abs(
+    feature_list: List[str], mean_abs: np.ndarray, method: str
+) -> List[Dict]:
+    mean_abs = np.asarray(mean_abs, dtype=float).reshape(-1)
+    total = float(mean_abs.sum() + 1e-12)
+
+    items = []
+    for f, v in zip(feature_list, mean_abs, strict=True):
+        v_f = float(v)
+        items.append(
+            {
+                "feature": f,
+                "mean_abs_shap": v_f,
+                "importance_percent": float((v_f / total) * 100.0),
+                "method": method,
+            }
+        )
+    items.sort(key=lambda d: d["mean_abs_shap"], reverse=True)
+    return items
+
+
+@timed("shap_local")
+def explain_local(
+    explainer: Explainer,
+    model: Any,
+    x_row_df: pd.DataFrame,
+    feature_list: List[str],
+    top_k: int = 6,
+) -> LocalExplanation:
+    x = x_row_df[feature_list].to_numpy(dtype=float)
+    if x.ndim == 1:
+        x = x.reshape(1, -1)
+
+    if isinstance(explainer, (LinearShapExplainer, TreeShapExplainer)):
+        phi, pred_vec, baseline = explainer.attributions(x)
+        items = _local_items(feature_list, phi[0])
+        return LocalExplanation(baseline, float(pred_vec[0]), items[:top_k])
+
+    pred = float(model.predict_proba(x_row_df)[:, 1][0])
+
+    shap_vals = kernel_shap_values(explainer, x)
+    shap_row = shap_vals[0].reshape(-1)
+
+    baseline = float(np.asarray(explainer.expected_value).reshape(-1)[0])
+    baseline = float(np.clip(baseline, 0.0, 1.0))
+
+    items = _local_items(feature_list, shap_row)
     return LocalExplanation(baseline, pred, items[:top_k])
 
 
@@ -125,16 +322,23 @@ def _fallback_global_importance(
     return items
 
 
+@timed("shap_global")
 def explain_global(
-    explainer: shap.KernelExplainer,
+    explainer: Explainer,
     model: Any,
     sample_df: pd.DataFrame,
     feature_list: List[str],
     max_rows: int = 80,
 ) -> Tuple[List[Dict], str]:
     """
-    Returns (items, method) where method is "shap_kernel" or "fallback_permutation".
+    Returns (items, method) where method is "shap_linear", "shap_tree", "shap_kernel" or
+    "fallback_permutation". Exact explainers use the full sample; max_rows only caps Kernel SHAP.
     """
+    if isinstance(explainer, (LinearShapExplainer, TreeShapExplainer)):
+        method = "shap_linear" if isinstance(explainer, LinearShapExplainer) else "shap_tree"
+        phi, _, _ = explainer.attributions(sample_df[feature_list].to_numpy(dtype=float))
+        return _global_items(feature_list, phi, method), method
+
     sample = sample_df
     if len(sample) > max_rows:
         sample = sample.sample(n=max_rows, random_state=42)
@@ -144,31 +348,8 @@ def explain_global(
         X = X.reshape(1, -1)
 
     try:
-        # Use modest nsamples to avoid KernelExplainer internal overflow bugs
-        shap_vals = explainer.shap_values(X, nsamples=200, l1_reg="num_features(10)")
-        shap_vals = np.asarray(shap_vals)
-
-        if shap_vals.ndim == 3:
-            shap_vals = shap_vals[0]
-        if shap_vals.ndim == 1:
-            shap_vals = shap_vals.reshape(1, -1)
-
-        mean_abs = np.mean(np.abs(shap_vals), axis=0).reshape(-1)
-        total = float(mean_abs.sum() + 1e-12)
-
-        items = []
-        for f, v in zip(feature_list, mean_abs):
-            v_f = float(v)
-            items.append(
-                {
-                    "feature": f,
-                    "mean_abs_shap": v_f,
-                    "importance_percent": float((v_f / total) * 100.0),
-                    "method": "shap_kernel",
-                }
-            )
-        items.sort(key=lambda d: d["mean_abs_shap"], reverse=True)
-        return items, "shap_kernel"
+        shap_vals = kernel_shap_values(explainer, X)
+        return _global_items(feature_list, shap_vals, "shap_kernel"), "shap_kernel"
 
     except Exception:
         # Robust fallback
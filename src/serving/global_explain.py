@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.common.logging import get_logger, LogTimer
+from src.common.settings import SETTINGS
+from src.common.utils import read_json, write_json
+from src.serving.explainer import Explainer, LinearShapExplainer, TreeShapExplainer, explain_global
+
+logger = get_logger("global_explain")
+
+
+def cache_key(model_version: str, model_sha256: str) -> str:
+    return f"{model_version}:{model_sha256[:16]}"
+
+
+def global_cache_dir(root: Path, model_version: str, model_sha256: str) -> Path:
+    """
+    Per-model directory for on-demand recomputes, outside the immutable version dirs.
+    """
+    safe_version = "".join(c if c.isalnum() or c in "-._" else "_" for c in model_version)
+    return root / f"{safe_version}-{model_sha256[:16]}"
+
+
+def render_plot(items: List[Dict[str, Any]], method: str, out: Path) -> Optional[str]:
+    """
+    Top-10 horizontal bar chart; returns the file name (relative to out's dir) or None.
+    """
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        top = items[:10]
+        labels = [d["feature"] for d in top]
+        values = [d["mean_abs_shap"] for d in top]
+        plt.figure(figsize=(8, 4))
+        plt.barh(list(reversed(labels)), list(reversed(values)))
+        plt.title(f"Global Feature Importance ({method})")
+        plt.xlabel("importance")
+        plt.tight_layout()
+        plt.savefig(out)
+        plt.close()
+        return out.name
+    except Exception as e:
+        logger.info("global_explain_plot_failed", extra={"ctx": {"err": str(e)}})
+        return None
+
+
+def compute_global_explanation(
+    explainer: Explainer,
+    model: Any,
+    sample_df: pd.DataFrame,
+    feature_list: List[str],
+    model_version: str,
+    model_sha256: str,
+    out_dir: Optional[Path] = None,
+    jobs: Any = None,
+    shards: int = 0,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """
+    Global mean |SHAP| over the sample, as a versioned entry (see GlobalExplainStore).
+
+    Kernel explainers are sharded over `jobs` (an ExplainJobManager) when shards > 0;
+    otherwise explain_global runs in-process. With out_dir set, the entry and its plot
+    are written there as SETTINGS.global_explain_filename / global_explain_plot_filename;
+    the returned entry's plot_path is then the plot's full path.
+    """
+    t = LogTimer()
+    items = None
+    if (
+        jobs is not None
+        and shards > 0
+        and not isinstance(explainer, (LinearShapExplainer, TreeShapExplainer))
+    ):
+        try:
+            items = jobs.explain_global(
+                sample_df[feature_list].to_numpy(dtype=float),
+                feature_list,
+                shards=shards,
+                seed=seed,
+                model_version=model_version,
+            )
+            method = "shap_kernel"
+        except Exception as e:
+            logger.info("global_explain_sharded_failed", extra={"ctx": {"err": str(e)}})
+            items = None
+    if items is None:
+        # robust explainer call (never throws due to fallback)
+        items, method = explain_global(explainer, model, sample_df, feature_list, max_rows=80)
+
+    entry: Dict[str, Any] = {
+        "model_version": model_version,
+        "model_sha256": model_sha256,
+        "method": method,
+        "rows": int(len(sample_df)),
+        "items": items,
+        "plot_path": None,
+        "computed_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "compute_ms": t.ms(),
+    }
+    if out_dir is not None:
+        entry["plot_path"] = render_plot(
+            items, method, out_dir / SETTINGS.global_explain_plot_filename
+        )
+        try:
+            write_json(out_dir / SETTINGS.global_explain_filename, entry)
+        except Exception as e:
+            logger.info("global_explain_write_failed", extra={"ctx": {"err": str(e)}})
+        if entry["plot_path"]:
+            entry["plot_path"] = str(out_dir / entry["plot_path"])
+
+    logger.info(
+        "global_explain_computed",
+        extra={
+            "ctx": {
+                "model_version": model_version,
+                "method": method,
+                "rows": entry["rows"],
+                "ms": entry["compute_ms"],
+            }
+        },
+    )
+    return entry
+
+
+def read_global_artifact(
+    artifacts_dir: Path, model_version: str, model_sha256: str
+) -> Optional[Dict[str, Any]]:
+    """
+    The precomputed entry from the artifacts dir, only if it was built for this exact model.
+    plot_path is resolved against artifacts_dir.
+    """
+    path = artifacts_dir / SETTINGS.global_explain_filename
+    if not path.exists():
+        return None
+    try:
+        entry = read_json(path)
+    except Exception:
+        return None
+    if entry.get("model_version") != model_version or entry.get("model_sha256") != model_sha256:
+        logger.info(
+            "global_explain_artifact_stale",
+            extra={
+                "ctx": {
+                    "artifact_version": entry.get("model_version"),
+                    "model_version": model_version,
+                }
+            },
+        )
+        return None
+    if entry.get("plot_path"):
+        entry["plot_path"] = str(artifacts_dir / entry["plot_path"])
+    return entry
+
+
+def _check_entry_key(key: str, entry: Dict[str, Any]) -> None:
+    entry_key = cache_key(str(entry.get("model_version", "")), str(entry.get("model_sha256", "")))
+    if entry_key != key:
+        raise ValueError(f"global explanation for {entry_key} cannot be stored under {key}")
+
+
+class GlobalExplainStore:
+    """
+    Global explanation entries keyed by cache_key(model version, model content hash).
+
+    Misses are recomputed in a single background thread, one computation per key at a
+    time (concurrent callers share the pending future); failures are not cached, so the
+    next request retries. An entry is only stored under the key of the model it was
+    computed for.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._hits = 0
+        self._misses = 0
+        self._computes = 0
+        self._failures = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        _check_entry_key(key, entry)
+        with self._lock:
+            self._entries[key] = entry
+
+    def ensure(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Future:
+        """
+        Starts (or joins) the background computation for key.
+        """
+        with self._lock:
+            fut = self._pending.get(key)
+            if fut is not None:
+                return fut
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="global-explain"
+                )
+            fut = self._executor.submit(self._run, key, compute)
+            self._pending[key] = fut
+            return fut
+
+    def _run(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            entry = compute()
+            _check_entry_key(key, entry)
+            with self._lock:
+                self._entries[key] = entry
+                self._computes += 1
+            return entry
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+            logger.info("global_explain_compute_failed", extra={"ctx": {"key": key, "err": str(e)}})
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def wait(self, fut: Future, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        The entry if the computation finishes within timeout, else None. Raises on failure.
+        """
+        try:
+            return fut.result(timeout=max(0.0, timeout))
+        except TimeoutError:
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": sorted(self._entries),
+                "pending": sorted(self._pending),
+                "hits": self._hits,
+                "misses": self._misses,
+                "computes": self._computes,
+                "failures": self._failures,
+            }
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.common.logging import get_logger, LogTimer
+from src.common.settings import SETTINGS
+from src.serving.batcher import MicroBatcher
+from src.serving.explainer import Explainer, build_explainer, explain_local
+from src.serving.model_loader import LoadedArtifacts, load_artifacts
+from src.serving.scorer import predict_matrix
+
+logger = get_logger("model_holder")
+
+
+@dataclass(frozen=True)
+class ServingModel:
+    """
+    Everything a request needs from one model version. Immutable: a request takes one
+    reference at the start and uses it to the end, so a swap never mixes versions.
+    """
+
+    art: LoadedArtifacts
+    explainer: Explainer
+    batcher: Optional[MicroBatcher]
+    loaded_at: float
+
+    @property
+    def version(self) -> str:
+        return self.art.model_version
+
+
+def load_serving_model(artifacts_dir: Path, warm: bool = True) -> ServingModel:
+    art = load_artifacts(artifacts_dir)
+    bg = art.background_df()
+    explainer = build_explainer(
+        art.model, bg, art.feature_list, art.metrics.get("model_type"), kernel=art.kernel
+    )
+    batcher = (
+        MicroBatcher(
+            lambda X: predict_matrix(art.model, X, art.feature_list, art.kernel),
+            max_batch_size=SETTINGS.microbatch_max_size,
+            max_wait_ms=SETTINGS.microbatch_max_wait_ms,
+            name=f"score-{art.model_version}",
+        )
+        if SETTINGS.microbatch_enabled
+        else None
+    )
+    sm = ServingModel(art, explainer, batcher, time.time())
+    if warm:
+        warm_up(sm, bg)
+    return sm
+
+
+def warm_up(sm: ServingModel, background_df: Any) -> None:
+    """
+    One prediction and one local explanation on a background row, so the first real
+    request doesn't pay lazy initialisation (sklearn validation, SHAP setup, caches).
+    """
+    row = background_df[sm.art.feature_list].head(1)
+    predict_matrix(sm.art.model, row.to_numpy(dtype=float), sm.art.feature_list, sm.art.kernel)
+    explain_local(sm.explainer, sm.art.model, row, sm.art.feature_list, top_k=1)
+
+
+def _fingerprint(artifacts_dir: Path) -> Tuple[Any, ...]:
+    """
+    Changes whenever `artifacts_dir` points at (or contains) a different model.
+    """
+    try:
+        real = os.path.realpath(artifacts_dir)
+        model = os.stat(Path(real) / SETTINGS.model_filename)
+        metrics = os.stat(Path(real) / SETTINGS.metrics_filename)
+        return (real, model.st_mtime_ns, model.st_size, metrics.st_mtime_ns)
+    except OSError:
+        return ()
+
+
+class ModelHolder:
+    """
+    Versioned handle on the serving model with zero-downtime reloads.
+
+    reload_async() loads and warms the new version on a background thread, then swaps a
+    single reference; requests already holding the old ServingModel finish on it. The old
+    micro-batcher is closed after grace_s. Reloads are single-flight: a trigger during a
+    load schedules exactly one more load afterwards. A load that yields the same model
+    (version + content hash) is not swapped.
+    """
+
+    def __init__(
+        self,
+        artifacts_dir: Path,
+        loader: Callable[[Path], ServingModel] = load_serving_model,
+        grace_s: float = 30.0,
+    ) -> None:
+        self.artifacts_dir = Path(artifacts_dir)
+        self._loader = loader
+        self.grace_s = float(grace_s)
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._on_swap: List[Callable[[ServingModel, ServingModel], None]] = []
+
+        t = LogTimer()
+        self._current = loader(self.artifacts_dir)
+        self._fingerprint = _fingerprint(self.artifacts_dir)
+        self._pending: Optional[Future] = None
+        self._rerun = False
+        self._reloads = 0
+        self._unchanged = 0
+        self._failures = 0
+        self._last_error: Optional[str] = None
+        self._history: "deque[Dict[str, Any]]" = deque(maxlen=20)
+        self._history.append(
+            {
+                "reason": "startup",
+                "old_version": None,
+                "new_version": self._current.version,
+                "load_ms": t.ms(),
+                "swap_us": 0.0,
+                "at": time.time(),
+            }
+        )
+
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def current(self) -> ServingModel:
+        return self._current
+
+    def add_swap_listener(self, fn: Callable[[ServingModel, ServingModel], None]) -> None:
+        """
+        fn(old, new) runs on the reload thread right after a swap; errors are logged only.
+        """
+        self._on_swap.append(fn)
+
+    def reload_async(self, reason: str = "manual") -> Future:
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                self._rerun = True
+                return self._pending
+            fut: Future = Future()
+            self._pending = fut
+        threading.Thread(
+            target=self._reload_loop, args=(fut, reason), name="model-reload", daemon=True
+        ).start()
+        return fut
+
+    def _reload_loop(self, fut: Future, reason: str) -> None:
+        result: Dict[str, Any] = {}
+        try:
+            while True:
+                result = self.reload(reason)
+                with self._lock:
+                    if not self._rerun:
+                        break
+                    self._rerun = False
+                    reason = "coalesced"
+        finally:
+            fut.set_result(result)
+
+    def reload(self, reason: str = "manual") -> Dict[str, Any]:
+        """
+        Synchronous load + warm + swap. Returns a swap record; never raises.
+        """
+        with self._reload_lock:
+            fingerprint = _fingerprint(self.artifacts_dir)
+            t = LogTimer()
+            try:
+                new = self._loader(self.artifacts_dir)
+            except Exception as e:
+                # record the fingerprint anyway: the watcher retries only once the files change again
+                with self._lock:
+                    self._fingerprint = fingerprint
+                    self._failures += 1
+                    self._last_error = str(e)
+                logger.info("model_reload_failed", extra={"ctx": {"reason": reason, "err": str(e)}})
+                return {"status": "failed", "reason": reason, "error": str(e)}
+            load_ms = t.ms()
+
+            old = self._current
+            if (new.version, new.art.model_sha256) == (old.version, old.art.model_sha256):
+                with self._lock:
+                    self._fingerprint = fingerprint
+                    self._unchanged += 1
+                if new.batcher is not None:
+                    new.batcher.close()
+                return {
+                    "status": "unchanged",
+                    "reason": reason,
+                    "version": old.version,
+                    "load_ms": load_ms,
+                }
+
+            t0 = time.perf_counter()
+            with self._lock:
+                self._current = new
+                self._fingerprint = fingerprint
+            swap_us = (time.perf_counter() - t0) * 1e6
+
+            record = {
+                "reason": reason,
+                "old_version": old.version,
+                "new_version": new.version,
+                "load_ms": load_ms,
+                "swap_us": swap_us,
+                "at": time.time(),
+            }
+            with self._lock:
+                self._reloads += 1
+                self._last_error = None
+                self._history.append(record)
+            logger.info("model_swapped", extra={"ctx": record})
+
+            for fn in self._on_swap:
+                try:
+                    fn(old, new)
+                except Exception as e:
+                    logger.info("model_swap_listener_failed", extra={"ctx": {"err": str(e)}})
+            if old.batcher is not None:
+                timer = threading.Timer(self.grace_s, old.batcher.close)
+                timer.daemon = True
+                timer.start()
+            return {"status": "swapped", **record}
+
+    # ---- file watcher ----
+    def start_watcher(self, interval_s: float) -> None:
+        if interval_s <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(
+            target=self._watch, args=(float(interval_s),), name="model-watch", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+
+    def _watch(self, interval_s: float) -> None:
+        while not self._stop.wait(interval_s):
+            if _fingerprint(self.artifacts_dir) not in ((), self._fingerprint):
+                self.reload_async("file_watch").result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cur = self._current
+            last = self._history[-1] if self._history else None
+            return {
+                "model_version": cur.version,
+                "model_sha256": cur.art.model_sha256,
+                "artifacts_dir": str(self.artifacts_dir),
+                "resolved_dir": os.path.realpath(self.artifacts_dir),
+                "loaded_at": cur.loaded_at,
+                "reloads": self._reloads,
+                "unchanged_reloads": self._unchanged,
+                "failures": self._failures,
+                "last_error": self._last_error,
+                "reload_in_progress": self._pending is not None and not self._pending.done(),
+                "last_swap": last,
+                "history": list(self._history),
+            }
@@ -1,17 +1,204 @@
 from __future__ import annotations
 
+import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import joblib
+import numpy as np
 from src.common.settings import SETTINGS
-from src.common.utils import read_json
+from src.common.utils import file_sha256, read_json, write_json
 from src.common.logging import get_logger
 
 logger = get_logger("model_loader")
 
 
+@dataclass(frozen=True)
+class LinearKernel:
+    """
+    Array-only form of CalibratedClassifierCV(Pipeline[StandardScaler, LogisticRegression], sigmoid).
+    Per calibration fold k (scaler folded into the LR weights):
+      margin_k = X @ weights[k] + intercepts[k]
+      p_k      = sigmoid(-(cal_a[k] * margin_k + cal_b[k]))
+    and the ensemble probability is mean_k(p_k), exactly like sklearn's predict_proba[:, 1].
+    """
+
+    weights: np.ndarray  # (k, n_features)
+    intercepts: np.ndarray  # (k,)
+    cal_a: np.ndarray  # (k,)
+    cal_b: np.ndarray  # (k,)
+
+    def margins(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return X @ self.weights.T + self.intercepts  # (n, k)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        z = -(self.margins(X) * self.cal_a + self.cal_b)
+        p = np.exp(-np.logaddexp(0.0, -z))  # numerically stable sigmoid
+        return p.mean(axis=1)
+
+
+def extract_linear_kernel(model: Any) -> Optional[LinearKernel]:
+    """
+    Folds a calibrated scaler+LR ensemble into flat coefficient arrays.
+    Returns None for anything else (e.g. gradient boosting), callers then use sklearn.
+    """
+    folds = getattr(model, "calibrated_classifiers_", None)
+    if not folds:
+        return None
+
+    weights, intercepts, cal_a, cal_b = [], [], [], []
+    for fold in folds:
+        if getattr(fold, "method", None) != "sigmoid" or len(fold.calibrators) != 1:
+            return None
+
+        steps = getattr(fold.estimator, "steps", None)
+        if not steps:
+            return None
+        clf = steps[-1][1]
+        coef = getattr(clf, "coef_", None)
+        if coef is None or coef.shape[0] != 1 or not hasattr(clf, "intercept_"):
+            return None
+
+        w = np.asarray(coef[0], dtype=float)
+        b = float(clf.intercept_[0])
+        # fold scalers (applied in order) into the linear layer: w.((x - mu) / s) = (w/s).x - (w/s).mu
+        for _, step in reversed(steps[:-1]):
+            if not (hasattr(step, "mean_") and hasattr(step, "scale_")):
+                return None
+            mu = np.asarray(step.mean_, dtype=float) if getattr(step, "with_mean", True) else 0.0
+            sc = np.asarray(step.scale_, dtype=float) if getattr(step, "with_std", True) else 1.0
+            w = w / sc
+            b = b - float(np.sum(w * mu))
+
+        weights.append(w)
+        intercepts.append(b)
+        cal_a.append(float(fold.calibrators[0].a_))
+        cal_b.append(float(fold.calibrators[0].b_))
+
+    return LinearKernel(
+        weights=np.vstack(weights),
+        intercepts=np.asarray(intercepts, dtype=float),
+        cal_a=np.asarray(cal_a, dtype=float),
+        cal_b=np.asarray(cal_b, dtype=float),
+    )
+
+
+# ---- pickle-free array artifacts (<artifacts>/arrays/*.npy, memory-mapped read-only) ----
+_KERNEL_FIELDS = ("weights", "intercepts", "cal_a", "cal_b")
+_ARRAYS_FORMAT = 1
+
+
+def export_array_artifacts(
+    out_dir: Path, model: Any, background: Any, global_sample: Any, feature_list: List[str]
+) -> Dict[str, Any]:
+    """
+    Writes the numeric parts of a version as plain .npy files plus a manifest:
+    background / global SHAP sample matrices (feature_list column order) and, for linear
+    models, the LinearKernel. Must run after model.joblib is written (the manifest pins
+    its sha256, so arrays never pair with a different model).
+    """
+    arrays_dir = out_dir / SETTINGS.arrays_dirname
+    arrays_dir.mkdir(parents=True, exist_ok=True)
+
+    files: Dict[str, str] = {}
+
+    def save(name: str, arr: np.ndarray) -> None:
+        np.save(arrays_dir / f"{name}.npy", np.ascontiguousarray(arr, dtype=np.float64))
+        files[name] = f"{name}.npy"
+
+    save("background", background[feature_list].to_numpy(dtype=float))
+    save("global_sample", global_sample[feature_list].to_numpy(dtype=float))
+    kernel = extract_linear_kernel(model)
+    if kernel is not None:
+        for field in _KERNEL_FIELDS:
+            save(f"linear_{field}", getattr(kernel, field))
+
+    manifest = {
+        "format": _ARRAYS_FORMAT,
+        "features": list(feature_list),
+        "model_sha256": file_sha256(out_dir / SETTINGS.model_filename),
+        "files": files,
+    }
+    write_json(arrays_dir / "manifest.json", manifest)
+    return manifest
+
+
+@dataclass(frozen=True)
+class ArrayArtifacts:
+    kernel: Optional[LinearKernel]
+    background: np.ndarray  # (n_bg, d), read-only memmap
+    global_sample: np.ndarray  # (n_sample, d), read-only memmap
+
+
+def load_array_artifacts(
+    ad: Path, feature_list: List[str], model_sha256: str
+) -> Optional[ArrayArtifacts]:
+    """
+    Memory-maps the exported arrays (np.load(mmap_mode="r")): every worker on the host
+    shares one physical copy through the page cache and loading is just an mmap.
+    Returns None when absent or not built for this model/feature order.
+    """
+    arrays_dir = ad / SETTINGS.arrays_dirname
+    manifest_path = arrays_dir / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    try:
+        manifest = read_json(manifest_path)
+        if (
+            manifest.get("format") != _ARRAYS_FORMAT
+            or manifest.get("features") != list(feature_list)
+            or manifest.get("model_sha256") != model_sha256
+        ):
+            logger.info("array_artifacts_stale", extra={"ctx": {"artifacts_dir": str(ad)}})
+            return None
+        files = manifest["files"]
+        load = lambda name: np.load(arrays_dir / files[name], mmap_mode="r", allow_pickle=False)  # noqa: E731
+        kernel = None
+        if all(f"linear_{f}" in files for f in _KERNEL_FIELDS):
+            kernel = LinearKernel(*(load(f"linear_{f}") for f in _KERNEL_FIELDS))
+        return ArrayArtifacts(kernel, load("background"), load("global_sample"))
+    except Exception as e:
+        logger.info(
+            "array_artifacts_unreadable", extra={"ctx": {"artifacts_dir": str(ad), "err": str(e)}}
+        )
+        return None
+
+
+class LazyModel:
+    """
+    Stands in for the unpickled model: model.joblib (and sklearn) is only loaded on
+    first attribute access. With a memory-mapped LinearKernel, scoring and exact
+    explanations never touch it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._model: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self) -> Any:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = joblib.load(self._path)
+                    logger.info("lazy_model_loaded", extra={"ctx": {"path": str(self._path)}})
+        return self._model
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
 @dataclass(frozen=True)
 class LoadedArtifacts:
     model: Any
@@ -21,13 +208,45 @@ class LoadedArtifacts:
     metrics: Dict[str, Any]
     model_card: str
     fairness_report: Dict[str, Any]
-    artifacts_dir: Path
+    artifacts_dir: Path  # the resolved version dir
+    kernel: Optional[LinearKernel] = None
+    model_sha256: str = ""
+    arrays: Optional[ArrayArtifacts] = None
+
+    @property
+    def model_version(self) -> str:
+        return str(self.metrics.get("training_date", "unknown"))
+
+    def background_df(self):
+        """
+        SHAP background as a DataFrame (a view over the memmap when arrays are present).
+        """
+        if self.arrays is None:
+            return joblib.load(self.artifacts_dir / SETTINGS.shap_background_filename)
+        import pandas as pd
 
+        return pd.DataFrame(self.arrays.background, columns=self.feature_list, copy=False)
 
-def load_artifacts(artifacts_dir: Optional[Path] = None) -> LoadedArtifacts:
-    ad = artifacts_dir or SETTINGS.artifacts_dir
+    def global_sample_df(self):
+        if self.arrays is None:
+            return joblib.load(self.artifacts_dir / SETTINGS.global_shap_sample_filename)
+        import pandas as pd
 
-    model = joblib.load(ad / SETTINGS.model_filename)
+        return pd.DataFrame(self.arrays.global_sample, columns=self.feature_list, copy=False)
+
+
+def load_artifacts(
+    artifacts_dir: Optional[Path] = None, mmap: Optional[bool] = None
+) -> LoadedArtifacts:
+    """
+    artifacts_dir (e.g. the artifacts/latest symlink) is resolved once, and every read,
+    including the lazy model and SHAP sample loads, goes to that version dir: a later
+    promote cannot pair files from two versions.
+    """
+    ad = Path(os.path.realpath(artifacts_dir or SETTINGS.artifacts_dir))
+    mmap = SETTINGS.artifacts_mmap if mmap is None else mmap
+
+    model_sha256 = file_sha256(ad / SETTINGS.model_filename)
     schema = read_json(ad / SETTINGS.feature_schema_filename)
     metrics = read_json(ad / SETTINGS.metrics_filename)
     model_card = (ad / SETTINGS.model_card_filename).read_text(encoding="utf-8")
@@ -39,5 +258,36 @@ def load_artifacts(artifacts_dir: Optional[Path] = None) -> LoadedArtifacts:
     stats_means = schema["stats"]["means"]
     stats_stds = schema["stats"]["stds"]
 
-    logger.info("Artifacts loaded", extra={"ctx": {"artifacts_dir": str(ad), "model_type": metrics.get("model_type")}})
-    return LoadedArtifacts(model, feature_list, stats_means, stats_stds, metrics, model_card, fairness, ad)
+    arrays = load_array_artifacts(ad, feature_list, model_sha256) if mmap else None
+    if arrays is not None and arrays.kernel is not None:
+        # everything the linear serving path needs is memory-mapped; unpickle only on demand
+        model: Any = LazyModel(ad / SETTINGS.model_filename)
+        kernel: Optional[LinearKernel] = arrays.kernel
+    else:
+        model = joblib.load(ad / SETTINGS.model_filename)
+        kernel = extract_linear_kernel(model)
+
+    logger.info(
+        "Artifacts loaded",
+        extra={
+            "ctx": {
+                "artifacts_dir": str(ad),
+                "model_type": metrics.get("model_type"),
+                "linear_kernel": kernel is not None,
+                "mmap_arrays": arrays is not None,
+            }
+        },
+    )
+    return LoadedArtifacts(
+        model,
+        feature_list,
+        stats_means,
+        stats_stds,
+        metrics,
+        model_card,
+        fairness,
+        ad,
+        kernel,
+        model_sha256,
+        arrays,
+    )
@@ -1,15 +1,63 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from src.common.utils import normalize_features_ordered, z_score_warnings
+import numpy as np
+import pandas as pd
 
+from src.common.metrics import stage
+from src.common.utils import (
+    features_matrix,
+    normalize_features_batch,
+    normalize_features_ordered,
+    z_score_warnings,
+)
+from src.serving.model_loader import LinearKernel
 
-def predict_probability(model, payload: Dict, feature_list: List[str]) -> float:
-    X = normalize_features_ordered(payload, feature_list)
-    return float(model.predict_proba(X)[:, 1][0])
 
+def predict_probability(
+    model, payload: Dict, feature_list: List[str], kernel: Optional[LinearKernel] = None
+) -> float:
+    with stage("predict"):
+        if kernel is not None:
+            return float(kernel.predict_proba(features_matrix([payload], feature_list))[0])
+        X = normalize_features_ordered(payload, feature_list)
+        return float(model.predict_proba(X)[:, 1][0])
 
-def ood_warnings(payload: Dict, means: Dict[str, float], stds: Dict[str, float], z_threshold: float) -> List[str]:
-    x_num = {k: (1.0 if payload[k] is True else 0.0) if isinstance(payload[k], bool) else float(payload[k]) for k in payload.keys()}
-    return z_score_warnings(x_num, means, stds, z_threshold)
+
+def predict_probabilities(
+    model, payloads: List[Dict], feature_list: List[str], kernel: Optional[LinearKernel] = None
+) -> np.ndarray:
+    """
+    Scores N payloads with a single predict_proba call on the stacked matrix
+    (or a single kernel evaluation when the model has a precomputed LinearKernel).
+    """
+    if kernel is not None:
+        return kernel.predict_proba(features_matrix(payloads, feature_list))
+    X = normalize_features_batch(payloads, feature_list)
+    return np.asarray(model.predict_proba(X)[:, 1], dtype=float)
+
+
+def predict_matrix(
+    model, X: np.ndarray, feature_list: List[str], kernel: Optional[LinearKernel] = None
+) -> np.ndarray:
+    """
+    Scores an already-stacked (n, d) feature matrix in feature_list order.
+    """
+    if kernel is not None:
+        return kernel.predict_proba(X)
+    X_df = pd.DataFrame(np.asarray(X, dtype=float), columns=feature_list)
+    return np.asarray(model.predict_proba(X_df)[:, 1], dtype=float)
+
+
+def ood_warnings(
+    payload: Dict, means: Dict[str, float], stds: Dict[str, float], z_threshold: float
+) -> List[str]:
+    with stage("ood"):
+        x_num = {
+            k: (1.0 if payload[k] is True else 0.0)
+            if isinstance(payload[k], bool)
+            else float(payload[k])
+            for k in payload.keys()
+        }
+        return z_score_warnings(x_num, means, stds, z_threshold)
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.common.decisioning import decision_from_prob
+from src.common.logging import get_logger
+from src.common.model_registry import load_registry
+from src.serving.model_loader import LoadedArtifacts, load_artifacts
+from src.serving.scorer import predict_matrix
+
+logger = get_logger("shadow")
+
+_DECISIONS = ("approve", "step_up", "review", "decline")
+
+
+def load_challenger(version: str) -> LoadedArtifacts:
+    """
+    Artifacts of a registry version (its recorded path, else artifacts/<version>).
+    """
+    entry = next(
+        (m for m in load_registry().get("models", []) if m.get("version") == version), None
+    )
+    path = Path(entry["path"]) if entry and entry.get("path") else Path("artifacts") / version
+    if not path.exists():
+        raise FileNotFoundError(f"Unknown challenger version dir: {path}")
+    return load_artifacts(path)
+
+
+def build_shadow_scorer(version: str, **kwargs: Any) -> Optional["ShadowScorer"]:
+    """
+    ShadowScorer for a registry version, or None (shadow off) if it is unset or fails to load.
+    """
+    if not version:
+        return None
+    try:
+        return ShadowScorer(load_challenger(version), **kwargs)
+    except Exception as e:
+        logger.info("shadow_disabled", extra={"ctx": {"version": version, "err": str(e)}})
+        return None
+
+
+def _percentiles(samples: "deque[float]") -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(np.fromiter(samples, dtype=float), [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+class _PairStats:
+    """
+    Comparison stats for one (champion version, challenger) pair; caller holds the lock.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.rows = 0
+        self.agree = 0
+        self.matrix = {c: {h: 0 for h in _DECISIONS} for c in _DECISIONS}
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+        self.abs_deltas: "deque[float]" = deque(maxlen=window)
+        self.champion_latency: "deque[float]" = deque(maxlen=window)
+
+    def to_dict(self, challenger_version: str) -> Dict[str, Any]:
+        n = self.rows
+        return {
+            "challenger_version": challenger_version,
+            "rows": n,
+            "agreement_rate": (self.agree / n) if n else None,
+            "decision_matrix": {c: dict(row) for c, row in self.matrix.items()},
+            "prob_delta": {
+                "mean": (self.delta_sum / n) if n else 0.0,
+                "mean_abs": (self.abs_delta_sum / n) if n else 0.0,
+                "max_abs": self.max_abs_delta,
+                "abs": _percentiles(self.abs_deltas),
+            },
+            "champion_latency_ms": _percentiles(self.champion_latency),
+        }
+
+
+class ShadowScorer:
+    """
+    Champion/challenger shadow scoring, off the response path.
+
+    The request handler only enqueues (feature row, champion prob, champion version,
+    champion latency); a background thread drains up to max_batch rows and scores them
+    with the challenger in one vectorized call. The queue is bounded: when the
+    challenger falls behind, rows are dropped (and counted) rather than slowing the
+    champion.
+
+    Decision agreement (and the champion x challenger decision matrix), probability
+    deltas (challenger - champion) and champion latency are kept per champion version,
+    so a champion reload starts a new comparison instead of mixing two champions.
+    Percentiles are over the last `window` rows of each pair.
+    """
+
+    def __init__(
+        self,
+        challenger: LoadedArtifacts,
+        max_queue: int = 10000,
+        max_batch: int = 256,
+        window: int = 10000,
+    ) -> None:
+        self.challenger = challenger
+        self.max_batch = max(1, int(max_batch))
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, float, str, float]]]" = queue.Queue(
+            maxsize=max(1, int(max_queue))
+        )
+        self._lock = threading.Lock()
+
+        self._rows = 0
+        self._batches = 0
+        self._dropped = 0
+        self._errors = 0
+        # champion version -> comparison against this challenger
+        self._pairs: Dict[str, _PairStats] = {}
+        self._challenger_latency: "deque[float]" = deque(maxlen=window)
+        self._window = window
+
+        self._thread = threading.Thread(target=self._run, name="shadow-score", daemon=True)
+        self._thread.start()
+
+    @property
+    def version(self) -> str:
+        return self.challenger.model_version
+
+    def submit(
+        self,
+        x_row: np.ndarray,
+        champion_prob: float,
+        champion_version: str,
+        champion_latency_ms: float,
+    ) -> bool:
+        """
+        Non-blocking; returns False if the row was dropped.
+        """
+        try:
+            self._queue.put_nowait(
+                (x_row, float(champion_prob), champion_version, float(champion_latency_ms))
+            )
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+    def drain(self, timeout: float = 5.0) -> None:
+        """
+        Blocks until everything queued so far has been scored (tests, benchmarks).
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    self._queue.task_done()
+                    break
+                batch.append(nxt)
+            try:
+                self._score(batch)
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                logger.info(
+                    "shadow_score_failed", extra={"ctx": {"size": len(batch), "err": str(e)}}
+                )
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _score(self, batch: List[Tuple[np.ndarray, float, str, float]]) -> None:
+        X = np.vstack([row for row, _, _, _ in batch])
+        t0 = time.perf_counter()
+        challenger = predict_matrix(
+            self.challenger.model, X, self.challenger.feature_list, self.challenger.kernel
+        )
+        per_row_ms = (time.perf_counter() - t0) * 1000.0 / len(batch)
+
+        champion = np.array([p for _, p, _, _ in batch], dtype=float)
+        delta = challenger - champion
+        abs_delta = np.abs(delta)
+        champ_dec = [decision_from_prob(p) for p in champion]
+        chall_dec = [decision_from_prob(p) for p in challenger]
+
+        with self._lock:
+            self._rows += len(batch)
+            self._batches += 1
+            for (_, _, version, ms), c, h, d, ad in zip(
+                batch, champ_dec, chall_dec, delta.tolist(), abs_delta.tolist(), strict=True
+            ):
+                pair = self._pairs.get(version)
+                if pair is None:
+                    pair = self._pairs[version] = _PairStats(self._window)
+                pair.rows += 1
+                pair.matrix[c][h] += 1
+                pair.agree += c == h
+                pair.delta_sum += d
+                pair.abs_delta_sum += ad
+                pair.max_abs_delta = max(pair.max_abs_delta, ad)
+                pair.abs_deltas.append(ad)
+                pair.champion_latency.append(ms)
+            self._challenger_latency.extend([per_row_ms] * len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "challenger_version": self.version,
+                "rows": self._rows,
+                "batches": self._batches,
+                "dropped": self._dropped,
+                "errors": self._errors,
+                "queue_depth": self._queue.qsize(),
+                "by_champion": {v: pair.to_dict(self.version) for v, pair in self._pairs.items()},
+                "challenger_latency_ms": _percentiles(self._challenger_latency),
+            }
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from pathlib import Path
-import shutil
 import joblib
 from datetime import datetime, timezone
 
@@ -16,9 +15,12 @@ from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import roc_auc_score, brier_score_loss
 
 from src.common.settings import SETTINGS
-from src.common.utils import write_json
+from src.common.utils import file_sha256, write_json
 from src.common.logging import get_logger
-from src.common.model_registry import add_model
+from src.common.model_registry import add_model, point_latest, registry_lock
+from src.serving.explainer import build_explainer
+from src.serving.global_explain import compute_global_explanation
+from src.serving.model_loader import export_array_artifacts
 from src.training.data_gen import generate_synthetic_risk_data, FEATURES
 
 logger = get_logger("training")
@@ -34,13 +36,6 @@ def _stamp() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H%M%SZ")
 
 
-def _copy_to_latest(version_dir: Path, latest_dir: Path) -> None:
-    latest_dir.parent.mkdir(parents=True, exist_ok=True)
-    if latest_dir.exists():
-        shutil.rmtree(latest_dir)
-    shutil.copytree(version_dir, latest_dir)
-
-
 def _eval(y_true: np.ndarray, y_prob: np.ndarray) -> dict:
     return {
         "auc": float(roc_auc_score(y_true, y_prob)),
@@ -64,13 +59,15 @@ def _fairness_by_age(y_true: np.ndarray, y_prob: np.ndarray, ages: np.ndarray) -
         mask = (ages >= lo) & (ages <= hi)
         if mask.sum() < 50:
             continue
-        out["buckets"].append({
-            "bucket": name,
-            "n": int(mask.sum()),
-            "auc": float(roc_auc_score(y_true[mask], y_prob[mask])),
-            "brier": float(brier_score_loss(y_true[mask], y_prob[mask])),
-            "prevalence": float(y_true[mask].mean()),
-        })
+        out["buckets"].append(
+            {
+                "bucket": name,
+                "n": int(mask.sum()),
+                "auc": float(roc_auc_score(y_true[mask], y_prob[mask])),
+                "brier": float(brier_score_loss(y_true[mask], y_prob[mask])),
+                "prevalence": float(y_true[mask].mean()),
+            }
+        )
     return out
 
 
@@ -84,10 +81,19 @@ def main() -> None:
     X = df[FEATURES].copy()
     y = df["high_risk"].astype(int).values
 
-    X_train, X_temp, y_train, y_temp = train_test_split(X, y, test_size=0.25, random_state=42, stratify=y)
-    X_val, X_test, y_val, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=42, stratify=y_temp)
+    X_train, X_temp, y_train, y_temp = train_test_split(
+        X, y, test_size=0.25, random_state=42, stratify=y
+    )
+    X_val, X_test, y_val, y_test = train_test_split(
+        X_temp, y_temp, test_size=0.5, random_state=42, stratify=y_temp
+    )
 
-    lr = Pipeline(steps=[("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000, solver="lbfgs"))])
+    lr = Pipeline(
+        steps=[
+            ("scaler", StandardScaler()),
+            ("clf", LogisticRegression(max_iter=2000, solver="lbfgs")),
+        ]
+    )
     lr_cal = CalibratedClassifierCV(lr, method="sigmoid", cv=3)
 
     gbc = GradientBoostingClassifier(random_state=42)
@@ -105,7 +111,9 @@ def main() -> None:
     lr_eval = _eval(y_val, lr_val)
     gbc_eval = _eval(y_val, gbc_val)
 
-    def key(m): return (m["auc"], -m["brier"])
+    def key(m):
+        return (m["auc"], -m["brier"])
+
     chosen = "logistic_regression" if key(lr_eval) >= key(gbc_eval) else "gradient_boosting"
     model = lr_cal if chosen == "logistic_regression" else gbc_cal
 
@@ -173,22 +181,41 @@ Synthetic demo that outputs a probability for: **{SETTINGS.event_definition}**.
     joblib.dump(bg, version_dir / SETTINGS.shap_background_filename)
     joblib.dump(global_sample, version_dir / SETTINGS.global_shap_sample_filename)
 
-    _copy_to_latest(version_dir, latest_dir)
+    # pickle-free numeric arrays (memory-mapped by serving workers)
+    export_array_artifacts(version_dir, model, bg, global_sample, FEATURES)
+
+    # precompute the global explanation (+ plot) so serving never builds it on a request
+    logger.info("Precomputing global explanation...", extra={"ctx": {"stage": "global_explain"}})
+    compute_global_explanation(
+        build_explainer(model, bg, FEATURES, chosen),
+        model,
+        global_sample,
+        FEATURES,
+        model_version=training_date,
+        model_sha256=file_sha256(version_dir / SETTINGS.model_filename),
+        out_dir=version_dir,
+    )
+
+    # artifacts/latest -> <version> (atomic symlink swap; version dirs are immutable)
+    with registry_lock(base_artifacts):
+        point_latest(version_dir, latest_dir)
 
     # append to registry
     add_model(str(version_dir), metrics)
 
     logger.info(
         "Training complete",
-        extra={"ctx": {
-            "chosen": chosen,
-            "val_lr_auc": lr_eval["auc"],
-            "val_gbc_auc": gbc_eval["auc"],
-            "test_auc": test_eval["auc"],
-            "test_brier": test_eval["brier"],
-            "version_dir": str(version_dir),
-            "latest_dir": str(latest_dir),
-        }},
+        extra={
+            "ctx": {
+                "chosen": chosen,
+                "val_lr_auc": lr_eval["auc"],
+                "val_gbc_auc": gbc_eval["auc"],
+                "test_auc": test_eval["auc"],
+                "test_brier": test_eval["brier"],
+                "version_dir": str(version_dir),
+                "latest_dir": str(latest_dir),
+            }
+        },
     )
 
 
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from src.common import auth
+
+
+def test_key_index_prebuilds_principals():
+    index = auth.build_key_index(
+        auth._load_key_map(
+            demo_api_key="admin-key",
+            demo_api_keys_json=json.dumps(
+                {
+                    "legacy": 30,
+                    "viewer": {
+                        "rpm": 10,
+                        "role": "Viewer",
+                        "read_only": True,
+                        "expires_at": "2099-01-01T00:00:00Z",
+                    },
+                    "odd": {"role": "superuser"},
+                    "bad": {"expires_at": "not-a-date"},
+                }
+            ),
+        )
+    )
+    assert set(index) == {"admin-key", "legacy", "viewer", "odd"}
+    assert index["admin-key"][0].role == "admin"
+    assert index["legacy"][0].rpm == 30
+    assert index["odd"][0].role == "analyst"
+    principal, expires = index["viewer"]
+    assert principal.role == "viewer" and principal.read_only
+    assert expires == 4070908800.0
+
+
+def test_require_principal_uses_index(monkeypatch):
+    index = auth.build_key_index(
+        auth._load_key_map(
+            demo_api_key="",
+            demo_api_keys_json=json.dumps(
+                {
+                    "live": {"rpm": 5},
+                    "old": {"expires_at": "2001-01-01T00:00:00Z"},
+                }
+            ),
+        )
+    )
+    monkeypatch.setattr(auth, "_KEY_INDEX", index)
+
+    assert auth.require_principal("live") is index["live"][0]
+    for key, status in [(None, 401), ("nope", 403), ("old", 403)]:
+        with pytest.raises(HTTPException) as e:
+            auth.require_principal(key)
+        assert e.value.status_code == status
+
+
+def test_reload_swaps_index_from_keys_file(monkeypatch, tmp_path):
+    keys_file = tmp_path / "keys.json"
+    keys_file.write_text(json.dumps({"rotated": {"rpm": 7, "role": "analyst"}}), encoding="utf-8")
+    monkeypatch.setattr(auth, "_keys_file", lambda: keys_file)
+    monkeypatch.setattr(auth, "_KEY_INDEX", auth._KEY_INDEX)
+
+    before = auth._KEY_INDEX
+    auth.reload_key_index()
+    assert auth._KEY_INDEX is not before
+    assert auth.require_principal("rotated").rpm == 7
+
+
+def test_watcher_loads_keys_file_created_after_startup(monkeypatch, tmp_path):
+    import threading
+    import time
+
+    keys_file = tmp_path / "keys.json"
+    monkeypatch.setattr(auth, "_keys_file", lambda: keys_file)
+    monkeypatch.setattr(auth, "_KEY_INDEX", auth._KEY_INDEX)
+
+    stop = threading.Event()
+    watcher = threading.Thread(target=auth._watch_keys_file, args=(keys_file, 0.01, stop))
+    watcher.start()
+    try:
+        time.sleep(0.05)
+        keys_file.write_text(json.dumps({"late": {"rpm": 3}}), encoding="utf-8")
+        deadline = time.time() + 5
+        while "late" not in auth._KEY_INDEX and time.time() < deadline:
+            time.sleep(0.01)
+        assert auth.require_principal("late").rpm == 3
+    finally:
+        stop.set()
+        watcher.join(5)
+    assert not watcher.is_alive()
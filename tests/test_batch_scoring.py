@@ -0,0 +1,53 @@
+import os
+
+from fastapi.testclient import TestClient
+from src.api.main import app
+
+client = TestClient(app)
+HEADERS = {"X-API-Key": os.environ.get("DEMO_API_KEY", "demo_key")}
+
+LOW = {
+    "age": 34,
+    "income": 78000,
+    "account_age_days": 400,
+    "num_txn_30d": 22,
+    "avg_txn_amount_30d": 55.25,
+    "num_chargebacks_180d": 0,
+    "device_change_count_30d": 1,
+    "geo_distance_from_last_txn_km": 10.0,
+    "is_international": False,
+    "merchant_risk_score": 0.15,
+}
+HIGH = {
+    "age": 19,
+    "income": 12000,
+    "account_age_days": 12,
+    "num_txn_30d": 48,
+    "avg_txn_amount_30d": 310.9,
+    "num_chargebacks_180d": 2,
+    "device_change_count_30d": 5,
+    "geo_distance_from_last_txn_km": 1400.0,
+    "is_international": True,
+    "merchant_risk_score": 0.92,
+}
+
+
+def test_batch_matches_single_scores():
+    r = client.post("/v1/score/batch", json={"items": [LOW, HIGH, LOW]}, headers=HEADERS)
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["count"] == 3
+    assert len(data["results"]) == 3
+
+    for item, res in zip([LOW, HIGH, LOW], data["results"], strict=True):
+        single = client.post("/v1/score", json=item, headers=HEADERS)
+        assert single.status_code == 200, single.text
+        s = single.json()
+        assert abs(s["risk_probability_event"] - res["risk_probability_event"]) < 1e-9
+        assert s["decision"] == res["decision"]
+        assert s["reason_codes"] == res["reason_codes"]
+
+
+def test_batch_rejects_empty():
+    r = client.post("/v1/score/batch", json={"items": []}, headers=HEADERS)
+    assert r.status_code == 422
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.serving.batcher import MicroBatcher
+
+
+def test_concurrent_rows_are_coalesced_and_fanned_out():
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        time.sleep(0.002)
+        return X.sum(axis=1)
+
+    batcher = MicroBatcher(predict, max_batch_size=16, max_wait_ms=20.0)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(np.array([i, 1.0]))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(48)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == {i: float(i + 1) for i in range(48)}
+    assert sum(calls) == 48
+    assert len(calls) < 48
+    assert max(calls) <= 16
+
+    stats = batcher.stats()
+    assert stats["rows"] == 48
+    assert stats["batches"] == len(calls)
+    assert sum(stats["batch_size_histogram"].values()) == len(calls)
+
+
+def test_single_caller_does_not_wait_for_window():
+    batcher = MicroBatcher(lambda X: X[:, 0], max_batch_size=64, max_wait_ms=500.0)
+    t0 = time.perf_counter()
+    assert batcher.submit(np.array([0.25])) == 0.25
+    assert time.perf_counter() - t0 < 0.25
+    batcher.close()
+
+
+def test_predict_errors_propagate_to_callers():
+    def boom(X):
+        raise ValueError("bad batch")
+
+    batcher = MicroBatcher(boom, max_batch_size=4, max_wait_ms=1.0)
+    with pytest.raises(ValueError):
+        batcher.submit(np.array([1.0]))
+    assert batcher.stats()["errors"] == 1
+    batcher.close()
+
+
+def test_submit_after_close_predicts_directly():
+    batcher = MicroBatcher(lambda X: X[:, 0] * 2, max_batch_size=8, max_wait_ms=1.0)
+    batcher.close()
+    assert not batcher._thread.is_alive()
+    assert batcher.submit(np.array([0.25])) == 0.5
+    assert batcher.stats()["batches"] == 0
+
+
+def test_close_fails_rows_left_queued():
+    release = threading.Event()
+
+    def slow(X):
+        release.wait(5)
+        return X[:, 0]
+
+    batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=0.0)
+    results = {}
+
+    def worker(i):
+        try:
+            results[i] = batcher.submit(np.array([float(i)]))
+        except RuntimeError as e:
+            results[i] = e
+
+    first = threading.Thread(target=worker, args=(1,))
+    first.start()
+    time.sleep(0.05)  # row 1 is being predicted, row 2 waits in the queue
+    second = threading.Thread(target=worker, args=(2,))
+    second.start()
+    time.sleep(0.05)
+
+    batcher.close(timeout_s=0.05)
+    second.join(5)
+    assert isinstance(results[2], RuntimeError)
+
+    release.set()
+    first.join(5)
+    assert results[1] == 1.0
@@ -0,0 +1,41 @@
+from benchmarks.harness import compare, measure, meta_mismatches, summarize
+
+
+def _report(**p50):
+    return {"results": {k: {"p50_us": v, "ops_per_s": 1e6 / v} for k, v in p50.items()}}
+
+
+def test_compare_flags_only_regressions_over_threshold():
+    base = _report(fast=100.0, slow=100.0, tiny=0.5, gone=10.0)
+    cur = _report(fast=90.0, slow=140.0, tiny=0.9, new=5.0)
+
+    rows = {r["case"]: r for r in compare(base, cur, threshold=0.25)}
+    assert set(rows) == {"fast", "slow", "tiny"}
+    assert not rows["fast"]["regression"]
+    assert rows["slow"]["regression"] and abs(rows["slow"]["change"] - 0.4) < 1e-9
+    assert not rows["tiny"]["regression"]  # +80% but under min_delta_us
+
+    by_ops = {r["case"]: r for r in compare(base, cur, metric="ops_per_s", threshold=0.25)}
+    assert by_ops["slow"]["regression"] and not by_ops["fast"]["regression"]
+
+
+def test_measure_reports_percentiles_and_throughput():
+    stats = measure(lambda: sum(range(100)), min_time_s=0.01, min_iters=50, warmup=1)
+    assert stats["n"] >= 50
+    assert 0 < stats["p50_us"] <= stats["p95_us"] <= stats["p99_us"]
+    assert stats["ops_per_s"] > 0
+
+    s = summarize([1000, 2000, 3000, 4000], wall_s=0.5)
+    assert s["p50_us"] == 2.5 and s["ops_per_s"] == 8.0
+
+
+def test_meta_mismatches_reports_machine_differences_only():
+    base = {
+        "meta": {"git_sha": "aaa", "python": "3.11.7", "platform": "Linux-x86_64", "cpu_count": 1}
+    }
+    cur = {
+        "meta": {"git_sha": "bbb", "python": "3.11.7", "platform": "Linux-x86_64", "cpu_count": 8}
+    }
+    assert meta_mismatches(base, cur) == [{"key": "cpu_count", "baseline": 1, "current": 8}]
+    assert meta_mismatches(base, {"meta": dict(base["meta"], git_sha="ccc")}) == []
+    assert meta_mismatches(base, {"results": {}}) == []
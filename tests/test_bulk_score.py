@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.common.decisioning import decision_from_prob, expected_loss_usd, rule_reason_codes
+from src.common.settings import SETTINGS
+from src.serving import bulk_score
+from src.training.data_gen import FEATURES, generate_synthetic_risk_data
+
+
+class _LinearKernel:
+    def predict_proba(self, X):
+        return 1.0 / (1.0 + np.exp(-(X[:, 0] - 50.0) / 10.0))
+
+
+def _fake_worker():
+    bulk_score._WORKER["art"] = SimpleNamespace(
+        model=None,
+        kernel=_LinearKernel(),
+        feature_list=list(FEATURES),
+        metrics={},
+        model_version="vtest",
+    )
+    bulk_score._WORKER["bounds"] = bulk_score.field_bounds()
+
+
+def test_validate_chunk_flags_out_of_bounds_and_bad_types():
+    df = generate_synthetic_risk_data(n=5, seed=1)[FEATURES].copy()
+    df = df.astype(object)
+    df.loc[1, "age"] = 7
+    df.loc[2, "merchant_risk_score"] = "abc"
+    df.loc[3, "num_txn_30d"] = 2.5
+    df.loc[4, "is_international"] = "maybe"
+
+    X, errors = bulk_score.validate_chunk(df, FEATURES, bulk_score.field_bounds())
+    assert X.shape == (5, len(FEATURES))
+    assert errors[0] == ""
+    assert errors[1] == "age:lt_13"
+    assert errors[2] == "merchant_risk_score:missing_or_not_numeric"
+    assert errors[3] == "num_txn_30d:not_int"
+    assert errors[4] == "is_international:not_bool"
+
+
+def test_validate_chunk_accepts_float_and_string_bool_columns():
+    df = generate_synthetic_risk_data(n=4, seed=2)[FEATURES].copy()
+    df["is_international"] = [1.0, 0.0, 1.0, 0.0]
+    X, errors = bulk_score.validate_chunk(df, FEATURES, bulk_score.field_bounds())
+    j = FEATURES.index("is_international")
+    assert list(errors) == [""] * 4
+    assert list(X[:, j]) == [1.0, 0.0, 1.0, 0.0]
+
+    df["is_international"] = pd.Series(["1.0", "no", "True", 2.0], dtype=object)
+    X, errors = bulk_score.validate_chunk(df, FEATURES, bulk_score.field_bounds())
+    assert list(X[:3, j]) == [1.0, 0.0, 1.0]
+    assert list(errors) == ["", "", "", "is_international:not_bool"]
+
+
+def test_score_chunk_matches_scalar_decisioning():
+    _fake_worker()
+    df = generate_synthetic_risk_data(n=400, seed=7)[FEATURES].copy()
+    df.loc[0, "age"] = 500
+
+    out = bulk_score._score_chunk(df, 100, [])
+    assert list(out["row"][:2]) == [100, 101]
+    assert out.loc[0, "error"] == "age:gt_100" and out.loc[0, "decision"] == ""
+
+    for i in range(1, len(df)):
+        payload = df.iloc[i].to_dict()
+        payload["is_international"] = bool(payload["is_international"])
+        prob = float(_LinearKernel().predict_proba(np.array([[float(payload["age"])]]))[0])
+        assert out.loc[i, "risk_probability_event"] == pytest.approx(prob)
+        assert out.loc[i, "decision"] == decision_from_prob(prob)
+        assert out.loc[i, "expected_loss_usd"] == pytest.approx(expected_loss_usd(prob, payload))
+        assert out.loc[i, "reason_codes"] == ";".join(rule_reason_codes(payload))
+
+
+def test_run_streams_csv_in_chunks(tmp_path):
+    if not (SETTINGS.artifacts_dir / SETTINGS.model_filename).exists():
+        pytest.skip("no trained artifacts")
+    df = generate_synthetic_risk_data(n=250, seed=11)[FEATURES].copy()
+    df.insert(0, "txn_id", [f"t{i}" for i in range(len(df))])
+    src, dst = tmp_path / "in.csv", tmp_path / "out.csv"
+    df.to_csv(src, index=False)
+
+    summary = bulk_score.run(
+        src, dst, SETTINGS.artifacts_dir, chunk_size=60, workers=1, passthrough=["txn_id"]
+    )
+    out = pd.read_csv(dst, keep_default_na=False)
+    assert summary["rows"] == 250 and summary["invalid"] == 0
+    assert list(out["txn_id"]) == list(df["txn_id"])
+    assert list(out["row"]) == list(range(250))
+    assert set(out["decision"]) <= {"approve", "step_up", "review", "decline"}
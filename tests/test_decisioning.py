@@ -0,0 +1,52 @@
+import numpy as np
+
+from src.common.decisioning import (
+    decision_from_prob,
+    decisions_from_probs,
+    expected_loss_usd,
+    expected_losses_usd,
+    reason_codes_from_masks,
+    rule_reason_codes,
+    rule_reason_masks,
+)
+from src.common.settings import SETTINGS
+from src.training.data_gen import FEATURES, generate_synthetic_risk_data
+
+
+def _payloads(n: int = 2000):
+    df = generate_synthetic_risk_data(n=n, seed=5)[FEATURES]
+    X = df.to_numpy(dtype=float)
+    payloads = df.to_dict(orient="records")
+    for p in payloads:
+        p["is_international"] = bool(p["is_international"])
+    return X, payloads
+
+
+def test_decisions_match_scalar_including_threshold_edges():
+    edges = [SETTINGS.stepup_threshold, SETTINGS.review_threshold, SETTINGS.decline_threshold]
+    probs = np.concatenate([np.linspace(0.0, 1.0, 1001), edges, np.nextafter(edges, 0.0)])
+    assert list(decisions_from_probs(probs)) == [decision_from_prob(float(p)) for p in probs]
+
+
+def test_expected_loss_matches_scalar():
+    X, payloads = _payloads()
+    probs = np.random.default_rng(0).random(len(payloads))
+    got = expected_losses_usd(probs, X[:, FEATURES.index("avg_txn_amount_30d")])
+    np.testing.assert_allclose(
+        got,
+        [expected_loss_usd(float(p), d) for p, d in zip(probs, payloads, strict=True)],
+        rtol=1e-12,
+    )
+
+
+def test_rule_reason_codes_match_scalar():
+    X, payloads = _payloads()
+    masks = rule_reason_masks(X, FEATURES)
+    assert masks.any(axis=0).all()  # every rule fires somewhere in the sample
+
+    tuples = reason_codes_from_masks(masks)
+    joined = reason_codes_from_masks(masks, sep=";")
+    for i, payload in enumerate(payloads):
+        expected = rule_reason_codes(payload)
+        assert list(tuples[i]) == expected
+        assert joined[i] == ";".join(expected)
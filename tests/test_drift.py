@@ -0,0 +1,168 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.common import drift
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+FEATURES = ["age", "income", "is_international"]
+
+
+@pytest.fixture()
+def fake_redis(monkeypatch):
+    r = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(drift, "get_redis", lambda: r)
+    monkeypatch.setattr(drift, "_accumulator", None)
+    return r
+
+
+def test_drift_stats_single_hash_matches_numpy(fake_redis):
+    rng = np.random.default_rng(0)
+    ages = rng.integers(18, 90, size=200)
+    incomes = rng.lognormal(10.7, 0.6, size=200)
+    intl = rng.random(200) < 0.1
+
+    for a, i, b in zip(ages, incomes, intl, strict=True):
+        drift.update_drift_stats(
+            "k1", {"age": int(a), "income": float(i), "is_international": bool(b)}, FEATURES
+        )
+
+    drift.flush_drift_stats()
+    assert fake_redis.keys("drift:*") == ["drift:k1"]
+
+    s = drift.drift_summary("k1", {"age": 40.0}, {"age": 10.0}, FEATURES)
+    by_f = {it["feature"]: it for it in s["features"]}
+    for f, col in [("age", ages), ("income", incomes), ("is_international", intl.astype(float))]:
+        assert by_f[f]["n"] == 200
+        assert by_f[f]["mean"] == pytest.approx(float(np.mean(col)), rel=1e-12)
+        assert by_f[f]["std"] == pytest.approx(float(np.std(col, ddof=1)), rel=1e-9)
+
+
+def test_drift_stats_concurrent_updates_are_not_lost(fake_redis, monkeypatch):
+    monkeypatch.setattr(
+        drift, "get_accumulator", lambda: None
+    )  # write-through: every update hits Redis
+
+    def worker(offset):
+        for j in range(50):
+            drift.update_drift_stats(
+                "k2", {"age": offset + j, "income": 1.0, "is_international": False}, FEATURES
+            )
+
+    threads = [threading.Thread(target=worker, args=(i * 100,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    by_f = {it["feature"]: it for it in drift.drift_summary("k2", {}, {}, FEATURES)["features"]}
+    expected = [i * 100 + j for i in range(8) for j in range(50)]
+    assert by_f["age"]["n"] == 400
+    assert by_f["age"]["mean"] == pytest.approx(float(np.mean(expected)), rel=1e-12)
+
+
+def test_worker_accumulators_merge_exactly(fake_redis):
+    rng = np.random.default_rng(1)
+    chunks = [rng.normal(50.0 + 5 * i, 3.0 + i, size=120) for i in range(4)]
+    workers = [drift.DriftAccumulator(flush_interval_s=60.0) for _ in chunks]
+
+    for acc, chunk in zip(workers, chunks, strict=True):
+        for j, x in enumerate(chunk):
+            acc.add("k3", {"age": float(x)}, ["age"])
+            if j == 60:
+                acc.flush()  # partial flushes must combine exactly too
+
+    # unflushed state is still visible in the worker's local view
+    assert workers[0].local_view("k3")["age"][0] == 59
+
+    for acc in workers:
+        acc.flush()
+        assert acc.local_view("k3") == {}
+
+    allx = np.concatenate(chunks)
+    by_f = {it["feature"]: it for it in drift.drift_summary("k3", {}, {}, ["age"])["features"]}
+    assert by_f["age"]["n"] == len(allx)
+    assert by_f["age"]["mean"] == pytest.approx(float(np.mean(allx)), rel=1e-12)
+    assert by_f["age"]["std"] == pytest.approx(float(np.std(allx, ddof=1)), rel=1e-9)
+
+
+def test_verdict_cache_serves_from_memory_and_refreshes(monkeypatch):
+    calls = []
+    verdicts = [["drift_warning:age"]]
+
+    def compute(api_key, means, stds, features):
+        calls.append(api_key)
+        return list(verdicts[-1])
+
+    monkeypatch.setattr(drift, "_compute_drift_warnings", compute)
+    cache = drift.DriftVerdictCache(ttl_s=0.05, max_staleness_s=10.0)
+
+    assert cache.get("k4", {}, {}, FEATURES) == ["drift_warning:age"]
+    for _ in range(9):
+        assert cache.get("k4", {}, {}, FEATURES) == ["drift_warning:age"]
+    assert len(calls) == 1
+    assert cache.stats()["hit_rate"] == pytest.approx(0.9)
+
+    verdicts.append([])
+    assert cache.refresh_due() == 0
+    time.sleep(0.06)
+    assert cache.refresh_due() == 1
+    assert cache.get("k4", {}, {}, FEATURES) == []
+    assert len(calls) == 2
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_verdict_cache_recomputes_when_training_stats_change(monkeypatch):
+    seen = []
+
+    def compute(api_key, means, stds, features):
+        seen.append(means)
+        return [f"drift_warning:{means.get('age')}"]
+
+    monkeypatch.setattr(drift, "_compute_drift_warnings", compute)
+    cache = drift.DriftVerdictCache(ttl_s=60.0, max_staleness_s=60.0)
+
+    assert cache.get("k5", {"age": 1.0}, {}, FEATURES) == ["drift_warning:1.0"]
+    assert cache.get("k5", {"age": 1.0}, {}, FEATURES) == ["drift_warning:1.0"]
+    assert cache.get("k5", {"age": 2.0}, {}, FEATURES) == ["drift_warning:2.0"]
+    assert seen == [{"age": 1.0}, {"age": 2.0}]
+
+
+def test_clear_verdict_cache_drops_entries(monkeypatch):
+    monkeypatch.setattr(drift, "_compute_drift_warnings", lambda *a: [])
+    cache = drift.DriftVerdictCache(ttl_s=60.0, max_staleness_s=60.0)
+    monkeypatch.setattr(drift, "_verdicts", cache)
+    cache.get("k6", {}, {}, FEATURES)
+    assert cache.stats()["keys"] == 1
+    drift.clear_verdict_cache()
+    assert cache.stats()["keys"] == 0
+
+
+def test_summary_never_double_counts_a_landing_flush(fake_redis, monkeypatch):
+    acc = drift.DriftAccumulator(flush_interval_s=60.0)
+    monkeypatch.setattr(drift, "_accumulator", acc)
+    for x in range(10):
+        acc.add("k7", {"age": float(x)}, ["age"])
+
+    real_merge = drift._merge_into_redis
+    summaries = []
+
+    def merge_then_summarize(r, api_key, aggregates):
+        real_merge(r, api_key, aggregates)
+        # a summary racing the flush must wait until the batch has left the local view
+        t = threading.Thread(
+            target=lambda: summaries.append(drift.drift_summary("k7", {}, {}, ["age"]))
+        )
+        t.start()
+        t.join(0.1)
+        assert t.is_alive()
+        merge_then_summarize.thread = t
+
+    monkeypatch.setattr(drift, "_merge_into_redis", merge_then_summarize)
+    assert acc.flush() == 1
+    merge_then_summarize.thread.join(5)
+    assert summaries[0]["features"][0]["n"] == 10
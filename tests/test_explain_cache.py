@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from src.serving.explain_cache import ExplanationCache
+from src.serving.explainer import LocalExplanation
+
+FEATURES = ["income", "merchant_risk_score"]
+
+
+def _exp(p: float) -> LocalExplanation:
+    return LocalExplanation(
+        0.1,
+        p,
+        [
+            {
+                "feature": "income",
+                "shap_value": p,
+                "direction": "increases_risk",
+                "contribution_percent": 100.0,
+            }
+        ],
+    )
+
+
+def test_quantized_keys_and_lru():
+    cache = ExplanationCache(2, FEATURES, default_precision=1e-6, precision={"income": 1000.0})
+
+    cache.put("v1", np.array([50_100.0, 0.2]), _exp(0.3))
+    # same income bucket -> hit
+    assert cache.get("v1", np.array([49_900.0, 0.2])) == _exp(0.3)
+    # different merchant score at default precision -> miss
+    assert cache.get("v1", np.array([50_100.0, 0.21])) is None
+
+    cache.put("v1", np.array([1.0, 0.0]), _exp(0.4))
+    cache.put("v1", np.array([2_000.0, 0.0]), _exp(0.5))
+    assert cache.get("v1", np.array([50_100.0, 0.2])) is None  # evicted (LRU)
+
+    # a new version's keys never collide with v1's
+    assert cache.get("v2", np.array([2_000.0, 0.0])) is None
+
+    s = cache.stats()
+    assert s["hits"] == 1
+    assert s["evictions"] == 1
+
+
+def test_versions_interleave_until_the_old_one_is_dropped():
+    cache = ExplanationCache(8, FEATURES)
+    old_row, new_row = np.array([1.0, 0.1]), np.array([2.0, 0.2])
+
+    # grace period: in-flight v1 requests interleave with v2 ones
+    for _ in range(3):
+        cache.put("v1", old_row, _exp(0.1))
+        cache.put("v2", new_row, _exp(0.2))
+        assert cache.get("v1", old_row) == _exp(0.1)
+        assert cache.get("v2", new_row) == _exp(0.2)
+    assert cache.stats()["invalidations"] == 0
+
+    assert cache.drop_version("v1") == 1
+    assert cache.get("v1", old_row) is None
+    assert cache.get("v2", new_row) == _exp(0.2)
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_redis_backing_shares_entries_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    r = fakeredis.FakeRedis(decode_responses=True)
+    a = ExplanationCache(16, FEATURES, redis_getter=lambda: r)
+    b = ExplanationCache(16, FEATURES, redis_getter=lambda: r)
+
+    a.put("v1", np.array([1.0, 0.5]), _exp(0.7))
+    assert b.get("v1", np.array([1.0, 0.5])) == _exp(0.7)
+    assert b.stats()["redis_hits"] == 1
+    assert b.get("v2", np.array([1.0, 0.5])) is None
@@ -0,0 +1,242 @@
+import os
+import time
+
+from fastapi.testclient import TestClient
+from src.api.main import app
+
+client = TestClient(app)
+HEADERS = {"X-API-Key": os.environ.get("DEMO_API_KEY", "demo_key")}
+
+PAYLOAD = {
+    "age": 19,
+    "income": 12000,
+    "account_age_days": 12,
+    "num_txn_30d": 48,
+    "avg_txn_amount_30d": 310.9,
+    "num_chargebacks_180d": 2,
+    "device_change_count_30d": 5,
+    "geo_distance_from_last_txn_km": 1400.0,
+    "is_international": True,
+    "merchant_risk_score": 0.92,
+}
+
+
+def test_explain_job_round_trip():
+    r = client.post("/v1/explain/jobs", json=PAYLOAD, headers=HEADERS)
+    assert r.status_code == 202, r.text
+    job = r.json()
+    assert r.headers["location"] == job["status_url"]
+
+    deadline = time.time() + 120
+    while job["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.2)
+        job = client.get(job["status_url"], headers=HEADERS).json()
+    assert job["status"] == "done", job
+
+    sync = client.post("/v1/explain", json=PAYLOAD, headers=HEADERS).json()
+    assert job["result"]["risk_probability_event"] == sync["risk_probability_event"]
+    assert [f["feature"] for f in job["result"]["explanation"]["top_features"]] == [
+        f["feature"] for f in sync["explanation"]["top_features"]
+    ]
+
+    stats = client.get("/v1/monitor/explain-jobs", headers=HEADERS).json()
+    assert stats["completed"] >= 1
+    assert stats["queue_depth"] == 0
+
+
+def test_unknown_job_is_404():
+    r = client.get("/v1/explain/jobs/does-not-exist", headers=HEADERS)
+    assert r.status_code == 404
+
+
+def _kernel_artifacts(tmp_path):
+    import json
+    import shutil
+
+    from src.serving.model_loader import load_artifacts
+
+    src = load_artifacts().artifacts_dir
+    dst = tmp_path / "artifacts"
+    shutil.copytree(src, dst)
+    metrics = json.loads((dst / "metrics.json").read_text(encoding="utf-8"))
+    metrics["model_type"] = "opaque"  # forces the Kernel SHAP path
+    (dst / "metrics.json").write_text(json.dumps(metrics), encoding="utf-8")
+    return dst
+
+
+def test_sharded_global_explain_is_deterministic_across_worker_counts(tmp_path):
+    import joblib
+    import numpy as np
+
+    from src.common.settings import SETTINGS
+    from src.serving.explain_jobs import ExplainJobManager
+
+    art_dir = _kernel_artifacts(tmp_path)
+    sample = joblib.load(art_dir / SETTINGS.global_shap_sample_filename)
+    feature_list = list(sample.columns)
+    X = sample.to_numpy(dtype=float)[:12]
+
+    results = []
+    for workers in (1, 2, 2):
+        jobs = ExplainJobManager(art_dir, max_workers=workers)
+        try:
+            results.append(jobs.explain_global(X, feature_list, shards=3, seed=7))
+        finally:
+            jobs.shutdown()
+
+    assert len(results[0]) == len(feature_list)
+    for other in results[1:]:
+        assert [i["feature"] for i in other] == [i["feature"] for i in results[0]]
+        assert np.allclose(
+            [i["mean_abs_shap"] for i in other], [i["mean_abs_shap"] for i in results[0]]
+        )
+
+
+def test_submit_refuses_past_max_pending(tmp_path):
+    from concurrent.futures import Future
+
+    import pytest
+
+    from src.serving.explain_jobs import ExplainJobManager, ExplainQueueFull
+
+    class _Pool:
+        def __init__(self):
+            self.futures = []
+
+        def submit(self, fn, *args):
+            self.futures.append(Future())
+            return self.futures[-1]
+
+    jobs = ExplainJobManager(tmp_path, max_pending=2)
+    jobs._pool = pool = _Pool()
+    jobs.submit(PAYLOAD)
+    jobs.submit(PAYLOAD)
+    with pytest.raises(ExplainQueueFull):
+        jobs.submit(PAYLOAD)
+
+    pool.futures[0].set_exception(RuntimeError("boom"))
+    jobs.submit(PAYLOAD)
+    stats = jobs.stats()
+    assert (stats["queue_depth"], stats["rejected"], stats["failed"]) == (2, 1, 1)
+
+
+def test_explain_documents_deferred_202():
+    responses = app.openapi()["paths"]["/v1/explain"]["post"]["responses"]
+    assert responses["202"]["content"]["application/json"]["schema"]["$ref"].endswith(
+        "/ExplainJobResponse"
+    )
+
+
+def _two_versions(tmp_path):
+    import json
+    import shutil
+
+    from src.common.model_registry import point_latest
+    from src.serving.model_loader import load_artifacts
+
+    src = load_artifacts().artifacts_dir
+    for v in ("v1", "v2"):
+        shutil.copytree(src, tmp_path / v)
+        metrics = json.loads((tmp_path / v / "metrics.json").read_text(encoding="utf-8"))
+        metrics["training_date"] = v
+        (tmp_path / v / "metrics.json").write_text(json.dumps(metrics), encoding="utf-8")
+    latest = tmp_path / "latest"
+    point_latest(tmp_path / "v1", latest)
+    return latest
+
+
+def _finish(jobs, job_id):
+    deadline = time.time() + 120
+    while jobs.get(job_id)["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.1)
+    return jobs.get(job_id)
+
+
+def test_job_pool_is_pinned_to_the_served_version(tmp_path):
+    from src.common.model_registry import point_latest
+    from src.serving.explain_jobs import ExplainJobManager
+
+    latest = _two_versions(tmp_path)
+    jobs = ExplainJobManager(latest, max_workers=1)
+    try:
+        # promoted on disk, but the holder has not swapped yet: workers stay on v1
+        point_latest(tmp_path / "v2", latest)
+        assert _finish(jobs, jobs.submit(PAYLOAD, model_version="v1"))["status"] == "done"
+
+        # the swap listener re-points the pool at the new version dir
+        jobs.recycle(tmp_path / "v2")
+        assert _finish(jobs, jobs.submit(PAYLOAD, model_version="v2"))["status"] == "done"
+        stale = _finish(jobs, jobs.submit(PAYLOAD, model_version="v1"))
+        assert stale["status"] == "failed" and "model_version_mismatch" in stale["error"]
+    finally:
+        jobs.shutdown()
+
+
+def test_global_shards_from_another_version_are_rejected(tmp_path):
+    import joblib
+    import pytest
+
+    from src.common.settings import SETTINGS
+    from src.serving.explain_jobs import ExplainJobManager
+
+    latest = _two_versions(tmp_path)
+    sample = joblib.load(latest / SETTINGS.global_shap_sample_filename)
+    X = sample.to_numpy(dtype=float)[:6]
+    jobs = ExplainJobManager(latest, max_workers=1)
+    try:
+        assert (
+            len(jobs.explain_global(X, list(sample.columns), shards=2, model_version="v1"))
+            == X.shape[1]
+        )
+        with pytest.raises(RuntimeError, match="model_version_mismatch"):
+            jobs.explain_global(X, list(sample.columns), shards=2, model_version="v2")
+    finally:
+        jobs.shutdown()
+
+
+def test_failed_sync_job_returns_structured_error(monkeypatch):
+    import dataclasses
+
+    from src.api import routes
+    from src.common.settings import SETTINGS
+
+    class _FailingJobs:
+        def submit(self, payload, context=None, top_k=6, model_version=None):
+            return "job-1"
+
+        def wait(self, job_id, timeout):
+            raise RuntimeError("worker crashed")
+
+    routes._model()
+    monkeypatch.setattr(
+        routes, "SETTINGS", dataclasses.replace(SETTINGS, explain_sync_timeout_s=1.0)
+    )
+    monkeypatch.setattr(routes, "EXPLAIN_JOBS", _FailingJobs())
+    monkeypatch.setattr(routes, "EXPLAIN_CACHE", None)
+
+    r = client.post("/v1/explain", json=PAYLOAD, headers=HEADERS)
+    assert r.status_code == 500
+    assert r.json()["detail"] == {"error": "explain_failed", "message": "worker crashed"}
+
+
+def test_pool_is_replaced_after_a_worker_dies(tmp_path):
+    import signal
+
+    from src.serving.explain_jobs import ExplainJobManager
+    from src.serving.model_loader import load_artifacts
+
+    jobs = ExplainJobManager(load_artifacts().artifacts_dir, max_workers=1)
+    try:
+        assert _finish(jobs, jobs.submit(PAYLOAD))["status"] == "done"
+        pool = jobs._pool
+        for pid in list(pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        deadline = time.time() + 30
+        while not pool._broken and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert _finish(jobs, jobs.submit(PAYLOAD))["status"] == "done"
+        assert jobs._pool is not pool
+        assert jobs.stats()["pools_replaced"] == 1
+    finally:
+        jobs.shutdown()
@@ -26,4 +26,86 @@ def test_explain_returns_top_features_non_empty():
     assert isinstance(exp["top_features"], list)
     assert len(exp["top_features"]) > 0
     first = exp["top_features"][0]
-    assert set(first.keys()) == {"feature", "shap_value", "direction", "contribution_percent"}
\ No newline at end of file
+    assert set(first.keys()) == {"feature", "shap_value", "direction", "contribution_percent"}
+
+
+def _calibrated_lr():
+    import pandas as pd
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from src.training.data_gen import FEATURES, generate_synthetic_risk_data
+
+    df = generate_synthetic_risk_data(n=3000, seed=5)
+    lr = Pipeline(steps=[("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000))])
+    model = CalibratedClassifierCV(lr, method="sigmoid", cv=3).fit(
+        df[FEATURES], df["high_risk"].values
+    )
+    return model, pd.DataFrame(df[FEATURES]), FEATURES
+
+
+def test_linear_explainer_is_exact_and_additive():
+    import numpy as np
+    from src.serving.explainer import (
+        LinearShapExplainer,
+        build_explainer,
+        explain_global,
+        explain_local,
+    )
+
+    model, X, features = _calibrated_lr()
+    explainer = build_explainer(model, X.head(100), features, model_type="logistic_regression")
+    assert isinstance(explainer, LinearShapExplainer)
+
+    rows = X.iloc[100:140]
+    phi, pred, baseline = explainer.attributions(rows.to_numpy(dtype=float))
+    np.testing.assert_allclose(pred, model.predict_proba(rows)[:, 1], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(phi.sum(axis=1), pred - baseline, atol=1e-12)
+
+    # a feature sitting exactly at the background mean gets no attribution
+    row = rows.iloc[[0]].copy()
+    row["merchant_risk_score"] = explainer.background_mean[features.index("merchant_risk_score")]
+    local = explain_local(explainer, model, row, features, top_k=len(features))
+    by_name = {it["feature"]: it["shap_value"] for it in local.top_features}
+    assert abs(by_name["merchant_risk_score"]) < 1e-15
+    assert local == explain_local(explainer, model, row, features, top_k=len(features))
+
+    items, method = explain_global(explainer, model, X.head(400), features)
+    assert method == "shap_linear"
+    assert abs(sum(i["importance_percent"] for i in items) - 100.0) < 1e-6
+
+
+def test_tree_explainer_is_additive_and_batched():
+    import time
+
+    import numpy as np
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.ensemble import GradientBoostingClassifier
+    from src.serving.explainer import TreeShapExplainer, build_explainer, explain_global
+    from src.training.data_gen import FEATURES, generate_synthetic_risk_data
+
+    df = generate_synthetic_risk_data(n=3000, seed=11)
+    X = df[FEATURES]
+    model = CalibratedClassifierCV(
+        GradientBoostingClassifier(random_state=42), method="sigmoid", cv=3
+    )
+    model.fit(X, df["high_risk"].values)
+
+    explainer = build_explainer(model, X.head(100), FEATURES, model_type="gradient_boosting")
+    assert isinstance(explainer, TreeShapExplainer)
+
+    sample = X.iloc[:400]
+    phi, pred, baseline = explainer.attributions(sample.to_numpy(dtype=float))
+    np.testing.assert_allclose(pred, model.predict_proba(sample)[:, 1], atol=1e-6)
+    np.testing.assert_allclose(phi.sum(axis=1), pred - baseline, atol=1e-6)
+
+    timings = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        items, method = explain_global(explainer, model, sample, FEATURES)
+        timings.append(time.perf_counter() - t0)
+    # global SHAP over 400 rows stays well under a second
+    assert float(np.median(timings)) < 0.5
+    assert method == "shap_tree"
+    assert len(items) == len(FEATURES)
@@ -0,0 +1,102 @@
+import dataclasses
+import os
+import threading
+
+from fastapi.testclient import TestClient
+from src.api.main import app
+
+client = TestClient(app)
+HEADERS = {"X-API-Key": os.environ.get("DEMO_API_KEY", "demo_key")}
+
+
+def test_global_explain_serves_precomputed_artifact_for_loaded_model():
+    from src.api import routes
+    from src.serving.global_explain import read_global_artifact
+
+    art = routes.MODEL.current().art
+    artifact = read_global_artifact(art.artifacts_dir, art.model_version, art.model_sha256)
+    assert artifact is not None, "train.py should precompute global_explain.json"
+
+    r = client.get("/v1/global-explain", headers=HEADERS)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["model_version"] == art.model_version
+    assert [i["feature"] for i in body["items"]] == [i["feature"] for i in artifact["items"]]
+
+
+def test_stale_artifact_is_ignored(tmp_path):
+    from src.common.settings import SETTINGS
+    from src.common.utils import write_json
+    from src.serving.global_explain import read_global_artifact
+
+    write_json(
+        tmp_path / SETTINGS.global_explain_filename,
+        {"model_version": "v1", "model_sha256": "aaa", "items": []},
+    )
+    assert read_global_artifact(tmp_path, "v1", "aaa") is not None
+    assert read_global_artifact(tmp_path, "v1", "bbb") is None
+    assert read_global_artifact(tmp_path, "v2", "aaa") is None
+
+
+def test_store_recomputes_in_background_once_per_key():
+    from src.serving.global_explain import GlobalExplainStore
+
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"items": [], "model_version": "v1", "model_sha256": "abc"}
+
+    store = GlobalExplainStore()
+    fut = store.ensure("v1:abc", compute)
+    assert store.ensure("v1:abc", compute) is fut
+    assert store.wait(fut, 0.05) is None
+    assert store.get("v1:abc") is None
+
+    release.set()
+    assert store.wait(fut, 5)["model_version"] == "v1"
+    assert store.get("v1:abc") is not None
+    assert len(calls) == 1
+    assert store.stats()["computes"] == 1
+
+
+def test_recompute_writes_to_cache_dir_not_version_dir(tmp_path, monkeypatch):
+    from src.api import routes
+    from src.common.settings import SETTINGS
+    from src.serving.global_explain import global_cache_dir, read_global_artifact
+
+    monkeypatch.setattr(
+        routes,
+        "SETTINGS",
+        dataclasses.replace(SETTINGS, global_explain_cache_dir=tmp_path, global_explain_shards=0),
+    )
+    sm = routes.MODEL.current()
+    art = sm.art
+    before = sorted(p.name for p in art.artifacts_dir.iterdir())
+
+    entry = routes._compute_global_entry(sm)
+
+    assert sorted(p.name for p in art.artifacts_dir.iterdir()) == before
+    out_dir = global_cache_dir(tmp_path, art.model_version, art.model_sha256)
+    cached = read_global_artifact(out_dir, art.model_version, art.model_sha256)
+    assert cached is not None
+    assert [i["feature"] for i in cached["items"]] == [i["feature"] for i in entry["items"]]
+
+
+def test_store_refuses_entries_for_another_model():
+    import pytest
+
+    from src.serving.global_explain import GlobalExplainStore
+
+    store = GlobalExplainStore()
+    with pytest.raises(ValueError):
+        store.put("v2:abc", {"items": [], "model_version": "v1", "model_sha256": "abc"})
+    fut = store.ensure(
+        "v2:abc", lambda: {"items": [], "model_version": "v1", "model_sha256": "abc"}
+    )
+    with pytest.raises(ValueError):
+        store.wait(fut, 5)
+    assert store.get("v2:abc") is None
+    assert store.stats()["failures"] == 1
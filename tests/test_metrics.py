@@ -0,0 +1,63 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.common import metrics
+from src.common.metrics import Histogram, render_prometheus, stage, stage_summary, timed
+
+
+@pytest.fixture(autouse=True)
+def _clean_stages():
+    metrics.reset_stages()
+    yield
+    metrics.reset_stages()
+
+
+def test_histogram_buckets_are_inclusive_upper_bounds():
+    h = Histogram(bounds=(0.001, 0.01))
+    for v in (0.0005, 0.001, 0.002, 0.5):
+        h.observe(v)
+    counts, total, count = h.snapshot()
+    assert counts == [2, 1, 1]
+    assert count == 4 and total == pytest.approx(0.5035)
+
+
+def test_stage_and_timed_record_including_failures():
+    @timed("unit_fn")
+    def boom():
+        raise ValueError("x")
+
+    with stage("unit_block"):
+        time.sleep(0.002)
+    with pytest.raises(ValueError):
+        boom()
+
+    s = stage_summary()
+    assert s["unit_fn"]["count"] == 1
+    assert s["unit_block"]["count"] == 1 and s["unit_block"]["sum_s"] >= 0.002
+
+
+def test_render_prometheus_is_cumulative_text_format():
+    for v in (1e-6, 3e-3, 20.0):
+        metrics.stage_histogram("unit").observe(v)
+    text = render_prometheus({"model_ready": 1.0})
+
+    assert "# TYPE decision_engine_stage_seconds histogram" in text
+    assert 'decision_engine_stage_seconds_bucket{stage="unit",le="5e-06"} 1' in text
+    assert 'decision_engine_stage_seconds_bucket{stage="unit",le="0.005"} 2' in text
+    assert 'decision_engine_stage_seconds_bucket{stage="unit",le="10.0"} 2' in text
+    assert 'decision_engine_stage_seconds_bucket{stage="unit",le="+Inf"} 3' in text
+    assert 'decision_engine_stage_seconds_count{stage="unit"} 3' in text
+    assert "decision_engine_model_ready 1.0" in text
+
+
+def test_prometheus_endpoint_is_unauthenticated_and_sees_request_stages():
+    from src.api.main import app
+
+    client = TestClient(app)
+    client.post("/v1/score", json={"age": 30})  # no key: auth stage still runs
+    r = client.get("/v1/metrics/prometheus")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'stage="auth"' in r.text
@@ -0,0 +1,53 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.api.middleware import RequestTracingMiddleware
+from src.common import metrics
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(RequestTracingMiddleware)
+
+    @app.get("/echo")
+    def echo(request: Request) -> dict:
+        return {"request_id": request.state.request_id}
+
+    @app.get("/boom")
+    def boom() -> dict:
+        raise RuntimeError("boom")
+
+    return app
+
+
+def test_request_id_is_propagated_to_state_and_headers():
+    client = TestClient(_app())
+    r = client.get("/echo", headers={"X-Request-ID": "abc-123"})
+    assert r.status_code == 200
+    assert r.json() == {"request_id": "abc-123"}
+    assert r.headers["x-request-id"] == "abc-123"
+    assert int(r.headers["x-latency-ms"]) >= 0
+
+
+def test_request_id_is_generated_when_missing():
+    client = TestClient(_app())
+    r = client.get("/echo")
+    rid = r.headers["x-request-id"]
+    assert rid and r.json()["request_id"] == rid
+    assert r.headers.get_list("x-request-id") == [rid]
+
+
+def test_errors_still_counted_and_logged():
+    metrics.reset_stages()
+    client = TestClient(_app(), raise_server_exceptions=False)
+    r = client.get("/boom")
+    assert r.status_code == 500
+    assert metrics.stage_summary()["request"]["count"] == 1
+
+
+def test_api_health_carries_tracing_headers():
+    from src.api.main import app
+
+    r = TestClient(app).get("/v1/health", headers={"x-request-id": "rid-1"})
+    assert r.json()["request_id"] == "rid-1"
+    assert r.headers["x-request-id"] == "rid-1"
@@ -0,0 +1,158 @@
+import json
+import time
+from types import SimpleNamespace
+
+from src.serving.model_holder import ModelHolder
+
+
+def _fake_loader(artifacts_dir):
+    metrics = json.loads((artifacts_dir / "metrics.json").read_text(encoding="utf-8"))
+    if metrics.get("broken"):
+        raise ValueError("corrupt artifact")
+    art = SimpleNamespace(model_version=metrics["training_date"], model_sha256=metrics["sha"])
+    return SimpleNamespace(art=art, version=art.model_version, batcher=None, loaded_at=time.time())
+
+
+def _write(dir_, version, sha, **extra):
+    (dir_ / "model.joblib").write_bytes(sha.encode())
+    (dir_ / "metrics.json").write_text(
+        json.dumps({"training_date": version, "sha": sha, **extra}), encoding="utf-8"
+    )
+
+
+def test_reload_swaps_atomically_and_keeps_old_handle_valid(tmp_path):
+    _write(tmp_path, "v1", "aaa")
+    holder = ModelHolder(tmp_path, loader=_fake_loader)
+    swaps = []
+    holder.add_swap_listener(lambda old, new: swaps.append((old.version, new.version)))
+
+    in_flight = holder.current()
+    _write(tmp_path, "v2", "bbb")
+    record = holder.reload_async("promote").result(timeout=5)
+
+    assert record["status"] == "swapped"
+    assert (record["old_version"], record["new_version"]) == ("v1", "v2")
+    assert in_flight.version == "v1"
+    assert holder.current().version == "v2"
+    assert swaps == [("v1", "v2")]
+
+    stats = holder.stats()
+    assert stats["reloads"] == 1
+    assert stats["last_swap"]["swap_us"] >= 0.0
+
+
+def test_unchanged_and_failed_reloads_keep_serving(tmp_path):
+    _write(tmp_path, "v1", "aaa")
+    holder = ModelHolder(tmp_path, loader=_fake_loader)
+    first = holder.current()
+
+    assert holder.reload()["status"] == "unchanged"
+    assert holder.current() is first
+
+    _write(tmp_path, "v2", "bbb", broken=True)
+    assert holder.reload()["status"] == "failed"
+    assert holder.current() is first
+    assert holder.stats()["failures"] == 1
+
+
+def test_file_watcher_triggers_reload(tmp_path):
+    _write(tmp_path, "v1", "aaa")
+    holder = ModelHolder(tmp_path, loader=_fake_loader)
+    holder.start_watcher(0.02)
+    try:
+        time.sleep(0.05)
+        _write(tmp_path, "v2", "bbb")
+        deadline = time.time() + 5
+        while holder.current().version != "v2" and time.time() < deadline:
+            time.sleep(0.02)
+        assert holder.current().version == "v2"
+        assert holder.stats()["last_swap"]["reason"] == "file_watch"
+    finally:
+        holder.stop_watcher()
+
+
+def test_file_watcher_does_not_retry_broken_artifact(tmp_path):
+    _write(tmp_path, "v1", "aaa")
+    holder = ModelHolder(tmp_path, loader=_fake_loader)
+    _write(tmp_path, "v2", "bbb", broken=True)
+    holder.start_watcher(0.02)
+    try:
+        deadline = time.time() + 5
+        while holder.stats()["failures"] < 1 and time.time() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.2)
+        assert holder.stats()["failures"] == 1
+        assert holder.current().version == "v1"
+    finally:
+        holder.stop_watcher()
+
+
+def _write_sklearn_version(dir_, version, folds, X, y):
+    import joblib
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from src.common.settings import SETTINGS
+    from src.common.utils import write_json
+    from src.serving.model_loader import export_array_artifacts
+
+    lr = Pipeline(steps=[("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000))])
+    model = CalibratedClassifierCV(lr, method="sigmoid", cv=folds).fit(X, y)
+    dir_.mkdir()
+    joblib.dump(model, dir_ / SETTINGS.model_filename)
+    stats = {"means": {f: 0.0 for f in X.columns}, "stds": {f: 1.0 for f in X.columns}}
+    write_json(
+        dir_ / SETTINGS.feature_schema_filename, {"features": list(X.columns), "stats": stats}
+    )
+    write_json(
+        dir_ / SETTINGS.metrics_filename,
+        {"training_date": version, "model_type": "logistic_regression"},
+    )
+    (dir_ / SETTINGS.model_card_filename).write_text("card", encoding="utf-8")
+    export_array_artifacts(dir_, model, X.head(20), X.head(40), list(X.columns))
+    return X.head(20).to_numpy(dtype=float)
+
+
+def test_reload_during_promote_serves_one_version(tmp_path):
+    import threading
+
+    import numpy as np
+
+    from src.common.model_registry import point_latest
+    from src.serving.model_holder import load_serving_model
+    from src.training.data_gen import FEATURES, generate_synthetic_risk_data
+
+    df = generate_synthetic_risk_data(n=1200, seed=5)
+    X, y = df[FEATURES], df["high_risk"].astype(int).values
+    folds = {"v1": 3, "v2": 4}
+    backgrounds = {
+        "v1": _write_sklearn_version(tmp_path / "v1", "v1", 3, X.head(600), y[:600]),
+        "v2": _write_sklearn_version(tmp_path / "v2", "v2", 4, X.tail(600), y[600:]),
+    }
+    latest = tmp_path / "latest"
+    point_latest(tmp_path / "v1", latest)
+    holder = ModelHolder(latest, loader=lambda d: load_serving_model(d, warm=False))
+
+    stop = threading.Event()
+
+    def flip():
+        while not stop.is_set():
+            for v in ("v2", "v1"):
+                point_latest(tmp_path / v, latest)
+
+    flipper = threading.Thread(target=flip)
+    flipper.start()
+    try:
+        for _ in range(20):
+            holder.reload("promote")
+            art = holder.current().art
+            v = art.artifacts_dir.name
+            assert art.model_version == v
+            assert art.kernel.weights.shape[0] == folds[v]
+            assert len(art.model.calibrated_classifiers_) == folds[v]
+            np.testing.assert_array_equal(art.background_df().to_numpy(), backgrounds[v])
+    finally:
+        stop.set()
+        flipper.join()
@@ -0,0 +1,142 @@
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.serving.model_loader import extract_linear_kernel
+from src.serving.scorer import predict_probabilities, predict_probability
+from src.training.data_gen import FEATURES, generate_synthetic_risk_data
+
+
+def _data(n: int = 3000):
+    df = generate_synthetic_risk_data(n=n, seed=3)
+    return df[FEATURES], df["high_risk"].astype(int).values
+
+
+def test_linear_kernel_matches_sklearn():
+    X, y = _data()
+    lr = Pipeline(steps=[("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000))])
+    model = CalibratedClassifierCV(lr, method="sigmoid", cv=3).fit(X, y)
+
+    kernel = extract_linear_kernel(model)
+    assert kernel is not None
+    assert kernel.weights.shape == (3, len(FEATURES))
+
+    expected = model.predict_proba(X)[:, 1]
+    got = kernel.predict_proba(X.to_numpy(dtype=float))
+    np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-12)
+
+    payloads = X.head(25).to_dict(orient="records")
+    np.testing.assert_allclose(
+        predict_probabilities(model, payloads, FEATURES, kernel),
+        expected[:25],
+        rtol=1e-9,
+        atol=1e-12,
+    )
+    assert abs(predict_probability(model, payloads[0], FEATURES, kernel) - expected[0]) < 1e-12
+
+
+def test_linear_kernel_skips_non_linear_models():
+    X, y = _data(600)
+    model = CalibratedClassifierCV(
+        GradientBoostingClassifier(n_estimators=10, random_state=0), method="sigmoid", cv=3
+    ).fit(X, y)
+    assert extract_linear_kernel(model) is None
+
+
+def _write_version(tmp_path, model, X):
+    import joblib
+
+    from src.common.settings import SETTINGS
+    from src.common.utils import write_json
+    from src.serving.model_loader import export_array_artifacts
+
+    joblib.dump(model, tmp_path / SETTINGS.model_filename)
+    stats = {"means": {f: 0.0 for f in FEATURES}, "stds": {f: 1.0 for f in FEATURES}}
+    write_json(tmp_path / SETTINGS.feature_schema_filename, {"features": FEATURES, "stats": stats})
+    write_json(
+        tmp_path / SETTINGS.metrics_filename,
+        {"training_date": "t", "model_type": "logistic_regression"},
+    )
+    (tmp_path / SETTINGS.model_card_filename).write_text("card", encoding="utf-8")
+    export_array_artifacts(tmp_path, model, X.head(50), X.head(80), FEATURES)
+
+
+def test_mmap_arrays_serve_without_unpickling(tmp_path):
+    from src.serving.model_loader import LazyModel, load_artifacts
+
+    X, y = _data()
+    lr = Pipeline(steps=[("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000))])
+    model = CalibratedClassifierCV(lr, method="sigmoid", cv=3).fit(X, y)
+    _write_version(tmp_path, model, X)
+
+    art = load_artifacts(tmp_path, mmap=True)
+    assert isinstance(art.model, LazyModel) and not art.model.loaded
+    assert isinstance(art.kernel.weights, np.memmap)
+    assert (
+        isinstance(art.arrays.background, np.memmap) and not art.arrays.background.flags.writeable
+    )
+    np.testing.assert_allclose(art.background_df().to_numpy(), X.head(50).to_numpy(dtype=float))
+
+    expected = model.predict_proba(X)[:, 1]
+    got = art.kernel.predict_proba(X.to_numpy(dtype=float))
+    np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-12)
+    assert not art.model.loaded
+
+    # the full model is still reachable on demand
+    np.testing.assert_allclose(art.model.predict_proba(X.head(5))[:, 1], expected[:5])
+    assert art.model.loaded
+
+
+def test_stale_arrays_are_ignored(tmp_path):
+    import joblib
+
+    from src.common.settings import SETTINGS
+    from src.serving.model_loader import load_artifacts
+
+    X, y = _data()
+    lr = Pipeline(steps=[("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000))])
+    model = CalibratedClassifierCV(lr, method="sigmoid", cv=3).fit(X, y)
+    _write_version(tmp_path, model, X)
+
+    # model replaced after export: the manifest no longer matches its sha256
+    other = CalibratedClassifierCV(lr, method="sigmoid", cv=3).fit(X.head(1500), y[:1500])
+    joblib.dump(other, tmp_path / SETTINGS.model_filename)
+
+    art = load_artifacts(tmp_path, mmap=True)
+    assert art.arrays is None
+    np.testing.assert_allclose(
+        art.kernel.predict_proba(X.to_numpy(dtype=float)),
+        other.predict_proba(X)[:, 1],
+        rtol=1e-9,
+        atol=1e-12,
+    )
+
+
+def test_loaded_artifacts_stay_pinned_to_their_version_after_promote(tmp_path):
+    from src.common.model_registry import point_latest
+    from src.serving.model_loader import load_artifacts
+
+    X, y = _data()
+    lr = Pipeline(steps=[("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000))])
+    v1 = CalibratedClassifierCV(lr, method="sigmoid", cv=3).fit(X, y)
+    v2 = CalibratedClassifierCV(lr, method="sigmoid", cv=4).fit(X.head(1500), y[:1500])
+    (tmp_path / "v1").mkdir()
+    (tmp_path / "v2").mkdir()
+    _write_version(tmp_path / "v1", v1, X)
+    _write_version(tmp_path / "v2", v2, X.tail(200))
+    latest = tmp_path / "latest"
+    point_latest(tmp_path / "v1", latest)
+
+    art = load_artifacts(latest, mmap=True)
+    assert art.artifacts_dir == (tmp_path / "v1").resolve()
+    point_latest(tmp_path / "v2", latest)
+
+    # lazy loads after the promote still read v1's files
+    assert len(art.model.calibrated_classifiers_) == art.kernel.weights.shape[0] == 3
+    np.testing.assert_allclose(
+        art.model.predict_proba(X.head(5))[:, 1], v1.predict_proba(X.head(5))[:, 1]
+    )
+    np.testing.assert_allclose(art.background_df().to_numpy(), X.head(50).to_numpy(dtype=float))
@@ -0,0 +1,81 @@
+import os
+import threading
+
+import pytest
+
+from src.common.model_registry import add_model, load_registry, promote
+
+
+def _version(root, name):
+    d = root / "artifacts" / name
+    d.mkdir(parents=True)
+    (d / "metrics.json").write_text(f'{{"training_date": "{name}"}}', encoding="utf-8")
+    add_model(str(d.relative_to(root)), {"training_date": name})
+    return d
+
+
+def test_promote_repoints_latest_symlink(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _version(tmp_path, "v1")
+    _version(tmp_path, "v2")
+    latest = tmp_path / "artifacts" / "latest"
+
+    promote("v1", promoted_by="test")
+    assert latest.is_symlink()
+    assert (latest / "metrics.json").read_text(encoding="utf-8") == '{"training_date": "v1"}'
+
+    promote("v2", promoted_by="test")
+    assert os.path.realpath(latest) == str((tmp_path / "artifacts" / "v2").resolve())
+    reg = load_registry()
+    assert reg["latest"] == "v2"
+    assert [m["version"] for m in reg["models"]] == ["v1", "v2"]
+    assert not [p for p in (tmp_path / "artifacts").iterdir() if p.name.startswith(".")]
+
+
+def test_legacy_latest_dir_is_migrated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _version(tmp_path, "v1")
+    legacy = tmp_path / "artifacts" / "latest"
+    legacy.mkdir()
+    (legacy / "metrics.json").write_text("{}", encoding="utf-8")
+
+    promote("v1", promoted_by="test")
+    assert legacy.is_symlink()
+    assert any(p.name.startswith("latest.legacy-") for p in (tmp_path / "artifacts").iterdir())
+
+
+def test_readers_never_see_missing_latest_during_promotions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _version(tmp_path, "v1")
+    _version(tmp_path, "v2")
+    promote("v1", promoted_by="test")
+    metrics = tmp_path / "artifacts" / "latest" / "metrics.json"
+
+    stop = threading.Event()
+    misses = []
+
+    def reader():
+        while not stop.is_set():
+            try:
+                metrics.read_text(encoding="utf-8")
+                load_registry()
+            except (OSError, ValueError) as e:
+                misses.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for i in range(200):
+        promote("v2" if i % 2 == 0 else "v1", promoted_by="test")
+    stop.set()
+    for t in threads:
+        t.join()
+    assert misses == []
+
+
+def test_unknown_or_unsafe_version_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _version(tmp_path, "v1")
+    for bad in ("nope", "latest", "..", "../v1"):
+        with pytest.raises(FileNotFoundError):
+            promote(bad, promoted_by="test")
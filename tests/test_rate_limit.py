@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from src.common.auth import Principal
+from src.common.rate_limit import RateLimiter, check_rate_limit
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+def test_gcra_caps_burst_and_sets_retry_after(monkeypatch):
+    r = fakeredis.FakeRedis(decode_responses=True)
+    limiter = RateLimiter(burst_fraction=0.2)
+    monkeypatch.setattr("src.common.rate_limit.get_redis", lambda: r)
+    principal = Principal(api_key="k1", role="analyst", rpm=60, read_only=False, expires_at=None)
+
+    for _ in range(12):
+        check_rate_limit(principal, limiter)
+    with pytest.raises(HTTPException) as e:
+        check_rate_limit(principal, limiter)
+    assert e.value.status_code == 429
+    assert e.value.headers["Retry-After"] == "1"
+
+    # the denial is served locally until its retry time
+    calls = limiter.redis_calls
+    with pytest.raises(HTTPException):
+        check_rate_limit(principal, limiter)
+    assert limiter.redis_calls == calls
+
+
+def test_leased_workers_never_exceed_global_quota():
+    r = fakeredis.FakeRedis(decode_responses=True)
+    rpm, burst_fraction = 6000, 0.2  # 10ms emission interval, 1200-token burst
+    workers = [
+        RateLimiter(burst_fraction=burst_fraction, lease_fraction=0.02, lease_ttl_s=5.0)
+        for _ in range(6)
+    ]
+    admitted = [0] * len(workers)
+
+    def hammer(i):
+        deadline = time.monotonic() + 0.4
+        while time.monotonic() < deadline:
+            ok, _ = workers[i].acquire("shared", rpm, r=r)
+            admitted[i] += int(ok)
+
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=hammer, args=(i,)) for i in range(len(workers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - t0
+
+    total = sum(admitted)
+    bound = burst_fraction * rpm + elapsed * rpm / 60.0 + 1
+    assert total <= bound
+    assert total >= burst_fraction * rpm * 0.9
+
+
+def test_leases_skip_redis_below_limit():
+    r = fakeredis.FakeRedis(decode_responses=True)
+    limiter = RateLimiter(burst_fraction=0.2, lease_fraction=0.01, lease_ttl_s=5.0)
+    for _ in range(2000):
+        assert limiter.acquire("roomy", 600000, r=r) == (True, 0.0)
+    # 6000-token leases: the whole run fits in a single Redis call
+    assert limiter.redis_calls == 1
+
+
+def test_any_60s_window_admits_at_most_rpm_plus_default_burst(monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    r = fakeredis.FakeRedis(decode_responses=True)
+    limiter = RateLimiter()
+    rpm = 60
+
+    # idle (full bucket), then a client retrying every 100ms for three minutes
+    admitted_at = []
+    for step in range(1800):
+        clock[0] = 1_000_000.0 + step * 0.1
+        if limiter.acquire("window", rpm, r=r)[0]:
+            admitted_at.append(clock[0])
+
+    worst = max(sum(1 for t in admitted_at if start <= t < start + 60.0) for start in admitted_at)
+    assert worst <= rpm * 1.2  # default burst: 20% of rpm on top of the steady rate
+    assert worst > rpm  # the burst is still there
@@ -0,0 +1,73 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.common.decisioning import decision_from_prob
+from src.serving.shadow import ShadowScorer
+
+
+class _ConstKernel:
+    def __init__(self, p, delay_s=0.0):
+        self.p = p
+        self.delay_s = delay_s
+
+    def predict_proba(self, X):
+        time.sleep(self.delay_s)
+        return np.full(len(X), self.p)
+
+
+def _challenger(p, delay_s=0.0):
+    return SimpleNamespace(
+        model=None, feature_list=["a", "b"], kernel=_ConstKernel(p, delay_s), model_version="v2"
+    )
+
+
+def test_shadow_records_agreement_deltas_and_latency():
+    shadow = ShadowScorer(_challenger(0.99), max_batch=8)
+    champion = [0.01, 0.99, 0.5, 0.99]
+    for p in champion:
+        assert shadow.submit(np.array([1.0, 2.0]), p, "v1", 0.3)
+    shadow.drain()
+    stats = shadow.stats()
+    shadow.close()
+
+    assert stats["rows"] == 4
+    pair = stats["by_champion"]["v1"]
+    assert pair["challenger_version"] == "v2"
+    assert pair["rows"] == 4
+    assert pair["agreement_rate"] == 0.5
+    assert pair["decision_matrix"][decision_from_prob(0.01)]["decline"] == 1
+    assert pair["decision_matrix"]["decline"]["decline"] == 2
+    assert np.isclose(pair["prob_delta"]["mean"], np.mean([0.99 - p for p in champion]))
+    assert np.isclose(pair["prob_delta"]["max_abs"], 0.98)
+    assert pair["champion_latency_ms"]["p50"] == 0.3
+    assert stats["challenger_latency_ms"]["p99"] >= 0.0
+
+
+def test_shadow_keeps_champion_versions_apart():
+    shadow = ShadowScorer(_challenger(0.99), max_batch=8)
+    for _ in range(3):
+        shadow.submit(np.array([1.0, 2.0]), 0.99, "v1", 0.3)
+        shadow.submit(np.array([1.0, 2.0]), 0.01, "v1b", 0.5)
+    shadow.drain()
+    stats = shadow.stats()
+    shadow.close()
+
+    assert stats["rows"] == 6
+    assert set(stats["by_champion"]) == {"v1", "v1b"}
+    assert stats["by_champion"]["v1"]["agreement_rate"] == 1.0
+    assert stats["by_champion"]["v1"]["prob_delta"]["max_abs"] == 0.0
+    assert stats["by_champion"]["v1b"]["agreement_rate"] == 0.0
+    assert np.isclose(stats["by_champion"]["v1b"]["prob_delta"]["mean"], 0.98)
+    assert stats["by_champion"]["v1b"]["champion_latency_ms"]["p50"] == 0.5
+
+
+def test_shadow_drops_instead_of_blocking_when_behind():
+    shadow = ShadowScorer(_challenger(0.5, delay_s=0.2), max_queue=2, max_batch=1)
+    t0 = time.perf_counter()
+    accepted = [shadow.submit(np.array([1.0, 2.0]), 0.5, "v1", 0.1) for _ in range(20)]
+    assert time.perf_counter() - t0 < 0.1
+    assert not all(accepted)
+    assert shadow.stats()["dropped"] == accepted.count(False)
+    shadow.close()
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+_PROBE = """
+import json, sys
+import src.api.main
+from src.api import routes
+print(json.dumps({
+    "shap": "shap" in sys.modules,
+    "matplotlib": "matplotlib" in sys.modules,
+    "model_loaded": routes.MODEL is not None,
+}))
+"""
+
+
+def test_importing_the_app_is_light():
+    env = {**os.environ, "OTEL_SDK_DISABLED": "true"}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], capture_output=True, text=True, env=env, check=True
+    )
+    state = json.loads(out.stdout.strip().splitlines()[-1])
+    assert state == {"shap": False, "matplotlib": False, "model_loaded": False}
+
+
+def test_lifespan_warms_up_and_ready_flips():
+    from src.api.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/v1/health").status_code == 200
+        deadline = time.time() + 120
+        r = client.get("/v1/ready")
+        while r.status_code != 200 and time.time() < deadline:
+            time.sleep(0.05)
+            r = client.get("/v1/ready")
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert body["state"] == "ready"
+        assert body["model_version"]